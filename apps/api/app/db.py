@@ -2,7 +2,7 @@ import os
 from contextlib import contextmanager
 from typing import Any, Iterable, Optional
 from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine, Result
+from sqlalchemy.engine import Engine, Result, make_url
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/claimscope")
 
@@ -11,7 +11,11 @@ _engine: Optional[Engine] = None
 def get_engine() -> Engine:
     global _engine
     if _engine is None:
-        _engine = create_engine(DATABASE_URL, future=True)
+        options: dict[str, Any] = {}
+        if make_url(DATABASE_URL).get_dialect().driver == "psycopg2":
+            # Batch multi-row executes (e.g. claim inserts) instead of one round trip per row.
+            options.update(executemany_mode="values_plus_batch", executemany_batch_page_size=500)
+        _engine = create_engine(DATABASE_URL, future=True, **options)
     return _engine
 
 @contextmanager
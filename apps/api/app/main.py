@@ -1,7 +1,7 @@
+import functools
 import os
 import re
 import time
-import uuid
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 import requests
@@ -19,6 +19,11 @@ from .schemas import (
 )
 from .db import run_migrations, session
 
+try:
+    import boto3
+except ImportError:  # pragma: no cover - optional dependency
+    boto3 = None  # type: ignore
+
 app = FastAPI(title="Claimscope API", version="0.1.0")
 
 # Allow local dev UI
@@ -35,6 +40,36 @@ def _startup():
     # Run idempotent migrations
     run_migrations()
 
+# SQL statements are built once at import instead of on every request.
+_INSERT_CLAIM_SQL = text(
+    """
+    INSERT INTO claims (id, model, domain, task, metric, settings, reference_score, source_url, confidence)
+    VALUES (:id, :model, :domain, :task, :metric, CAST(:settings AS JSONB), :reference_score, :source_url, :confidence)
+    """
+)
+_CLAIM_DOMAIN_SQL = text("SELECT domain FROM claims WHERE id=:id")
+_INSERT_RUN_SQL = text(
+    """
+    INSERT INTO runs (id, claim_id, model_config, status)
+    VALUES (:id, :claim_id, CAST(:model_config AS JSONB), :status)
+    """
+)
+_GET_RUN_SQL = text(
+    """
+    SELECT r.*, c.validation_count
+    FROM runs r
+    JOIN claims c ON c.id = r.claim_id
+    WHERE r.id = :id
+    """
+)
+_RUN_ARTIFACTS_SQL = text("SELECT name, url, sha256 FROM artifacts WHERE run_id=:id ORDER BY created_at ASC")
+_GET_CLAIM_SQL = text("SELECT * FROM claims WHERE id=:id")
+# Uploaded artifacts are stored as s3://bucket/key and presigned on every read.
+_ARTIFACT_URL_TTL_S = 3600
+_CLAIM_RUNS_SQL = text(
+    "SELECT id, status, score_value, ci_lower, ci_upper, status_label, created_at FROM runs WHERE claim_id=:id ORDER BY created_at DESC"
+)
+
 COMPARATIVE_MARKERS = (
     "best",
     "better than",
@@ -775,16 +810,11 @@ def submit_claim(body: SubmitClaimRequest):
     out_claims: List[Claim] = []
 
     import json as _json
+    rows: List[Dict[str, Any]] = []
     with session() as conn:
         for c in candidates:
-            claim_id = f"clm_{uuid.uuid4().hex[:8]}"
-            conn.execute(
-                text(
-                    """
-                    INSERT INTO claims (id, model, domain, task, metric, settings, reference_score, source_url, confidence)
-                    VALUES (:id, :model, :domain, :task, :metric, CAST(:settings AS JSONB), :reference_score, :source_url, :confidence)
-                    """
-                ),
+            claim_id = f"clm_{os.urandom(4).hex()}"
+            rows.append(
                 {
                     "id": claim_id,
                     "model": c["model"],
@@ -795,7 +825,7 @@ def submit_claim(body: SubmitClaimRequest):
                     "reference_score": c["reference_score"],
                     "source_url": source_url,
                     "confidence": c["confidence"],
-                },
+                }
             )
             out_ids.append(claim_id)
             out_claims.append(
@@ -812,6 +842,8 @@ def submit_claim(body: SubmitClaimRequest):
                     validation_count=0,
                 )
             )
+        # One executemany for all parsed claims instead of a round trip per claim.
+        conn.execute(_INSERT_CLAIM_SQL, rows)
         conn.commit()
 
     return SubmitClaimResponse(claim_ids=out_ids, claims=out_claims)
@@ -821,11 +853,11 @@ MIN_BUDGET_LLM = float(os.getenv("MIN_LLM_BUDGET_USD", "0.02"))
 
 @app.post("/run_reproduction")
 def run_reproduction(body: RunReproductionRequest):
-    run_id = f"run_{uuid.uuid4().hex[:8]}"
+    run_id = f"run_{os.urandom(4).hex()}"
     with session() as conn:
         # basic existence check & fetch domain for budget enforcement
         claim_row = conn.execute(
-            text("SELECT domain FROM claims WHERE id=:id"),
+            _CLAIM_DOMAIN_SQL,
             {"id": body.claim_id},
         ).mappings().first()
         if not claim_row:
@@ -844,12 +876,7 @@ def run_reproduction(body: RunReproductionRequest):
         model_cfg_payload = body.cfg.model_dump(mode="json")
         model_cfg_payload["budget_usd"] = round(body.budget_usd, 4)
         conn.execute(
-            text(
-                """
-                INSERT INTO runs (id, claim_id, model_config, status)
-                VALUES (:id, :claim_id, CAST(:model_config AS JSONB), :status)
-                """
-            ),
+            _INSERT_RUN_SQL,
             {
                 "id": run_id,
                 "claim_id": body.claim_id,
@@ -860,24 +887,30 @@ def run_reproduction(body: RunReproductionRequest):
         conn.commit()
     return {"run_id": run_id}
 
+@functools.lru_cache(maxsize=1)
+def _s3_client() -> Any:
+    return boto3.client("s3", endpoint_url=os.getenv("CLAIMSCOPE_TRACE_ENDPOINT_URL") or None)
+
+
+def _artifact_url(url: Optional[str]) -> Optional[str]:
+    if not url or not url.startswith("s3://") or boto3 is None:
+        return url
+    bucket, _, key = url[len("s3://"):].partition("/")
+    try:
+        return _s3_client().generate_presigned_url(
+            "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=_ARTIFACT_URL_TTL_S
+        )
+    except Exception:
+        return url
+
 @app.get("/runs/{run_id}", response_model=RunStatusResponse)
 def get_run(run_id: str):
     with session() as conn:
-        row = conn.execute(
-            text(
-                """
-                SELECT r.*, c.validation_count
-                FROM runs r
-                JOIN claims c ON c.id = r.claim_id
-                WHERE r.id = :id
-                """
-            ),
-            {"id": run_id},
-        ).mappings().first()
+        row = conn.execute(_GET_RUN_SQL, {"id": run_id}).mappings().first()
         if not row:
             raise HTTPException(status_code=404, detail="run_id not found")
-        arts = conn.execute(text("SELECT name, url, sha256 FROM artifacts WHERE run_id=:id ORDER BY created_at ASC"), {"id": run_id}).mappings().all()
-        artifacts = [{"name": a["name"], "url": a["url"], "sha256": a.get("sha256")} for a in arts]
+        arts = conn.execute(_RUN_ARTIFACTS_SQL, {"id": run_id}).mappings().all()
+        artifacts = [{"name": a["name"], "url": _artifact_url(a["url"]), "sha256": a.get("sha256")} for a in arts]
         return RunStatusResponse(
             run_id=row["id"],
             status=row["status"],
@@ -895,15 +928,10 @@ def get_run(run_id: str):
 @app.get("/claims/{claim_id}", response_model=ClaimWithRuns)
 def get_claim(claim_id: str):
     with session() as conn:
-        c = conn.execute(text("SELECT * FROM claims WHERE id=:id"), {"id": claim_id}).mappings().first()
+        c = conn.execute(_GET_CLAIM_SQL, {"id": claim_id}).mappings().first()
         if not c:
             raise HTTPException(status_code=404, detail="claim_id not found")
-        runs = conn.execute(
-            text(
-                "SELECT id, status, score_value, ci_lower, ci_upper, status_label, created_at FROM runs WHERE claim_id=:id ORDER BY created_at DESC"
-            ),
-            {"id": claim_id},
-        ).mappings().all()
+        runs = conn.execute(_CLAIM_RUNS_SQL, {"id": claim_id}).mappings().all()
         return ClaimWithRuns(
             id=c["id"],
             model=c["model"],
@@ -32,6 +32,26 @@ CREATE TABLE IF NOT EXISTS runs (
   completed_at TIMESTAMPTZ
 );
 
+-- Worker dispatch polls for the oldest queued run.
+CREATE INDEX IF NOT EXISTS idx_runs_queued ON runs (created_at) WHERE status = 'queued';
+
+-- Wakes idle workers (LISTEN run_queued) whenever a run enters the queue, whether
+-- it was just submitted or re-queued by hand; delivered when the transaction commits.
+CREATE OR REPLACE FUNCTION notify_run_queued() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' OR OLD.status IS DISTINCT FROM NEW.status THEN
+    PERFORM pg_notify('run_queued', NEW.id);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS runs_notify_queued ON runs;
+CREATE TRIGGER runs_notify_queued
+  AFTER INSERT OR UPDATE OF status ON runs
+  FOR EACH ROW WHEN (NEW.status = 'queued')
+  EXECUTE FUNCTION notify_run_queued();
+
 CREATE TABLE IF NOT EXISTS artifacts (
   id TEXT PRIMARY KEY,
   run_id TEXT REFERENCES runs(id) ON DELETE CASCADE,
@@ -1,6 +1,16 @@
 from __future__ import annotations
 
+import pytest
+
+from apps.api.worker import sandbox
 from apps.api.worker.coding_competition import _extract_python_code, _run_tests
+from apps.api.worker.kv_store import KeyValueStore
+
+
+@pytest.fixture(autouse=True)
+def _no_cached_verdicts(tmp_path, monkeypatch):
+    # Real sandbox runs must neither replay nor record verdicts in the user's cache.
+    monkeypatch.setattr(sandbox, "_VERDICTS", KeyValueStore(tmp_path / "verdicts.db", "verdicts", enabled=False))
 
 
 def test_run_tests_supports_script_blocks() -> None:
@@ -15,6 +25,17 @@ def test_run_tests_supports_script_blocks() -> None:
     assert result.success is True
 
 
+def test_run_tests_batch_preserves_order_for_duplicate_solutions() -> None:
+    from apps.api.worker.coding_competition import _run_tests_batch
+
+    task = {"id": "batch-demo", "tests": [{"input": "demo()", "expected": "5"}]}
+    good = "def demo():\n    return 5\n"
+    bad = "def demo():\n    return 4\n"
+    results = _run_tests_batch(task, [good, bad, good])
+    assert [result.success for result in results] == [True, False, True]
+    assert all(result.task_id == "batch-demo" for result in results)
+
+
 def test_extract_python_code_plain_source() -> None:
     src = "def foo():\n    return 42"
     assert _extract_python_code(src) == src
@@ -38,7 +59,7 @@ def test_run_coding_competition_progress_callback() -> None:
     tasks = [{"id": "task", "prompt": "print('hi')", "tests": []}]
 
     original_call_model = cc._call_model
-    original_run_tests = cc._run_tests
+    original_run_tests_batch = cc._run_tests_batch
 
     def fake_call_model(config, prompt, temperature):
         return cc.ModelInvocation(
@@ -50,11 +71,11 @@ def test_run_coding_competition_progress_callback() -> None:
             latency_s=0.01,
         )
 
-    def fake_run_tests(task, response):
-        return cc.TaskResult(task_id=task.get("id", "task"), success=True, test_latency_s=0.01)
+    def fake_run_tests_batch(task, responses):
+        return [cc.TaskResult(task_id=task.get("id", "task"), success=True, test_latency_s=0.01) for _ in responses]
 
     cc._call_model = fake_call_model
-    cc._run_tests = fake_run_tests
+    cc._run_tests_batch = fake_run_tests_batch
 
     try:
         progress_events = []
@@ -67,9 +88,115 @@ def test_run_coding_competition_progress_callback() -> None:
         )
     finally:
         cc._call_model = original_call_model
-        cc._run_tests = original_run_tests
+        cc._run_tests_batch = original_run_tests_batch
 
     assert progress_events, "expected progress updates"
     final = progress_events[-1]
     assert final.get("units_completed") == final.get("units_total")
     assert final.get("tasks_completed") == final.get("tasks_total")
+
+
+def test_run_coding_competition_coalesces_aliased_models() -> None:
+    from apps.api.worker import coding_competition as cc
+
+    primary = {"provider": "anthropic", "name": "primary"}
+    comparators = [
+        {"provider": "openai", "name": "shared"},
+        {"provider": "OpenAI", "name": "shared"},
+        {"provider": "openai", "name": "shared", "api_key_ref": "ALT_OPENAI_KEY"},
+    ]
+    tasks = [{"id": "task", "prompt": "print('hi')", "tests": []}]
+
+    original_call_model = cc._call_model
+    original_run_tests_batch = cc._run_tests_batch
+    calls = []
+
+    def fake_call_model(config, prompt, temperature):
+        calls.append(config.get("name"))
+        return cc.ModelInvocation(
+            model=config.get("name", "unknown"),
+            provider=config.get("provider", "unknown"),
+            response="def solution():\n    return 0\n",
+            input_tokens=1,
+            output_tokens=1,
+            latency_s=0.01,
+        )
+
+    def fake_run_tests_batch(task, responses):
+        return [cc.TaskResult(task_id=task.get("id", "task"), success=True, test_latency_s=0.01) for _ in responses]
+
+    cc._call_model = fake_call_model
+    cc._run_tests_batch = fake_run_tests_batch
+
+    try:
+        results = cc.run_coding_competition(
+            tasks=tasks,
+            primary_config=primary,
+            comparator_configs=comparators,
+            temperature=0.0,
+        )
+    finally:
+        cc._call_model = original_call_model
+        cc._run_tests_batch = original_run_tests_batch
+
+    # Case-aliased providers share one request; a different API key gets its own.
+    assert sorted(calls) == ["primary", "shared", "shared"]
+    assert [comp["attempted"] for comp in results["comparators"]] == [1, 1, 1]
+    assert results["progress"]["units_completed"] == 4
+
+
+def test_run_coding_competition_does_not_coalesce_sampled_requests(monkeypatch) -> None:
+    from apps.api.worker import coding_competition as cc
+
+    calls = []
+
+    def fake_call_model(config, prompt, temperature):
+        calls.append(config["name"])
+        return cc.ModelInvocation(config["name"], config["provider"], "pass", 1, 1, 0.01)
+
+    monkeypatch.setattr(cc, "_call_model", fake_call_model)
+    monkeypatch.setattr(
+        cc,
+        "_run_tests_batch",
+        lambda task, responses: [cc.TaskResult(task_id=task["id"], success=True, test_latency_s=0.01) for _ in responses],
+    )
+
+    cc.run_coding_competition(
+        tasks=[{"id": "task", "prompt": "print('hi')", "tests": []}],
+        primary_config={"provider": "anthropic", "name": "primary"},
+        comparator_configs=[{"provider": "openai", "name": "shared"}, {"provider": "OpenAI", "name": "shared"}],
+        temperature=0.7,
+    )
+
+    assert sorted(calls) == ["primary", "shared", "shared"]
+
+
+def test_run_coding_competition_excludes_cached_latencies(monkeypatch) -> None:
+    from apps.api.worker import coding_competition as cc
+
+    tasks = [{"id": f"task-{i}", "prompt": f"print({i})", "tests": []} for i in range(2)]
+
+    def fake_call_model(config, prompt, temperature):
+        # The comparator's first task is a cache replay.
+        replay = config["name"] == "comp" and "print(0)" in prompt
+        return cc.ModelInvocation(config["name"], config["provider"], "pass", 1, 1, 0.0 if replay else 0.5, cached=replay)
+
+    monkeypatch.setattr(cc, "_call_model", fake_call_model)
+    monkeypatch.setattr(
+        cc,
+        "_run_tests_batch",
+        lambda task, responses: [cc.TaskResult(task_id=task["id"], success=True, test_latency_s=0.01) for _ in responses],
+    )
+
+    results = cc.run_coding_competition(
+        tasks=tasks,
+        primary_config={"provider": "anthropic", "name": "primary"},
+        comparator_configs=[{"provider": "anthropic", "name": "comp"}],
+        temperature=0.0,
+    )
+
+    comparator = results["comparators"][0]
+    assert comparator["latencies"] == [0.5]
+    assert comparator["avg_latency_s"] == 0.5
+    assert comparator["cached_responses"] == 1
+    assert sorted(task["comparators"][0]["cached"] for task in results["tasks"]) == [False, True]
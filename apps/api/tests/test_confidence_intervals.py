@@ -0,0 +1,27 @@
+import pytest
+
+from apps.api.worker.reasoning_gsm8k import bootstrap_ci, wilson_ci
+
+
+def test_wilson_ci_matches_reference_values():
+    lo, hi = wilson_ci(18, 25)
+    assert lo == pytest.approx(0.5242, abs=1e-4)
+    assert hi == pytest.approx(0.8572, abs=1e-4)
+
+    lo, hi = wilson_ci(0, 10)
+    assert lo == 0.0
+    assert hi == pytest.approx(0.2775, abs=1e-4)
+
+
+def test_wilson_ci_handles_empty_and_saturated_samples():
+    assert wilson_ci(0, 0) == (0.0, 0.0)
+    lo, hi = wilson_ci(25, 25)
+    assert 0.0 < lo < 1.0
+    assert hi <= 1.0
+
+
+def test_bootstrap_ci_is_seeded_and_brackets_the_mean():
+    values = [1] * 18 + [0] * 7
+    lo, hi = bootstrap_ci(values, n=len(values), reps=500, seed=7)
+    assert (lo, hi) == bootstrap_ci(values, n=len(values), reps=500, seed=7)
+    assert lo <= 18 / 25 <= hi
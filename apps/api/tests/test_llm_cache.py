@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from apps.api.worker import coding_competition as cc
+from apps.api.worker import efficiency_tokens as et
+from apps.api.worker import llm_cache
+from apps.api.worker.kv_store import KeyValueStore
+
+
+def test_call_model_replays_deterministic_responses(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(llm_cache, "_STORE", KeyValueStore(tmp_path / "cache.db", "responses"))
+    calls = []
+
+    def fake_call_provider(config, prompt, temperature):
+        calls.append(temperature)
+        return cc.ModelInvocation(config["name"], config["provider"], "print(1)", 3, 4, 0.5)
+
+    monkeypatch.setattr(cc, "_call_provider", fake_call_provider)
+    config = {"provider": "anthropic", "name": "model"}
+
+    first = cc._call_model(config, "prompt", 0.0)
+    second = cc._call_model(config, "prompt", 0.0)
+    assert calls == [0.0]
+    assert first.cached is False
+    assert second.cached is True
+    # Replays carry the recorded response and usage but no latency of their own.
+    assert (second.response, second.input_tokens, second.latency_s) == ("print(1)", 3, 0.0)
+
+    cc._call_model(config, "prompt", 0.7)
+    cc._call_model(config, "prompt", 0.7)
+    assert calls == [0.0, 0.7, 0.7]
+
+
+def test_telemetry_call_model_replays_deterministic_usage(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(llm_cache, "_STORE", KeyValueStore(tmp_path / "cache.db", "responses"))
+    calls = []
+
+    def fake_call_provider(config, prompt, *, temperature, max_tokens):
+        calls.append((temperature, max_tokens))
+        return et.TelemetryResult(config["name"], "anthropic", 10, 20, 30, 0.25)
+
+    monkeypatch.setattr(et, "_call_provider", fake_call_provider)
+    config = {"provider": "anthropic", "name": "model"}
+
+    first = et._call_model(config, "prompt", temperature=0.0, max_tokens=64)
+    second = et._call_model(config, "prompt", temperature=0.0, max_tokens=64)
+    assert calls == [(0.0, 64)]
+    # A replay keeps the recorded usage but is flagged and reports no latency.
+    assert first.cached is False
+    assert (second.output_tokens, second.latency_s, second.cached) == (first.output_tokens, 0.0, True)
+
+    et._call_model(config, "prompt", temperature=0.0, max_tokens=128)
+    et._call_model(config, "prompt", temperature=0.5, max_tokens=64)
+    assert calls == [(0.0, 64), (0.0, 128), (0.5, 64)]
+
+
+def test_telemetry_cache_entries_expire(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(llm_cache, "_STORE", KeyValueStore(tmp_path / "cache.db", "responses"))
+    calls = []
+
+    def fake_call_provider(config, prompt, *, temperature, max_tokens):
+        calls.append(prompt)
+        return et.TelemetryResult(config["name"], "anthropic", 10, 20, 30, 0.25)
+
+    monkeypatch.setattr(et, "_call_provider", fake_call_provider)
+    monkeypatch.setattr(llm_cache, "TTL_S", 0.0)
+    config = {"provider": "anthropic", "name": "model-latest"}
+
+    et._call_model(config, "prompt", temperature=0.0, max_tokens=64)
+    et._call_model(config, "prompt", temperature=0.0, max_tokens=64)
+    assert calls == ["prompt", "prompt"]
+
+
+def test_telemetry_summary_leaves_cached_results_out_of_latencies() -> None:
+    fresh = et.TelemetryResult("model", "anthropic", 10, 20, 30, 0.25)
+    replay = et.TelemetryResult("model", "anthropic", 10, 20, 30, 0.0, cached=True)
+    summary = et._summarise([[fresh], [replay]])
+    assert summary["requests"] == 2
+    assert summary["cached_requests"] == 1
+    assert summary["latencies"] == [0.25]
+    assert [entry["cached"] for entry in summary["per_prompt"]] == [False, True]
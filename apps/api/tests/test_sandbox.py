@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from apps.api.worker import sandbox
+from apps.api.worker.kv_store import KeyValueStore
+
+
+@pytest.fixture(autouse=True)
+def _isolated_verdicts(tmp_path, monkeypatch):
+    monkeypatch.setattr(sandbox, "_VERDICTS", KeyValueStore(tmp_path / "verdicts.db", "verdicts"))
+
+
+def test_run_solution_reports_pass_and_failure() -> None:
+    solution = "def double(x):\n    return x * 2\n"
+    assert sandbox.run_solution(solution, "assert double(2) == 4", 5) == (True, None)
+
+    passed, stderr = sandbox.run_solution(solution, "assert double(2) == 5", 5)
+    assert passed is False
+    assert "AssertionError" in stderr
+
+
+def test_run_solution_enforces_timeout() -> None:
+    solution = "def spin():\n    while True:\n        pass\n"
+    assert sandbox.run_solution(solution, "spin()", 1) == (False, "timeout")
+
+
+def test_run_many_replays_cached_verdicts() -> None:
+    job = ("def value():\n    return 1\n", "assert value() == 1")
+    first = sandbox.run_many([job], 5)
+    assert first[0][0] is True
+    # A cache hit returns the stored elapsed time verbatim.
+    assert sandbox.run_many([job], 5) == first
+
+    spin = ("def spin():\n    while True:\n        pass\n", "spin()")
+    assert sandbox.run_many([spin], 1)[0][:2] == (False, "timeout")
+    assert sandbox._VERDICTS.get(sandbox._verdict_key(*spin)) is None
+
+
+def test_jobs_do_not_share_interpreter_state(monkeypatch) -> None:
+    monkeypatch.setattr(sandbox, "_POOL_SIZE", 1)
+    sandbox.shutdown()
+    try:
+        patcher = ("import math\nmath.sqrt = lambda x: 42\n", "import os\nopen('scratch.txt', 'w').close()")
+        honest = ("import math\n", "import os\nassert math.sqrt(16) == 4\nassert not os.path.exists('scratch.txt')")
+        results = sandbox.run_many([patcher, honest], 5)
+        assert [result[:2] for result in results] == [(True, None), (True, None)]
+    finally:
+        sandbox.shutdown()
+
+
+def test_hung_job_does_not_affect_concurrent_jobs(monkeypatch) -> None:
+    monkeypatch.setattr(sandbox, "_POOL_SIZE", 1)
+    sandbox.shutdown()
+    # Ignoring SIGALRM defeats the in-worker timeout, so only the deadline can stop it.
+    hung = ("import signal\nsignal.signal(signal.SIGALRM, signal.SIG_IGN)\n", "while True:\n    pass")
+    honest = ("def value():\n    return 1\n", "assert value() == 1")
+    try:
+        with ThreadPoolExecutor(max_workers=1) as other_caller:
+            # Queued behind another caller's hung job, the honest job must not time out.
+            hung_results = other_caller.submit(sandbox.run_many, [hung], 0.5)
+            time.sleep(0.2)
+            assert sandbox.run_many([honest], 0.5)[0][:2] == (True, None)
+            assert hung_results.result()[0][:2] == (False, "timeout")
+    finally:
+        sandbox.shutdown()
+
+
+def test_job_that_breaks_result_reporting_fails_without_raising() -> None:
+    breaks_len = ("import builtins\nbuiltins.len = lambda obj: 0\n", "pass")
+    assert sandbox.run_many([breaks_len], 0.5)[0][0] is False
@@ -27,3 +27,14 @@ def test_mmmu_harness_marks_missing_comparators():
     )
 
     assert "Imaginary Vision Model" in report["missing"]
+
+
+def test_mmmu_harness_reuses_fixture_without_sharing_results():
+    first, first_latencies, _ = run_mmmu_subset(model_name="Llama 3.2 11B Vision")
+    first["ops"]["mutated"] = True
+    first_latencies.append(-1.0)
+
+    second, second_latencies, _ = run_mmmu_subset(model_name="Llama 3.2 11B Vision")
+
+    assert "mutated" not in second["ops"]
+    assert -1.0 not in second_latencies
@@ -7,24 +7,25 @@ per model.
 
 from __future__ import annotations
 
-import json
+import functools
 import os
 import subprocess
-import sys
 import tempfile
 import time
 import textwrap
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
 from anthropic import Anthropic
 
 try:
-    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
 except ImportError:  # pragma: no cover
-    genai = None  # type: ignore
+    glm = None  # type: ignore
 
 try:
     from openai import BadRequestError, OpenAI
@@ -35,6 +36,7 @@ except ImportError:  # pragma: no cover
         """Fallback error type when openai library is unavailable."""
 
 
+from . import json_utils, llm_cache, sandbox
 from .logging_utils import get_logger
 
 os.environ.setdefault("GRPC_VERBOSITY", "ERROR")
@@ -44,6 +46,7 @@ os.environ.setdefault("GOOGLE_CLOUD_DISABLE_ALTS", "1")
 logger = get_logger("coding_competition")
 
 _DEFAULT_TEST_TIMEOUT_S = max(5.0, float(os.getenv("CODING_COMPETITION_TEST_TIMEOUT", "12")))
+_RUNNER_BOOTSTRAP = "import sys; exec(compile(sys.stdin.read(), 'runner.py', 'exec'), {'__name__': '__main__'})"
 
 
 def _extract_python_code(response: str) -> str:
@@ -86,6 +89,7 @@ class ModelInvocation:
     input_tokens: int
     output_tokens: int
     latency_s: float
+    cached: bool = False
 
 
 @dataclass
@@ -96,10 +100,37 @@ class TaskResult:
     stderr: Optional[str] = None
 
 
+# Historical median latency ordering, slowest first; unknown providers go last.
+_PROVIDER_DISPATCH_ORDER = {"gemini": 0, "google": 0, "openai": 1, "anthropic": 2}
+
+
+def _estimated_task_cost(task: Dict[str, Any]) -> float:
+    """Rough wall-time estimate used to order dispatch (larger runs first)."""
+    estimate = task.get("estimated_latency_ms")
+    if estimate is not None:
+        try:
+            return float(estimate)
+        except (TypeError, ValueError):
+            pass
+    # Without an annotation, prompt size plus test count is a serviceable proxy.
+    return float(len(task.get("prompt") or "") + 100 * len(task.get("tests") or []))
+
+
+def _provider_dispatch_rank(cfg: Dict[str, Any]) -> int:
+    provider = (cfg.get("provider") or "anthropic").lower()
+    return _PROVIDER_DISPATCH_ORDER.get(provider, len(_PROVIDER_DISPATCH_ORDER))
+
+
 def _load_tasks() -> List[Dict[str, Any]]:
     if not TASKS_PATH.exists():
         raise CodingBenchError(f"coding competition tasks file missing: {TASKS_PATH}")
-    return json.loads(TASKS_PATH.read_text(encoding="utf-8"))
+    return list(_read_tasks(str(TASKS_PATH), TASKS_PATH.stat().st_mtime_ns))
+
+
+@functools.lru_cache(maxsize=2)
+def _read_tasks(path: str, mtime_ns: int) -> Tuple[Dict[str, Any], ...]:
+    with open(path, "rb") as handle:
+        return tuple(json_utils.loads(handle.read()))
 
 
 def _resolve_api_key(ref: Optional[str], fallback_env: Optional[str]) -> Optional[str]:
@@ -112,7 +143,62 @@ def _resolve_api_key(ref: Optional[str], fallback_env: Optional[str]) -> Optiona
     return None
 
 
+_CLIENT_CACHE: Dict[Tuple[str, str], Any] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_client(provider: str, api_key: str) -> Any:
+    """Return a shared SDK client so pooled connections survive across calls."""
+    key = (provider, api_key)
+    client = _CLIENT_CACHE.get(key)
+    if client is not None:
+        return client
+    with _CLIENT_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            if provider == "anthropic":
+                client = Anthropic(api_key=api_key)
+            elif provider == "gemini":
+                # Per-key clients rather than the process-global genai.configure, which
+                # concurrent calls with different keys would race on.
+                client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+            elif provider == "gemini_models":
+                client = glm.ModelServiceClient(client_options={"api_key": api_key})
+            else:
+                client = OpenAI(api_key=api_key)
+            _CLIENT_CACHE[key] = client
+    return client
+
+
 def _call_model(config: Dict[str, Any], prompt: str, temperature: float) -> ModelInvocation:
+    cache_key = None
+    if not temperature:
+        # Temperature 0 responses are reproducible enough to replay across runs.
+        cache_key = llm_cache.make_key(
+            harness="coding_competition",
+            provider=(config.get("provider") or "anthropic").lower(),
+            model=config.get("name"),
+            system=SYSTEM_PROMPT,
+            prompt=prompt,
+            temperature=0.0,
+        )
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            # No request was made, so there is no latency to report; replays are flagged
+            # and left out of the latency aggregates.
+            return ModelInvocation(**{**cached, "latency_s": 0.0, "cached": True})
+    invocation = _call_provider(config, prompt, temperature)
+    if cache_key is not None and invocation.response:
+        llm_cache.set(cache_key, asdict(invocation))
+    return invocation
+
+
+def _mean_fresh_latency(invocations: Sequence[ModelInvocation]) -> float:
+    fresh = [inv.latency_s for inv in invocations if not inv.cached]
+    return sum(fresh) / len(fresh) if fresh else 0.0
+
+
+def _call_provider(config: Dict[str, Any], prompt: str, temperature: float) -> ModelInvocation:
     provider = (config.get("provider") or "anthropic").lower()
     name = config.get("name")
     if not name:
@@ -123,8 +209,8 @@ def _call_model(config: Dict[str, Any], prompt: str, temperature: float) -> Mode
         api_key = _resolve_api_key(api_key_ref, "ANTHROPIC_API_KEY")
         if not api_key:
             raise CodingBenchError("ANTHROPIC_API_KEY not configured")
-        client = Anthropic(api_key=api_key)
-        t0 = time.time()
+        client = _get_client("anthropic", api_key)
+        t0 = time.perf_counter()
         message = client.messages.create(
             model=name,
             max_tokens=2048,
@@ -132,7 +218,7 @@ def _call_model(config: Dict[str, Any], prompt: str, temperature: float) -> Mode
             messages=[{"role": "user", "content": prompt}],
             system=SYSTEM_PROMPT,
         )
-        latency = time.time() - t0
+        latency = time.perf_counter() - t0
         text = "".join(block.text for block in message.content if getattr(block, "type", "text") == "text")
         usage = getattr(message, "usage", None)
         input_tokens = int(getattr(usage, "input_tokens", 0))
@@ -145,8 +231,8 @@ def _call_model(config: Dict[str, Any], prompt: str, temperature: float) -> Mode
         api_key = _resolve_api_key(api_key_ref, "OPENAI_API_KEY")
         if not api_key:
             raise CodingBenchError("OPENAI_API_KEY not configured")
-        client = OpenAI(api_key=api_key)
-        t0 = time.time()
+        client = _get_client("openai", api_key)
+        t0 = time.perf_counter()
         responses_extra: Dict[str, Any] = {}
         chat_extra: Dict[str, Any] = {}
         if isinstance(name, str) and name.startswith("gpt-5"):
@@ -178,7 +264,7 @@ def _call_model(config: Dict[str, Any], prompt: str, temperature: float) -> Mode
                 max_output_tokens=4096,
                 **responses_extra,
             )
-            latency = time.time() - t0
+            latency = time.perf_counter() - t0
             text = "".join(part.text for part in response.output_text)
             usage = getattr(response, "usage", None)
             input_tokens = int(getattr(usage, "input_tokens", 0))
@@ -198,7 +284,7 @@ def _call_model(config: Dict[str, Any], prompt: str, temperature: float) -> Mode
                 temperature_value=effective_temperature,
                 **request_kwargs,
             )
-            latency = time.time() - t0
+            latency = time.perf_counter() - t0
             text = "".join(choice.message.content or "" for choice in getattr(chat, "choices", []) or [])
             usage = getattr(chat, "usage", None)
             input_tokens = int(getattr(usage, "prompt_tokens", 0))
@@ -206,21 +292,27 @@ def _call_model(config: Dict[str, Any], prompt: str, temperature: float) -> Mode
         return ModelInvocation(name, provider, text, input_tokens, output_tokens, latency)
 
     if provider in {"google", "gemini", "google_gemini"}:
-        if genai is None:
+        if glm is None:
             raise CodingBenchError("google-generativeai package not installed")
         api_key = _resolve_api_key(api_key_ref, "GOOGLE_GEMINI_API_KEY")
         if not api_key:
             raise CodingBenchError("GOOGLE_GEMINI_API_KEY not configured")
-        genai.configure(api_key=api_key)
-        def _build_model(name_candidate: str):
-            full = name_candidate if name_candidate.lower().startswith("models/") else f"models/{name_candidate}"
-            return genai.GenerativeModel(model_name=full, system_instruction=SYSTEM_PROMPT), full
-
-        client, model_name = _build_model(name)
-        generation_config = {"temperature": temperature, "max_output_tokens": 2048}
-        t0 = time.time()
+        client = _get_client("gemini", api_key)
+        generation_config = glm.GenerationConfig(temperature=temperature, max_output_tokens=2048)
+
+        def _generate(full: str):
+            request = glm.GenerateContentRequest(
+                model=full,
+                system_instruction={"parts": [{"text": SYSTEM_PROMPT}]},
+                contents=[{"role": "user", "parts": [{"text": prompt}]}],
+                generation_config=generation_config,
+            )
+            return client.generate_content(request), full
+
+        model_name = name if name.lower().startswith("models/") else f"models/{name}"
+        t0 = time.perf_counter()
         try:
-            response = client.generate_content(prompt, generation_config=generation_config)
+            response, model_name = _generate(model_name)
         except Exception as exc:  # pragma: no cover
             error_text = str(exc).lower()
             if "not found" in error_text or "unsupported" in error_text:
@@ -238,13 +330,13 @@ def _call_model(config: Dict[str, Any], prompt: str, temperature: float) -> Mode
                 discovered = None
                 for fallback in fallback_names:
                     try:
-                        client, model_name = _build_model(fallback)
-                        response = client.generate_content(prompt, generation_config=generation_config)
+                        response, model_name = _generate(fallback)
                         break
                     except Exception:
                         continue
                 else:
                     discovered = _discover_gemini_model(
+                        api_key,
                         [
                             "gemini-2.5-pro-latest",
                             "gemini-2.5-pro",
@@ -255,11 +347,10 @@ def _call_model(config: Dict[str, Any], prompt: str, temperature: float) -> Mode
                     )
                     if not discovered:
                         raise
-                    client, model_name = _build_model(discovered)
-                    response = client.generate_content(prompt, generation_config=generation_config)
+                    response, model_name = _generate(discovered)
             else:
                 raise
-        latency = time.time() - t0
+        latency = time.perf_counter() - t0
         text = getattr(response, "text", None)
         if not text:
             candidates = getattr(response, "candidates", []) or []
@@ -280,98 +371,157 @@ def _call_model(config: Dict[str, Any], prompt: str, temperature: float) -> Mode
             if not parts and blocked:
                 logger.warning("gemini response blocked by safety filters", extra={"model": model_name})
             text = "".join(parts)
-        usage = getattr(response, "usage_metadata", None)
-        input_tokens = 0
-        output_tokens = 0
-        if isinstance(usage, dict):
-            input_tokens = int(usage.get("prompt_token_count", 0))
-            output_tokens = int(usage.get("candidates_token_count", 0))
+        usage = response.usage_metadata
+        input_tokens = int(usage.prompt_token_count)
+        output_tokens = int(usage.candidates_token_count)
         reported = model_name.split("/")[-1] if model_name else name
         return ModelInvocation(reported, "gemini", text or "", input_tokens, output_tokens, latency)
 
     raise CodingBenchError(f"Unsupported provider for coding bench: {provider}")
 
 
-def _run_tests(task: Dict[str, Any], solution: str) -> TaskResult:
+# Test cases travel as data (``_CHECK_STEPS``) and are executed by this fixed loop, so
+# expected values are never spliced into generated source.
+_CHECK_RUNNER = """
+for _step_no, (_kind, _source, _expected, _message) in enumerate(_CHECK_STEPS):
+    if _kind == "script":
+        exec(compile(_source, f"check_{_step_no}.py", "exec"), globals())
+    elif _kind == "raises":
+        _exc_type = eval(_expected, globals())
+        try:
+            eval(_source, globals())
+        except _exc_type as _exc:
+            if _message is not None:
+                assert str(_exc) == _message, f"expected message {_message!r}, got {str(_exc)!r}"
+        else:
+            raise AssertionError(f"Expected {_expected}")
+    else:
+        _value = repr(eval(_source, globals()))
+        assert _value == _expected, f"{_source}: expected {str(_expected)[:200]}, got {_value[:200]}"
+"""
+
+
+def _build_checks(task: Dict[str, Any]) -> List[str]:
     tests = task.get("tests") or []
     if not tests:
         raise CodingBenchError(f"Task {task.get('id')} missing tests")
-    with tempfile.TemporaryDirectory() as td:
-        source = textwrap.dedent(_extract_python_code(solution))
-        path = Path(td) / "solution.py"
-        path.write_text(source, encoding="utf-8")
-        setup = [
-            "import importlib.util, sys",
-            "spec = importlib.util.spec_from_file_location('solution', 'solution.py')",
-            "module = importlib.util.module_from_spec(spec)",
-            "spec.loader.exec_module(module)",
-            "sys.modules['solution'] = module",
-            "globals().update({name: getattr(module, name) for name in dir(module) if not name.startswith('_')})",
-        ]
-        checks = []
-        for idx, case in enumerate(tests):
-            script = case.get("script")
-            if script:
-                if isinstance(script, list):
-                    lines = [str(line) for line in script]
-                else:
-                    lines = str(script).splitlines()
-                checks.extend(lines)
-                continue
-
-            expr = case.get("input")
-            if not expr:
-                continue
-            result_var = f"_result_{idx}"
-            expected = case.get("expected")
-            raises = case.get("raises")
-            message = case.get("message")
-            if raises:
-                checks.append("try:")
-                checks.append(f"    {result_var} = {expr}")
-                checks.append(f"except {raises} as _exc_{idx}:")
-                if message:
-                    checks.append(f"    assert str(_exc_{idx}) == {message!r}, 'expected message {message!r}'")
-                else:
-                    checks.append("    pass")
-                checks.append("else:")
-                checks.append(f"    raise AssertionError('Expected {raises}')")
+    steps: List[Tuple[str, str, Any, Optional[str]]] = []
+    for case in tests:
+        script = case.get("script")
+        if script:
+            if isinstance(script, list):
+                source = "\n".join(str(line) for line in script)
             else:
-                if expected is None:
-                    raise CodingBenchError(f"Test case missing expected value for task {task.get('id')} expression {expr}")
-                checks.extend(
-                    [
-                        f"{result_var} = {expr}",
-                        f"assert repr({result_var}) == {expected!r}",
-                    ]
-                )
-        script = "\n".join([*setup, *checks])
-        runner = Path(td) / "runner.py"
-        runner.write_text(script, encoding="utf-8")
-        started = time.perf_counter()
-        python_bin = os.environ.get("CLAIMSCOPE_PYTHON_BIN") or sys.executable or "python"
-        try:
-            subprocess.run(
-                [python_bin, str(runner)],
-                cwd=td,
-                capture_output=True,
-                text=True,
-                timeout=_DEFAULT_TEST_TIMEOUT_S,
-                check=True,
-            )
-            duration = time.perf_counter() - started
-            return TaskResult(task_id=str(task.get("id")), success=True, test_latency_s=duration)
-        except subprocess.CalledProcessError as exc:  # pragma: no cover
-            duration = time.perf_counter() - started
-            return TaskResult(
-                task_id=str(task.get("id")),
-                success=False,
-                test_latency_s=duration,
-                stderr=exc.stderr or exc.stdout,
-            )
-        except subprocess.TimeoutExpired:  # pragma: no cover
-            duration = time.perf_counter() - started
-            return TaskResult(task_id=str(task.get("id")), success=False, test_latency_s=duration, stderr="timeout")
+                source = str(script)
+            steps.append(("script", source, None, None))
+            continue
+
+        expr = case.get("input")
+        if not expr:
+            continue
+        expected = case.get("expected")
+        raises = case.get("raises")
+        message = case.get("message")
+        if raises:
+            steps.append(("raises", str(expr), str(raises), message or None))
+        else:
+            if expected is None:
+                raise CodingBenchError(f"Test case missing expected value for task {task.get('id')} expression {expr}")
+            steps.append(("expect", str(expr), expected, None))
+    return [f"_CHECK_STEPS = {steps!r}", _CHECK_RUNNER]
+
+
+_CHECK_SCRIPT_CACHE: Dict[Tuple[str, str], str] = {}
+
+
+def _check_script(task: Dict[str, Any]) -> str:
+    """Return the task's check script, building it once per distinct test definition."""
+    key = (str(task.get("id")), json_utils.dumps(task.get("tests") or []))
+    script = _CHECK_SCRIPT_CACHE.get(key)
+    if script is None:
+        script = "\n".join(_build_checks(task))
+        _CHECK_SCRIPT_CACHE[key] = script
+    return script
+
+
+def _run_tests(task: Dict[str, Any], solution: str) -> TaskResult:
+    return _run_tests_batch(task, [solution])[0]
+
+
+def _run_tests_batch(task: Dict[str, Any], solutions: Sequence[str]) -> List[TaskResult]:
+    """Run one task's checks against several solutions in a single dispatch.
+
+    Identical solutions are executed once and the result is shared.
+    """
+    script = _check_script(task)
+    task_id = str(task.get("id"))
+    sources = [textwrap.dedent(_extract_python_code(solution)) for solution in solutions]
+    unique_sources = list(dict.fromkeys(sources))
+    python_bin = os.environ.get("CLAIMSCOPE_PYTHON_BIN")
+    if python_bin:
+        by_source = {
+            source: _run_tests_subprocess(task, python_bin, source, script, time.perf_counter())
+            for source in unique_sources
+        }
+    else:
+        outcomes = sandbox.run_batch(unique_sources, script, _DEFAULT_TEST_TIMEOUT_S)
+        by_source = {
+            source: TaskResult(task_id=task_id, success=passed, test_latency_s=elapsed, stderr=stderr)
+            for source, (passed, stderr, elapsed) in zip(unique_sources, outcomes)
+        }
+    return [by_source[source] for source in sources]
+
+
+def _run_tests_subprocess(
+    task: Dict[str, Any],
+    python_bin: str,
+    source: str,
+    script: str,
+    started: float,
+) -> TaskResult:
+    """Run the checks under an explicitly configured interpreter (CLAIMSCOPE_PYTHON_BIN)."""
+    # The solution is loaded as an in-memory ``solution`` module so the runner can be
+    # streamed over stdin instead of round-tripping through a temporary directory.
+    setup = [
+        "import linecache, sys, types",
+        f"_SOLUTION_SRC = {source!r}",
+        "linecache.cache['solution.py'] = (len(_SOLUTION_SRC), None, _SOLUTION_SRC.splitlines(True), 'solution.py')",
+        "module = types.ModuleType('solution')",
+        "module.__file__ = 'solution.py'",
+        "sys.modules['solution'] = module",
+        "exec(compile(_SOLUTION_SRC, 'solution.py', 'exec'), module.__dict__)",
+        "globals().update({name: getattr(module, name) for name in dir(module) if not name.startswith('_')})",
+    ]
+    payload = "\n".join([*setup, script])
+    # Passing runs print nothing worth keeping, so stdout is discarded and stderr is
+    # only decoded when the runner exits non-zero.
+    # -I ignores PYTHON* env vars and the user site dir; -B skips bytecode writes. -S is
+    # deliberately omitted: the configured interpreter's site-packages may be needed.
+    # The runner starts in the temp dir so stray files from a solution never land in
+    # the worker's checkout.
+    proc = subprocess.Popen(
+        [python_bin, "-I", "-B", "-c", _RUNNER_BOOTSTRAP],
+        cwd=tempfile.gettempdir(),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        _, err = proc.communicate(input=payload.encode("utf-8"), timeout=_DEFAULT_TEST_TIMEOUT_S)
+    except subprocess.TimeoutExpired:  # pragma: no cover
+        proc.kill()
+        proc.wait()
+        duration = time.perf_counter() - started
+        return TaskResult(task_id=str(task.get("id")), success=False, test_latency_s=duration, stderr="timeout")
+    duration = time.perf_counter() - started
+    if proc.returncode != 0:  # pragma: no cover
+        return TaskResult(
+            task_id=str(task.get("id")),
+            success=False,
+            test_latency_s=duration,
+            stderr=err.decode("utf-8", errors="replace"),
+        )
+    return TaskResult(task_id=str(task.get("id")), success=True, test_latency_s=duration)
 
 
 def run_coding_competition(
@@ -421,19 +571,11 @@ def run_coding_competition(
         [None] * num_comparators for _ in range(num_tasks)
     ]
 
-    def _evaluate(
-        task_pos: int,
-        task_data: Dict[str, Any],
-        cfg: Dict[str, Any],
-        comparator_index: int,
-        is_primary: bool,
-    ) -> Tuple[int, bool, int, ModelInvocation, TaskResult]:
-        prompt = task_data.get("prompt")
+    def _invoke(task_data: Dict[str, Any], cfg: Dict[str, Any]) -> Tuple[ModelInvocation, Optional[TaskResult]]:
         model_name = cfg.get("name", "unknown")
         provider = cfg.get("provider", "unknown")
         try:
-            invocation = _call_model(cfg, prompt, temperature)
-            result = _run_tests(task_data, invocation.response)
+            return _call_model(cfg, task_data.get("prompt"), temperature), None
         except Exception as exc:  # pragma: no cover - external API errors dominate here
             logger.exception(
                 "coding_competition model invocation failed",
@@ -451,13 +593,23 @@ def run_coding_competition(
                 output_tokens=0,
                 latency_s=0.0,
             )
-            result = TaskResult(
+            failure = TaskResult(
                 task_id=str(task_data.get("id")),
                 success=False,
                 test_latency_s=0.0,
                 stderr=str(exc)[:500],
             )
-        return task_pos, is_primary, comparator_index, invocation, result
+            return invocation, failure
+
+    def _check(task_data: Dict[str, Any], responses: List[str]) -> List[TaskResult]:
+        try:
+            return _run_tests_batch(task_data, responses)
+        except Exception as exc:  # pragma: no cover - malformed task definitions
+            logger.exception("coding_competition test execution failed", extra={"task": task_data.get("id")})
+            return [
+                TaskResult(task_id=str(task_data.get("id")), success=False, test_latency_s=0.0, stderr=str(exc)[:500])
+                for _ in responses
+            ]
 
     logger.info(
         "coding_competition starting", extra={
@@ -468,70 +620,122 @@ def run_coding_competition(
         }
     )
 
-    futures = []
-    start_time = time.time()
+    start_time = time.perf_counter()
     total_units = total_models * num_tasks
     completed_units = 0
     completed_tasks = 0
     task_finished = [False] * num_tasks
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for task_pos, task in active_tasks:
-            futures.append(
-                executor.submit(
-                    _evaluate,
-                    task_pos,
-                    task,
-                    primary_config,
-                    -1,
-                    True,
-                )
-            )
-            for comp_idx, comparator_cfg in enumerate(comparator_configs):
-                futures.append(
-                    executor.submit(
-                        _evaluate,
-                        task_pos,
-                        task,
-                        comparator_cfg,
-                        comp_idx,
-                        False,
-                    )
-                )
-
-        for future in as_completed(futures):
-            task_pos, is_primary, comparator_index, invocation, result = future.result()
-            target_idx = task_index_lookup.get(task_pos)
-            if target_idx is None:
-                continue
+    # Aliased configs (same provider + model name) share a single request per task
+    # prompt; every slot that asked for it is filled from the one future.
+    inflight: Dict[Tuple[str, str, str, int], Future] = {}
+    future_slots: Dict[Future, List[Tuple[bool, int]]] = {}
+    future_task: Dict[Future, Tuple[int, Dict[str, Any]]] = {}
+    # Tests for a task run as one batch once every model has answered it.
+    requests_outstanding: Dict[int, int] = {}
+    answered: Dict[int, List[Tuple[List[Tuple[bool, int]], ModelInvocation, Optional[TaskResult]]]] = {}
+    check_jobs: Dict[Future, Tuple[int, List[Tuple[List[Tuple[bool, int]], ModelInvocation, Optional[TaskResult]]]]] = {}
+
+    def _record(task_pos: int, slots: List[Tuple[bool, int]], invocation: ModelInvocation, result: TaskResult) -> None:
+        nonlocal completed_units, completed_tasks
+        target_idx = task_index_lookup.get(task_pos)
+        if target_idx is None:
+            return
+        for is_primary, comparator_index in slots:
             if is_primary:
                 primary_invocations[target_idx] = invocation
                 primary_results[target_idx] = result
             else:
                 comparator_invocations[target_idx][comparator_index] = (invocation, result)
 
-            completed_units += 1
-            if target_idx is not None and not task_finished[target_idx]:
-                if primary_results[target_idx] is not None and all(value is not None for value in comparator_invocations[target_idx]):
-                    task_finished[target_idx] = True
-                    completed_tasks += 1
-
-            if progress_callback and completed_units > 0:
-                elapsed = time.time() - start_time
-                remaining_units = max(total_units - completed_units, 0)
-                avg_per_unit = elapsed / completed_units if completed_units else None
-                eta = avg_per_unit * remaining_units if avg_per_unit else None
-                progress_callback(
-                    {
-                        "units_completed": completed_units,
-                        "units_total": total_units,
-                        "tasks_completed": completed_tasks,
-                        "tasks_total": num_tasks,
-                        "elapsed_seconds": elapsed,
-                        "eta_seconds": eta,
-                    }
-                )
+        completed_units += len(slots)
+        if not task_finished[target_idx]:
+            if primary_results[target_idx] is not None and all(value is not None for value in comparator_invocations[target_idx]):
+                task_finished[target_idx] = True
+                completed_tasks += 1
+
+        if progress_callback and completed_units > 0:
+            elapsed = time.perf_counter() - start_time
+            remaining_units = max(total_units - completed_units, 0)
+            avg_per_unit = elapsed / completed_units if completed_units else None
+            eta = avg_per_unit * remaining_units if avg_per_unit else None
+            progress_callback(
+                {
+                    "units_completed": completed_units,
+                    "units_total": total_units,
+                    "tasks_completed": completed_tasks,
+                    "tasks_total": num_tasks,
+                    "elapsed_seconds": elapsed,
+                    "eta_seconds": eta,
+                }
+            )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def _submit(task_pos: int, task: Dict[str, Any], cfg: Dict[str, Any], comparator_index: int, is_primary: bool) -> None:
+            # Only deterministic requests are shared: sampled runs must stay independent draws,
+            # and configs resolving to different API keys (accounts) are never merged.
+            key = (
+                (cfg.get("provider") or "anthropic").lower(),
+                str(cfg.get("name")),
+                str(cfg.get("api_key_ref") or ""),
+                task_pos,
+            )
+            future = None if temperature else inflight.get(key)
+            if future is None:
+                future = executor.submit(_invoke, task, cfg)
+                if not temperature:
+                    inflight[key] = future
+                future_slots[future] = []
+                future_task[future] = (task_pos, task)
+                requests_outstanding[task_pos] = requests_outstanding.get(task_pos, 0) + 1
+            future_slots[future].append((is_primary, comparator_index))
+
+        # Longest-processing-time first: slow tasks and slow providers are queued ahead
+        # so the pool does not sit half idle waiting on a straggler at the tail.
+        dispatch: List[Tuple[int, Dict[str, Any], Dict[str, Any], int, bool]] = []
+        for task_pos, task in active_tasks:
+            dispatch.append((task_pos, task, primary_config, -1, True))
+            for comp_idx, comparator_cfg in enumerate(comparator_configs):
+                dispatch.append((task_pos, task, comparator_cfg, comp_idx, False))
+        dispatch.sort(key=lambda unit: (-_estimated_task_cost(unit[1]), _provider_dispatch_rank(unit[2])))
+        for unit in dispatch:
+            _submit(*unit)
+
+        if len(future_slots) < total_units:
+            logger.info(
+                "coding_competition coalesced duplicate model requests",
+                extra={"requests": len(future_slots), "units": total_units},
+            )
 
-    elapsed_total = time.time() - start_time
+        pending = set(future_slots)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in check_jobs:
+                    task_pos, entries = check_jobs.pop(future)
+                    for (slots, invocation, _), result in zip(entries, future.result()):
+                        _record(task_pos, slots, invocation, result)
+                    continue
+
+                task_pos, task = future_task[future]
+                invocation, failure = future.result()
+                answered.setdefault(task_pos, []).append((future_slots[future], invocation, failure))
+                requests_outstanding[task_pos] -= 1
+                if requests_outstanding[task_pos]:
+                    continue
+                to_test = []
+                for entry in answered.pop(task_pos):
+                    slots, invocation, failure = entry
+                    if failure is not None:
+                        _record(task_pos, slots, invocation, failure)
+                    else:
+                        to_test.append(entry)
+                if to_test:
+                    check_future = executor.submit(_check, task, [entry[1].response for entry in to_test])
+                    check_jobs[check_future] = (task_pos, to_test)
+                    pending.add(check_future)
+
+    elapsed_total = time.perf_counter() - start_time
 
     if progress_callback:
         progress_callback(
@@ -548,7 +752,7 @@ def run_coding_competition(
     logger.info(
         "coding_competition complete",
         extra={
-            "primary_avg_latency": sum(inv.latency_s for inv in primary_invocations) / len(primary_invocations),
+            "primary_avg_latency": _mean_fresh_latency(primary_invocations),
             "primary_avg_test_latency": sum(res.test_latency_s for res in primary_results) / len(primary_results),
         },
     )
@@ -561,18 +765,12 @@ def run_coding_competition(
             if value is None:
                 raise CodingBenchError("comparator evaluation incomplete")
 
-    comparators_summary: List[Dict[str, Any]] = [
-        {
-            "model": cfg.get("name"),
-            "provider": cfg.get("provider"),
-            "passed": 0,
-            "attempted": 0,
-            "input_tokens": 0,
-            "output_tokens": 0,
-            "latencies": [],
-        }
-        for cfg in comparator_configs
-    ]
+    # Comparator aggregates are kept as (task x comparator) arrays and reduced per column.
+    comparator_passed = np.zeros((num_tasks, num_comparators), dtype=bool)
+    comparator_input_tokens = np.zeros((num_tasks, num_comparators), dtype=np.int64)
+    comparator_output_tokens = np.zeros((num_tasks, num_comparators), dtype=np.int64)
+    # Replayed (cached) invocations have no measured latency and stay NaN here.
+    comparator_latencies = np.full((num_tasks, num_comparators), np.nan, dtype=np.float64)
 
     per_task: List[Dict[str, Any]] = []
 
@@ -590,18 +788,17 @@ def run_coding_competition(
                     "output_tokens": primary_invocation.output_tokens,
                     "latency_s": primary_invocation.latency_s,
                     "test_latency_s": primary_result.test_latency_s,
+                    "cached": primary_invocation.cached,
                 },
                 "comparators": [],
             }
 
         for comp_idx, (invocation, result) in enumerate(comparator_invocations[idx]):
-            summary = comparators_summary[comp_idx]
-            summary["attempted"] += 1
-            if result.success:
-                summary["passed"] += 1
-            summary["input_tokens"] += invocation.input_tokens
-            summary["output_tokens"] += invocation.output_tokens
-            summary["latencies"].append(invocation.latency_s)
+            comparator_passed[idx, comp_idx] = result.success
+            comparator_input_tokens[idx, comp_idx] = invocation.input_tokens
+            comparator_output_tokens[idx, comp_idx] = invocation.output_tokens
+            if not invocation.cached:
+                comparator_latencies[idx, comp_idx] = invocation.latency_s
             task_record["comparators"].append(
                 {
                     "model": invocation.model,
@@ -612,6 +809,7 @@ def run_coding_competition(
                     "output_tokens": invocation.output_tokens,
                     "latency_s": invocation.latency_s,
                     "test_latency_s": result.test_latency_s,
+                    "cached": invocation.cached,
                 }
             )
 
@@ -626,16 +824,31 @@ def run_coding_competition(
         "pass_rate": primary_passed / total_tasks if total_tasks else 0.0,
     }
 
-    comparator_outputs = []
-    for summary in comparators_summary:
-        attempted = summary["attempted"] or 1
-        comparator_outputs.append(
-            {
-                **summary,
-                "pass_rate": summary["passed"] / attempted,
-                "avg_latency_s": (sum(summary["latencies"]) / attempted) if summary["latencies"] else 0.0,
-            }
-        )
+    # Every comparator is attempted once per task.
+    attempted = num_tasks
+    passed_counts = comparator_passed.sum(axis=0)
+    input_totals = comparator_input_tokens.sum(axis=0)
+    output_totals = comparator_output_tokens.sum(axis=0)
+    pass_rates = passed_counts / max(attempted, 1)
+    fresh_latencies = ~np.isnan(comparator_latencies)
+    latency_means = np.where(fresh_latencies, comparator_latencies, 0.0).sum(axis=0) / np.maximum(
+        fresh_latencies.sum(axis=0), 1
+    )
+    comparator_outputs = [
+        {
+            "model": cfg.get("name"),
+            "provider": cfg.get("provider"),
+            "passed": int(passed_counts[comp_idx]),
+            "attempted": attempted,
+            "input_tokens": int(input_totals[comp_idx]),
+            "output_tokens": int(output_totals[comp_idx]),
+            "latencies": comparator_latencies[fresh_latencies[:, comp_idx], comp_idx].tolist(),
+            "cached_responses": int(num_tasks - fresh_latencies[:, comp_idx].sum()),
+            "pass_rate": float(pass_rates[comp_idx]),
+            "avg_latency_s": float(latency_means[comp_idx]),
+        }
+        for comp_idx, cfg in enumerate(comparator_configs)
+    ]
 
     return {
         "baseline": baseline_summary,
@@ -655,14 +868,14 @@ _GEMINI_DISCOVERY_TS = 0.0
 _GEMINI_DISCOVERY_TTL = 300.0  # seconds
 
 
-def _discover_gemini_model(preferred: Sequence[str]) -> Optional[str]:
-    if genai is None:
+def _discover_gemini_model(api_key: str, preferred: Sequence[str]) -> Optional[str]:
+    if glm is None:
         return None
     global _GEMINI_DISCOVERY_CACHE, _GEMINI_DISCOVERY_TS
     now = time.time()
     if not _GEMINI_DISCOVERY_CACHE or now - _GEMINI_DISCOVERY_TS > _GEMINI_DISCOVERY_TTL:
         try:
-            models = list(genai.list_models())
+            models = list(_get_client("gemini_models", api_key).list_models(glm.ListModelsRequest()))
         except Exception:  # pragma: no cover - discovery failure is acceptable
             return None
         cache: Dict[str, str] = {}
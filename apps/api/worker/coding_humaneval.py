@@ -1,14 +1,18 @@
+import asyncio
+import functools
 import os
 import time
 import random
-import json
-import tempfile
-import subprocess
+import re
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
 from datasets import load_dataset
-import requests
+import httpx
+import numpy as np
+
+from . import json_utils, llm_cache
+from .sandbox import run_many
 
 DEFAULT_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-20240620")
 API_KEY = os.getenv("ANTHROPIC_API_KEY")
@@ -18,58 +22,34 @@ API_URL = os.getenv("ANTHROPIC_API_URL", "https://api.anthropic.com/v1/messages"
 RETRIABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 521, 522, 523, 524, 525, 526, 527, 529}
 MAX_RETRIES = max(1, int(os.getenv("ANTHROPIC_MAX_RETRIES", "5")))
 BACKOFF_BASE_SECONDS = max(0.1, float(os.getenv("ANTHROPIC_BACKOFF_BASE", "1.0")))
+MAX_CONCURRENCY = max(1, int(os.getenv("HUMANEVAL_CONCURRENCY", "8")))
+ROWS_CACHE_PATH = Path(os.getenv("HUMANEVAL_ROWS_CACHE") or Path.home() / ".claimscope" / "humaneval_rows.json")
 
 SYSTEM_INSTRUCT = (
     "You are a careful coding assistant. Complete the Python function as requested. "
     "Rules: Output only valid Python code for the function body or edits; no explanations or markdown."
 )
 
+# Opening fence line, an optional bare "python" line, the body, then an optional
+# closing fence, all matched in a single pass.
+_FENCE_RE = re.compile(r"\A```[^\n]*(?:\n(?i:python\n)?(.*?))?(?:```)?\Z", re.DOTALL)
+
 USER_TEMPLATE = (
     "Complete this function. Provide only Python code that continues the given prompt.\n\n"
     "<PROMPT>\n{prompt}\n</PROMPT>\n"
 )
+# Split once so each message is plain concatenation; braces in a prompt need no escaping.
+_USER_PREFIX, _, _USER_SUFFIX = USER_TEMPLATE.partition("{prompt}")
 
 
 def _strip_code_fences(text: str) -> str:
     t = text.strip()
-    if t.startswith("```"):
-        # remove first fence
-        t = t.split("\n", 1)[1] if "\n" in t else ""
-        # remove language hint if present (e.g., python)
-        if t.lower().startswith("python\n"):
-            t = t.split("\n", 1)[1] if "\n" in t else ""
-        # remove trailing fence
-        if t.rstrip().endswith("```"):
-            t = t.rstrip()[:-3]
+    match = _FENCE_RE.match(t)
+    if match:
+        t = match.group(1) or ""
     return t.strip()
 
 
-def _run_tests(solution_code: str, test_code: str, timeout_s: int = 15) -> bool:
-    """Run HumanEval test code against the provided solution in an isolated subprocess.
-    Returns True if tests pass with exit code 0, False otherwise.
-    """
-    with tempfile.TemporaryDirectory() as td:
-        tdp = Path(td)
-        (tdp / "solution.py").write_text(solution_code, encoding="utf-8")
-        runner = (
-            "import sys, importlib.util, types\n"
-            "spec = importlib.util.spec_from_file_location('solution', 'solution.py')\n"
-            "mod = importlib.util.module_from_spec(spec)\n"
-            "sys.modules['solution'] = mod\n"
-            "spec.loader.exec_module(mod)\n"
-            "code = open('tests.py','r',encoding='utf-8').read()\n"
-            "g={'__name__':'__main__'}\n"
-            "exec(compile(code, 'tests.py', 'exec'), g, g)\n"
-        )
-        (tdp / "tests.py").write_text(test_code, encoding="utf-8")
-        (tdp / "run.py").write_text(runner, encoding="utf-8")
-        try:
-            proc = subprocess.run(["python", "run.py"], cwd=str(tdp), capture_output=True, text=True, timeout=timeout_s)
-            return proc.returncode == 0
-        except subprocess.TimeoutExpired:
-            return False
-
-
 def _load_humaneval_dataset():
     last_exc = None
     for name in ["openai_humaneval", "openai/humaneval", "nuprl/HumanEval"]:
@@ -82,71 +62,86 @@ def _load_humaneval_dataset():
     raise RuntimeError(f"Failed to load HumanEval dataset: {last_exc}")
 
 
-def run_humaneval_subset(n: int = 25, seed: int = 1234, temperature: float = 0.0, max_tokens: int = 1024) -> Tuple[Dict[str, Any], List[float]]:
-    assert API_KEY, "ANTHROPIC_API_KEY not set"
-
+@functools.lru_cache(maxsize=1)
+def _load_humaneval_rows() -> Tuple[Dict[str, str], ...]:
+    """Return the (prompt, test) columns of the evaluation split, cached in-process and on disk."""
+    if ROWS_CACHE_PATH.exists():
+        try:
+            return tuple(json_utils.loads(ROWS_CACHE_PATH.read_bytes()))
+        except (OSError, ValueError):
+            pass
     ds = _load_humaneval_dataset()
     # Prefer 'test' split if available, else first split
     split = ds["test"] if "test" in ds else list(ds.values())[0]
+    rows = tuple({"prompt": row.get("prompt") or "", "test": row.get("test") or ""} for row in split)
+    try:
+        ROWS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        ROWS_CACHE_PATH.write_text(json_utils.dumps(list(rows)), encoding="utf-8")
+    except OSError:
+        pass
+    return rows
+
+
+async def _request_completion(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    rng: random.Random,
+    base_payload: Dict[str, Any],
+    prompt: str,
+) -> Tuple[float, Dict[str, Any], bool]:
+    """Return ``(latency_s, response, cached)``; replayed responses report no latency."""
+    payload = {
+        **base_payload,
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": _USER_PREFIX + prompt + _USER_SUFFIX}
+                ],
+            }
+        ],
+    }
+    temperature = base_payload["temperature"]
+    max_tokens = base_payload["max_tokens"]
+
+    cache_key = None
+    if not temperature:
+        cache_key = llm_cache.make_key(
+            harness="humaneval",
+            model=DEFAULT_MODEL,
+            system=SYSTEM_INSTRUCT,
+            prompt=prompt,
+            temperature=0.0,
+            max_tokens=max_tokens,
+        )
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return 0.0, cached["data"], True
 
-    idxs = list(range(len(split)))
-    rng = random.Random(seed)
-    rng.shuffle(idxs)
-    idxs = idxs[:n]
-
-    latencies: List[float] = []
-    usage_in = 0
-    usage_out = 0
-    passes = 0
-
-    for i in idxs:
-        row = split[i]
-        prompt = row.get("prompt") or ""
-        test_code = row.get("test") or ""
+    async with semaphore:
         # Ask model for continuation
-        t0 = time.time()
-        # Build request
-        headers = {
-            "x-api-key": API_KEY,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json",
-        }
-        payload = {
-            "model": DEFAULT_MODEL,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "system": SYSTEM_INSTRUCT,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": USER_TEMPLATE.format(prompt=prompt)}
-                    ],
-                }
-            ],
-        }
-
+        t0 = time.perf_counter()
         resp = None
         last_exc: Exception | None = None
         for attempt in range(MAX_RETRIES):
             try:
-                resp = requests.post(API_URL, headers=headers, json=payload, timeout=90)
+                resp = await client.post(API_URL, json=payload)
                 resp.raise_for_status()
                 last_exc = None
                 break
-            except requests.HTTPError as exc:
+            except httpx.HTTPStatusError as exc:
                 status = exc.response.status_code if exc.response is not None else None
                 last_exc = exc
                 if status in RETRIABLE_STATUS and attempt < MAX_RETRIES - 1:
                     delay = BACKOFF_BASE_SECONDS * (2 ** attempt) + rng.random() * 0.5
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
                     continue
                 break
-            except requests.RequestException as exc:
+            except httpx.RequestError as exc:
                 last_exc = exc
                 if attempt < MAX_RETRIES - 1:
                     delay = BACKOFF_BASE_SECONDS * (2 ** attempt) + rng.random() * 0.5
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
                     continue
                 break
 
@@ -154,16 +149,60 @@ def run_humaneval_subset(n: int = 25, seed: int = 1234, temperature: float = 0.0
             raise last_exc
         if resp is None:
             raise RuntimeError("Anthropic request failed without response")
-
-        dt = time.time() - t0
-        latencies.append(dt)
+        latency = time.perf_counter() - t0
         data = resp.json()
+    if cache_key is not None:
+        llm_cache.set(cache_key, {"data": data})
+    return latency, data, False
+
+
+async def run_humaneval_subset_async(
+    n: int = 25, seed: int = 1234, temperature: float = 0.0, max_tokens: int = 1024
+) -> Tuple[Dict[str, Any], List[float]]:
+    assert API_KEY, "ANTHROPIC_API_KEY not set"
+
+    split = _load_humaneval_rows()
+
+    idxs = list(range(len(split)))
+    rng = random.Random(seed)
+    rng.shuffle(idxs)
+    idxs = idxs[:n]
+    rows = [split[i] for i in idxs]
+
+    latencies: List[float] = []
+    usage_in = 0
+    usage_out = 0
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    # Everything but the user message is identical across prompts, so it is built once.
+    headers = {
+        "x-api-key": API_KEY,
+        "anthropic-version": "2023-06-01",
+        "content-type": "application/json",
+    }
+    base_payload = {
+        "model": DEFAULT_MODEL,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "system": SYSTEM_INSTRUCT,
+    }
+    async with httpx.AsyncClient(timeout=90, headers=headers) as client:
+        responses = await asyncio.gather(
+            *(_request_completion(client, semaphore, rng, base_payload, row.get("prompt") or "") for row in rows)
+        )
+
+    jobs: List[Tuple[str, str]] = []
+    cached_responses = 0
+    for row, (dt, data, cached) in zip(rows, responses):
+        prompt = row.get("prompt") or ""
+        # Replayed responses were not timed, so they stay out of the latency series.
+        if cached:
+            cached_responses += 1
+        else:
+            latencies.append(dt)
         text = "".join([blk.get("text", "") for blk in data.get("content", []) if blk.get("type") == "text"])
         completion = _strip_code_fences(text)
-        solution_code = f"{prompt}{completion}\n"
-        ok = _run_tests(solution_code, test_code, timeout_s=20)
-        if ok:
-            passes += 1
+        jobs.append((f"{prompt}{completion}\n", row.get("test") or ""))
         usage = data.get("usage", {})
         try:
             usage_in += int(usage.get("input_tokens", 0))
@@ -171,9 +210,15 @@ def run_humaneval_subset(n: int = 25, seed: int = 1234, temperature: float = 0.0
         except Exception:
             pass
 
+    # Every sample's tests run concurrently across the sandbox pool.
+    passes = sum(1 for ok, _, _ in run_many(jobs, 20) if ok)
+
     acc = passes / len(idxs) if idxs else 0.0
-    lat_sorted = sorted(latencies)
-    p95 = lat_sorted[int(0.95 * (len(lat_sorted) - 1))] if latencies else 0.0
+    p95 = 0.0
+    if latencies:
+        # Same nearest-rank index as a full sort, selected in O(n).
+        k = int(0.95 * (len(latencies) - 1))
+        p95 = float(np.partition(np.asarray(latencies), k)[k])
 
     cost = 0.0
     if PRICE_IN or PRICE_OUT:
@@ -188,7 +233,12 @@ def run_humaneval_subset(n: int = 25, seed: int = 1234, temperature: float = 0.0
                 "tokens_prompt": usage_in,
                 "tokens_output": usage_out,
                 "cost_usd": round(cost, 5),
+                "cached_responses": cached_responses,
             },
         },
         latencies,
     )
+
+
+def run_humaneval_subset(n: int = 25, seed: int = 1234, temperature: float = 0.0, max_tokens: int = 1024) -> Tuple[Dict[str, Any], List[float]]:
+    return asyncio.run(run_humaneval_subset_async(n=n, seed=seed, temperature=temperature, max_tokens=max_tokens))
@@ -9,6 +9,7 @@ for smoke testing.
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 import random
@@ -18,6 +19,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
+
+from . import json_utils
 from .logging_utils import get_logger
 
 logger = get_logger("swebench")
@@ -49,22 +53,29 @@ class FixtureLoader:
         path = self.base_path / name
         if not path.exists():
             raise FileNotFoundError(f"Fixture {name} not found under {self.base_path}")
-        cases: List[EvaluationCase] = []
-        with path.open("r", encoding="ascii") as handle:
-            for line in handle:
-                line = line.strip()
-                if not line:
-                    continue
-                payload = json.loads(line)
-                cases.append(
-                    EvaluationCase(
-                        instance_id=payload["instance_id"],
-                        repo=payload.get("repo", "unknown"),
-                        total_tests=int(payload.get("total_tests", 0)),
-                        passing_tests=int(payload.get("passing_tests", 0)),
-                    )
+        # Callers shuffle the result in place, so hand out a fresh list each time.
+        return list(_parse_fixture(str(path), path.stat().st_mtime_ns))
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_fixture(path: str, mtime_ns: int) -> Tuple[EvaluationCase, ...]:
+    """Parse a JSONL fixture; the mtime in the cache key invalidates edited files."""
+    cases: List[EvaluationCase] = []
+    with open(path, "rb") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            payload = json_utils.loads(line)
+            cases.append(
+                EvaluationCase(
+                    instance_id=payload["instance_id"],
+                    repo=payload.get("repo", "unknown"),
+                    total_tests=int(payload.get("total_tests", 0)),
+                    passing_tests=int(payload.get("passing_tests", 0)),
                 )
-        return cases
+            )
+    return tuple(cases)
 
 
 class SwebenchRunner:
@@ -115,18 +126,20 @@ class SwebenchRunner:
             cmd.extend(["--timeout", str(timeout)])
 
         logger.info("Running SWE-bench CLI: %s", " ".join(cmd))
-        t0 = time.time()
-        proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        dt = time.time() - t0
+        t0 = time.perf_counter()
+        # Keep stdout as raw bytes: orjson parses them directly, skipping a text decode
+        # and the intermediate stripped copy of a potentially large report.
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output, errors = proc.communicate()
+        dt = time.perf_counter() - t0
         if proc.returncode != 0:
-            logger.error("SWE-bench CLI failed: %s", proc.stderr[:512])
+            logger.error("SWE-bench CLI failed: %s", errors[:512].decode("utf-8", errors="replace"))
             raise RuntimeError(f"SWE-bench CLI failed with exit code {proc.returncode}")
 
-        output = proc.stdout.strip()
         try:
-            payload = json.loads(output) if output else {}
+            payload = json_utils.loads(output) if output.strip() else {}
         except json.JSONDecodeError as exc:
-            logger.exception("Unable to parse SWE-bench CLI output: %s", output[:256])
+            logger.exception("Unable to parse SWE-bench CLI output: %r", output[:256])
             raise RuntimeError("SWE-bench CLI produced invalid JSON") from exc
 
         latencies = payload.get("latencies") or [dt]
@@ -150,35 +163,32 @@ class SwebenchRunner:
         rng = random.Random(seed)
         rng.shuffle(cases)
         selected = cases[:limit] if limit else cases
-        latencies: List[float] = []
-        passed = 0
-        evaluated_cases = []
-        for case in selected:
-            # Deterministic pseudo latency centred around 18 seconds per run.
-            millis = 16000 + (case.total_tests * 350)
-            jitter = rng.randint(0, 1500)
-            latency = (millis + jitter) / 1000.0
-            latencies.append(latency)
-            verdict = case.passed
-            passed += int(verdict)
-            evaluated_cases.append(
-                {
-                    "instance_id": case.instance_id,
-                    "repo": case.repo,
-                    "passed": verdict,
-                    "total_tests": case.total_tests,
-                    "passing_tests": case.passing_tests,
-                }
-            )
         n = len(selected)
+        # Deterministic pseudo latency centred around 18 seconds per run.
+        total_tests = np.fromiter((case.total_tests for case in selected), dtype=np.int64, count=n)
+        jitter = np.fromiter((rng.randint(0, 1500) for _ in range(n)), dtype=np.int64, count=n)
+        latency_arr = (16000 + total_tests * 350 + jitter) / 1000.0
+        verdicts = np.fromiter((case.passed for case in selected), dtype=bool, count=n)
+        passed = int(verdicts.sum())
+        evaluated_cases = [
+            {
+                "instance_id": case.instance_id,
+                "repo": case.repo,
+                "passed": bool(verdict),
+                "total_tests": case.total_tests,
+                "passing_tests": case.passing_tests,
+            }
+            for case, verdict in zip(selected, verdicts)
+        ]
+        latencies: List[float] = latency_arr.tolist()
         accuracy = passed / n if n else 0.0
-        lat_sorted = sorted(latencies)
-        p95 = lat_sorted[int(0.95 * (len(lat_sorted) - 1))] if latencies else 0.0
+        # ``lower`` keeps the historical sorted()[int(0.95 * (n - 1))] nearest-rank value.
+        p95 = float(np.percentile(latency_arr, 95, method="lower")) if n else 0.0
         result = {
             "score_value": accuracy,
             "n": n,
             "ops": {
-                "wall_time_s": round(sum(latencies), 3),
+                "wall_time_s": round(float(latency_arr.sum()), 3),
                 "p95_latency_s": round(p95, 3),
                 "cost_usd": 0.0,
             },
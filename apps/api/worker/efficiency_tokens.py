@@ -12,23 +12,32 @@ claim settings must supply comparator configurations under
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import operator
 import os
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from anthropic import Anthropic
 
 try:
-    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
 except ImportError:  # pragma: no cover - optional dependency
-    genai = None  # type: ignore
+    glm = None  # type: ignore
 
 try:
     from openai import OpenAI
 except ImportError:  # pragma: no cover - optional dependency
     OpenAI = None  # type: ignore
 
+from . import llm_cache
+
+_MAX_CONCURRENCY = max(1, int(os.getenv("TELEMETRY_CONCURRENCY", "8")))
+_CACHE_ENABLED = os.getenv("CLAIMSCOPE_TELEMETRY_CACHE", "1").lower() not in {"0", "false", "off", "no"}
+
 
 class TokenTelemetryError(RuntimeError):
     """Raised when the telemetry harness cannot complete."""
@@ -42,6 +51,10 @@ class TelemetryResult:
     output_tokens: int
     total_tokens: int
     latency_s: float
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    # True when replayed from the LLM cache; such results carry no measured latency.
+    cached: bool = False
 
 
 def _resolve_api_key(ref: Optional[str], fallback_env: Optional[str] = None) -> Optional[str]:
@@ -54,16 +67,48 @@ def _resolve_api_key(ref: Optional[str], fallback_env: Optional[str] = None) ->
     return None
 
 
-def _call_anthropic(model: str, prompt: str, api_key: str, *, temperature: float, max_tokens: int) -> TelemetryResult:
-    client = Anthropic(api_key=api_key)
-    t0 = time.time()
+@functools.lru_cache(maxsize=8)
+def _get_anthropic(api_key: str) -> Anthropic:
+    return Anthropic(api_key=api_key)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_openai(api_key: str) -> "OpenAI":
+    return OpenAI(api_key=api_key)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_gemini_client(api_key: str) -> Any:
+    # One client per key instead of the process-global genai.configure, which
+    # concurrent calls with different keys would race on.
+    return glm.GenerativeServiceClient(client_options={"api_key": api_key})
+
+
+def _call_anthropic(
+    model: str,
+    prompt: str,
+    api_key: str,
+    *,
+    temperature: float,
+    max_tokens: int,
+    system: Optional[str] = None,
+) -> TelemetryResult:
+    client = _get_anthropic(api_key)
+    request: Dict[str, Any] = {}
+    if system:
+        # The shared prefix is identical across prompts; marking it cacheable lets
+        # Anthropic bill repeat reads at the cached-input rate.
+        request["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        request["extra_headers"] = {"anthropic-beta": "prompt-caching-2024-07-31"}
+    t0 = time.perf_counter()
     response = client.messages.create(
         model=model,
         max_tokens=max_tokens,
         temperature=temperature,
         messages=[{"role": "user", "content": prompt}],
+        **request,
     )
-    latency = time.time() - t0
+    latency = time.perf_counter() - t0
     usage = getattr(response, "usage", None)
     input_tokens = int(getattr(usage, "input_tokens", 0))
     output_tokens = int(getattr(usage, "output_tokens", 0))
@@ -75,21 +120,29 @@ def _call_anthropic(model: str, prompt: str, api_key: str, *, temperature: float
         output_tokens=output_tokens,
         total_tokens=total_tokens,
         latency_s=latency,
+        cache_read_input_tokens=int(getattr(usage, "cache_read_input_tokens", None) or 0),
+        cache_creation_input_tokens=int(getattr(usage, "cache_creation_input_tokens", None) or 0),
     )
 
 
-def _call_openai(model: str, prompt: str, api_key: str, *, temperature: float, max_tokens: int) -> TelemetryResult:
-    if OpenAI is None:
-        raise TokenTelemetryError("openai python package not installed; cannot call OpenAI provider")
-    client = OpenAI(api_key=api_key)
-    t0 = time.time()
+def _call_openai(
+    model: str,
+    prompt: str,
+    api_key: str,
+    *,
+    temperature: float,
+    max_tokens: int,
+    system: Optional[str] = None,
+) -> TelemetryResult:
+    client = _get_openai(api_key)
+    t0 = time.perf_counter()
     response = client.responses.create(
         model=model,
-        input=prompt,
+        input=f"{system}\n\n{prompt}" if system else prompt,
         temperature=temperature,
         max_output_tokens=max_tokens,
     )
-    latency = time.time() - t0
+    latency = time.perf_counter() - t0
     usage = getattr(response, "usage", None)
     input_tokens = int(getattr(usage, "input_tokens", 0))
     output_tokens = int(getattr(usage, "output_tokens", 0))
@@ -104,23 +157,28 @@ def _call_openai(model: str, prompt: str, api_key: str, *, temperature: float, m
     )
 
 
-def _call_gemini(model: str, prompt: str, api_key: str, *, temperature: float, max_tokens: int) -> TelemetryResult:
-    if genai is None:
-        raise TokenTelemetryError("google-generativeai package not installed; cannot call Gemini provider")
-    genai.configure(api_key=api_key)
-    client = genai.GenerativeModel(model_name=model)
-    generation_config = {"temperature": temperature, "max_output_tokens": max_tokens}
-    t0 = time.time()
-    response = client.generate_content(prompt, generation_config=generation_config)
-    latency = time.time() - t0
-    usage = getattr(response, "usage_metadata", None)
-    if isinstance(usage, dict):
-        input_tokens = int(usage.get("prompt_token_count", 0))
-        output_tokens = int(usage.get("candidates_token_count", 0))
-        total_tokens = int(usage.get("total_token_count", input_tokens + output_tokens))
-    else:
-        input_tokens = output_tokens = 0
-        total_tokens = 0
+def _call_gemini(
+    model: str,
+    prompt: str,
+    api_key: str,
+    *,
+    temperature: float,
+    max_tokens: int,
+    system: Optional[str] = None,
+) -> TelemetryResult:
+    client = _get_gemini_client(api_key)
+    request = glm.GenerateContentRequest(
+        model=model if model.startswith("models/") else f"models/{model}",
+        contents=[{"role": "user", "parts": [{"text": f"{system}\n\n{prompt}" if system else prompt}]}],
+        generation_config=glm.GenerationConfig(temperature=temperature, max_output_tokens=max_tokens),
+    )
+    t0 = time.perf_counter()
+    response = client.generate_content(request)
+    latency = time.perf_counter() - t0
+    usage = response.usage_metadata
+    input_tokens = int(usage.prompt_token_count)
+    output_tokens = int(usage.candidates_token_count)
+    total_tokens = int(usage.total_token_count or input_tokens + output_tokens)
     return TelemetryResult(
         model=model,
         provider="gemini",
@@ -131,58 +189,169 @@ def _call_gemini(model: str, prompt: str, api_key: str, *, temperature: float, m
     )
 
 
+# Providers are registered only when their SDK imported, so per-call paths never
+# re-check availability. Each entry is (call, default API key environment variable).
+_PROVIDER_DISPATCH: Dict[str, Tuple[Callable[..., TelemetryResult], str]] = {
+    "anthropic": (_call_anthropic, "ANTHROPIC_API_KEY"),
+}
+_MISSING_SDK: Dict[str, str] = {}
+if OpenAI is not None:
+    _PROVIDER_DISPATCH["openai"] = (_call_openai, "OPENAI_API_KEY")
+else:  # pragma: no cover - optional dependency
+    _MISSING_SDK["openai"] = "openai python package not installed; cannot call OpenAI provider"
+for _alias in ("google", "gemini", "google_gemini"):
+    if glm is not None:
+        _PROVIDER_DISPATCH[_alias] = (_call_gemini, "GOOGLE_GEMINI_API_KEY")
+    else:  # pragma: no cover - optional dependency
+        _MISSING_SDK[_alias] = "google-generativeai package not installed; cannot call Gemini provider"
+
+
+def _shared_prefix(config: Dict[str, Any]) -> Optional[str]:
+    """Stable text sent ahead of every prompt (``system_prefix`` then ``shared_context``)."""
+    parts = [config.get(field) for field in ("system_prefix", "shared_context")]
+    return "\n\n".join(part for part in parts if part) or None
+
+
 def _call_model(config: Dict[str, Any], prompt: str, *, temperature: float, max_tokens: int) -> TelemetryResult:
+    cache_key = None
+    if _CACHE_ENABLED and not temperature:
+        # Deterministic replays reuse the recorded usage and latency instead of re-billing.
+        cache_key = llm_cache.make_key(
+            harness="efficiency_telemetry",
+            provider=(config.get("provider") or "anthropic").lower(),
+            model=config.get("name"),
+            system=_shared_prefix(config),
+            prompt=prompt,
+            temperature=0.0,
+            max_tokens=max_tokens,
+        )
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return TelemetryResult(**{**cached, "latency_s": 0.0, "cached": True})
+    result = _call_provider(config, prompt, temperature=temperature, max_tokens=max_tokens)
+    if cache_key is not None:
+        llm_cache.set(cache_key, asdict(result))
+    return result
+
+
+def _call_provider(config: Dict[str, Any], prompt: str, *, temperature: float, max_tokens: int) -> TelemetryResult:
     provider = (config.get("provider") or "anthropic").lower()
     name = config.get("name")
     if not name:
         raise TokenTelemetryError("model name missing from configuration")
-    api_key_ref = config.get("api_key_ref")
-    if provider == "anthropic":
-        api_key = _resolve_api_key(api_key_ref, "ANTHROPIC_API_KEY")
-        if not api_key:
-            raise TokenTelemetryError("ANTHROPIC_API_KEY not configured for telemetry run")
-        return _call_anthropic(name, prompt, api_key, temperature=temperature, max_tokens=max_tokens)
-    if provider == "openai":
-        api_key = _resolve_api_key(api_key_ref, "OPENAI_API_KEY")
-        if not api_key:
-            raise TokenTelemetryError("OPENAI_API_KEY not configured for telemetry run")
-        return _call_openai(name, prompt, api_key, temperature=temperature, max_tokens=max_tokens)
-    if provider in {"google", "gemini", "google_gemini"}:
-        api_key = _resolve_api_key(api_key_ref, "GOOGLE_GEMINI_API_KEY")
-        if not api_key:
-            raise TokenTelemetryError("GOOGLE_GEMINI_API_KEY not configured for telemetry run")
-        return _call_gemini(name, prompt, api_key, temperature=temperature, max_tokens=max_tokens)
-    raise TokenTelemetryError(f"Unsupported provider for telemetry: {provider}")
+    entry = _PROVIDER_DISPATCH.get(provider)
+    if entry is None:
+        raise TokenTelemetryError(_MISSING_SDK.get(provider) or f"Unsupported provider for telemetry: {provider}")
+    call, key_env = entry
+    api_key = _resolve_api_key(config.get("api_key_ref"), key_env)
+    if not api_key:
+        raise TokenTelemetryError(f"{key_env} not configured for telemetry run")
+    return call(
+        name,
+        prompt,
+        api_key,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        system=_shared_prefix(config),
+    )
+
+
+async def _collect_results(
+    prompts: Sequence[str],
+    model_configs: Sequence[Dict[str, Any]],
+    *,
+    temperature: float,
+    max_tokens: int,
+) -> List[List[TelemetryResult]]:
+    """Issue every (prompt, model) call concurrently, bounded by TELEMETRY_CONCURRENCY.
+
+    Results keep the sequential layout: one list per prompt, primary first.
+    """
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENCY)
+
+    async def _one(config: Dict[str, Any], prompt: str) -> TelemetryResult:
+        async with semaphore:
+            return await asyncio.to_thread(_call_model, config, prompt, temperature=temperature, max_tokens=max_tokens)
+
+    per_prompt = [asyncio.gather(*(_one(config, prompt) for config in model_configs)) for prompt in prompts]
+    return [list(results) for results in await asyncio.gather(*per_prompt)]
+
+
+def _collect_results_threaded(
+    prompts: Sequence[str],
+    model_configs: Sequence[Dict[str, Any]],
+    *,
+    temperature: float,
+    max_tokens: int,
+) -> List[List[TelemetryResult]]:
+    """Thread-pool variant of :func:`_collect_results` with the same result layout."""
+    with ThreadPoolExecutor(max_workers=_MAX_CONCURRENCY) as executor:
+        # Submit everything before waiting on any result so calls overlap.
+        futures = [
+            [
+                executor.submit(_call_model, config, prompt, temperature=temperature, max_tokens=max_tokens)
+                for config in model_configs
+            ]
+            for prompt in prompts
+        ]
+        return [[future.result() for future in prompt_futures] for prompt_futures in futures]
+
+
+_USAGE_FIELDS = operator.attrgetter(
+    "input_tokens",
+    "output_tokens",
+    "total_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+    "latency_s",
+)
 
 
 def _summarise(results: Sequence[Sequence[TelemetryResult]]) -> Dict[str, Any]:
-    out: Dict[str, Any] = {
-        "requests": 0,
-        "input_tokens": 0,
-        "output_tokens": 0,
-        "total_tokens": 0,
-        "latencies": [],
-    }
+    input_tokens = output_tokens = total_tokens = cache_read = cache_creation = 0
+    per_prompt: List[Dict[str, Any]] = []
+    latencies: List[float] = []
+    cached_requests = 0
     for prompt_results in results:
         if not prompt_results:
             continue
         # index 0 is always the primary run
         primary = prompt_results[0]
-        out["requests"] += 1
-        out["input_tokens"] += primary.input_tokens
-        out["output_tokens"] += primary.output_tokens
-        out["total_tokens"] += primary.total_tokens
-        out.setdefault("per_prompt", []).append(
+        p_in, p_out, p_total, p_read, p_creation, latency = _USAGE_FIELDS(primary)
+        input_tokens += p_in
+        output_tokens += p_out
+        total_tokens += p_total
+        cache_read += p_read
+        cache_creation += p_creation
+        per_prompt.append(
             {
                 "model": primary.model,
                 "provider": primary.provider,
-                "input_tokens": primary.input_tokens,
-                "output_tokens": primary.output_tokens,
-                "total_tokens": primary.total_tokens,
-                "latency_s": primary.latency_s,
+                "input_tokens": p_in,
+                "output_tokens": p_out,
+                "total_tokens": p_total,
+                "cache_read_input_tokens": p_read,
+                "cache_creation_input_tokens": p_creation,
+                "latency_s": latency,
+                "cached": primary.cached,
             }
         )
-        out["latencies"].append(primary.latency_s)
+        if primary.cached:
+            cached_requests += 1
+        else:
+            latencies.append(latency)
+    out: Dict[str, Any] = {
+        "requests": len(per_prompt),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": total_tokens,
+        "cache_read_input_tokens": cache_read,
+        "cache_creation_input_tokens": cache_creation,
+        "cached_requests": cached_requests,
+        "latencies": latencies,
+    }
+    if per_prompt:
+        out["per_prompt"] = per_prompt
     return out
 
 
@@ -194,12 +363,13 @@ def run_efficiency_telemetry(
     temperature: float = 0.0,
     max_output_tokens: int = 1024,
 ) -> Dict[str, Any]:
-    if not prompts:
+    # Normalise once up front; a generator or all-blank bundle is caught here too.
+    cleaned_prompts = tuple(prompt for prompt in (raw.strip() for raw in prompts or ()) if prompt)
+    if not cleaned_prompts:
         raise TokenTelemetryError("telemetry prompts are required")
     if not comparator_configs:
         raise TokenTelemetryError("at least one comparator configuration is required")
 
-    per_prompt_results: List[List[TelemetryResult]] = []
     comparator_totals = [
         {
             "model": cfg.get("name"),
@@ -207,39 +377,39 @@ def run_efficiency_telemetry(
             "input_tokens": 0,
             "output_tokens": 0,
             "total_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cached_requests": 0,
             "latencies": [],
         }
         for cfg in comparator_configs
     ]
 
-    for raw_prompt in prompts:
-        prompt = raw_prompt.strip()
-        if not prompt:
-            continue
-        prompt_results: List[TelemetryResult] = []
-
-        primary = _call_model(
-            primary_config,
-            prompt,
-            temperature=temperature,
-            max_tokens=max_output_tokens,
+    model_configs = [primary_config, *comparator_configs]
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        per_prompt_results = asyncio.run(
+            _collect_results(cleaned_prompts, model_configs, temperature=temperature, max_tokens=max_output_tokens)
+        )
+    else:
+        # asyncio.run cannot nest inside a caller's event loop; fan out on threads instead.
+        per_prompt_results = _collect_results_threaded(
+            cleaned_prompts, model_configs, temperature=temperature, max_tokens=max_output_tokens
         )
-        prompt_results.append(primary)
-
-        for index, comparator_cfg in enumerate(comparator_configs):
-            comparator = _call_model(
-                comparator_cfg,
-                prompt,
-                temperature=temperature,
-                max_tokens=max_output_tokens,
-            )
-            prompt_results.append(comparator)
+
+    for prompt_results in per_prompt_results:
+        for index, comparator in enumerate(prompt_results[1:]):
             comparator_totals[index]["input_tokens"] += comparator.input_tokens
             comparator_totals[index]["output_tokens"] += comparator.output_tokens
             comparator_totals[index]["total_tokens"] += comparator.total_tokens
-            comparator_totals[index]["latencies"].append(comparator.latency_s)
-
-        per_prompt_results.append(prompt_results)
+            comparator_totals[index]["cache_read_input_tokens"] += comparator.cache_read_input_tokens
+            comparator_totals[index]["cache_creation_input_tokens"] += comparator.cache_creation_input_tokens
+            # Replayed results were not timed, so only fresh ones feed the latency series.
+            if comparator.cached:
+                comparator_totals[index]["cached_requests"] += 1
+            else:
+                comparator_totals[index]["latencies"].append(comparator.latency_s)
 
     primary_summary = _summarise(per_prompt_results)
     total_primary_output = primary_summary["output_tokens"] or 1  # avoid div by zero
@@ -252,7 +422,7 @@ def run_efficiency_telemetry(
             savings_pct = (1 - (total_primary_output / output_tokens)) * 100.0
         comparator_summaries.append({
             **totals,
-            "requests": len(totals["latencies"]),
+            "requests": len(totals["latencies"]) + totals["cached_requests"],
             "savings_pct": savings_pct,
         })
 
@@ -3,24 +3,57 @@
 from __future__ import annotations
 
 import base64
-import json
+import collections
+import hashlib
+import itertools
 import os
 import shutil
 import subprocess
 import tempfile
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, BinaryIO, Deque, Dict, Iterator, List, Optional, Tuple
 import zipfile
 
+import numpy as np
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+except ImportError:  # pragma: no cover - optional dependency
+    boto3 = None  # type: ignore
+
+from . import json_utils
+from .logging_utils import get_logger
 from .trace_manifest import compute_digest
 
+logger = get_logger("cgui")
+
 REPO_ROOT = Path(__file__).resolve().parents[3]
 PACKAGE_DIR = REPO_ROOT / "packages" / "harness" / "cgui"
 CONFIG_PATH = PACKAGE_DIR / "playwright.config.ts"
 REPORT_PATH = PACKAGE_DIR / "playwright-report.json"
 TEST_RESULTS_DIR = PACKAGE_DIR / "test-results"
 PLAYWRIGHT_MARKER = PACKAGE_DIR / ".playwright-installed"
+DIGEST_CACHE_PATH = Path(os.getenv("CGUI_DIGEST_CACHE") or Path.home() / ".claimscope" / "cgui_digests.json")
+TESTS_DIR = PACKAGE_DIR / "tests"
+WEB_APP_DIR = REPO_ROOT / "apps" / "web" / "app" / "cgui"
+STATIC_DIR = REPO_ROOT / "apps" / "web" / "public" / "cgui"
+# Playwright traces are zip archives and screenshots/videos are already compressed;
+# deflating them again costs CPU for no size benefit.
+_PRECOMPRESSED_SUFFIXES = frozenset({".zip", ".png", ".jpg", ".jpeg", ".webm", ".webp", ".gz"})
+_OUTPUT_TAIL_LINES = 200
+# Bundles larger than this are uploaded when CLAIMSCOPE_TRACE_BUCKET is configured.
+_INLINE_MAX_BYTES = int(os.getenv("CLAIMSCOPE_TRACE_INLINE_MAX_BYTES", str(2 * 1024 * 1024)))
+_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+# Set once npm/Playwright dependencies are verified, along with the package-lock.json
+# mtime they were verified against.
+_DEPS_READY = False
+_DEPS_LOCK_MTIME: Optional[int] = None
+_DIGEST_LOCK = threading.Lock()
+_DIGEST_CACHE: Optional[Dict[str, Any]] = None
+_NO_RESULTS: Tuple[Dict[str, Any], ...] = ({},)
 
 
 @dataclass
@@ -32,8 +65,21 @@ class TestResult:
 
 
 def _ensure_dependencies(env: Dict[str, str]) -> None:
+    global _DEPS_READY, _DEPS_LOCK_MTIME
+    lockfile = PACKAGE_DIR / "package-lock.json"
+    lock_mtime = lockfile.stat().st_mtime_ns if lockfile.exists() else None
+    # Once verified, later runs in this worker skip the checks until the lockfile changes.
+    if _DEPS_READY and _DEPS_LOCK_MTIME == lock_mtime:
+        return
+
     node_modules = PACKAGE_DIR / "node_modules"
-    if not node_modules.exists():
+    installed_lock = node_modules / ".package-lock.json"
+    stale = (
+        lock_mtime is not None
+        and installed_lock.exists()
+        and installed_lock.stat().st_mtime_ns < lock_mtime
+    )
+    if not node_modules.exists() or stale:
         subprocess.run(["npm", "install"], cwd=PACKAGE_DIR, check=True, env=env)
 
     if not PLAYWRIGHT_MARKER.exists():
@@ -44,25 +90,32 @@ def _ensure_dependencies(env: Dict[str, str]) -> None:
             env=env,
         )
         PLAYWRIGHT_MARKER.write_text("chromium\n", encoding="utf-8")
+    _DEPS_READY = True
+    _DEPS_LOCK_MTIME = lock_mtime
 
 
 def _collect_results() -> List[TestResult]:
     if not REPORT_PATH.exists():
         raise FileNotFoundError("playwright-report.json not found")
-    with REPORT_PATH.open("r", encoding="utf-8") as fh:
-        report = json.load(fh)
+    report = json_utils.loads(REPORT_PATH.read_bytes())
 
     collected: List[TestResult] = []
-
-    def walk(suite: Dict[str, Any]) -> None:
-        for child in suite.get("suites", []):
-            walk(child)
-        for spec in suite.get("specs", []):
+    append = collected.append
+    # Iterative post-order walk: a suite's child suites are collected before its own
+    # specs, matching the report order without recursing on deeply nested reports.
+    stack: List[Tuple[Dict[str, Any], bool]] = [(report.get("suites", [report])[0], False)]
+    while stack:
+        suite, expanded = stack.pop()
+        if not expanded:
+            stack.append((suite, True))
+            stack.extend((child, False) for child in reversed(suite.get("suites") or ()))
+            continue
+        for spec in suite.get("specs") or ():
             test_name = spec.get("title", "")
-            for test in spec.get("tests", []):
+            for test in spec.get("tests") or ():
                 # Only track first result (no retries configured)
-                result = test.get("results", [{}])[0]
-                collected.append(
+                result = (test.get("results") or _NO_RESULTS)[0]
+                append(
                     TestResult(
                         name=test_name,
                         status=result.get("status", "unknown"),
@@ -71,7 +124,6 @@ def _collect_results() -> List[TestResult]:
                     )
                 )
 
-    walk(report.get("suites", [report])[0])
     if not collected and "suites" not in report:
         # fallback for single suite reports
         for spec in report.get("specs", []):
@@ -87,7 +139,31 @@ def _collect_results() -> List[TestResult]:
     return collected
 
 
-def _bundle_traces(results: List[TestResult]) -> Tuple[str, int]:
+class _HashingWriter:
+    """Write-only stream that hashes bytes on their way to ``inner``.
+
+    It deliberately has no ``seek`` so ZipFile streams entries with data descriptors
+    instead of patching earlier headers, keeping the digest equal to the final file.
+    """
+
+    def __init__(self, inner: BinaryIO) -> None:
+        self.inner = inner
+        self.digest = hashlib.sha256()
+        self._offset = 0
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        self._offset += len(data)
+        return self.inner.write(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        self.inner.flush()
+
+
+def _bundle_traces(results: List[TestResult]) -> Tuple[str, int, Optional[str]]:
     trace_paths: List[Path] = []
     for result in results:
         for attachment in result.attachments:
@@ -98,23 +174,119 @@ def _bundle_traces(results: List[TestResult]) -> Tuple[str, int]:
                 trace_paths.append(raw_path)
 
     if not trace_paths:
-        return "", 0
+        return "", 0, None
 
-    with tempfile.TemporaryDirectory() as td:
-        bundle_path = Path(td) / "playwright_trace.zip"
-        with zipfile.ZipFile(bundle_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+    # Spill to disk past _SPOOL_MAX_BYTES so large bundles are never fully resident.
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES) as bundle:
+        writer = _HashingWriter(bundle)
+        names: set[str] = set()
+        with zipfile.ZipFile(writer, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=3) as zf:
             for path in trace_paths:
                 if not path.exists():
                     continue
                 arcname = path.name
-                if arcname in zf.namelist():
+                if arcname in names:
                     arcname = f"{path.parent.name}_{arcname}"
-                zf.write(path, arcname=arcname)
-
-        data = bundle_path.read_bytes()
-    encoded = base64.b64encode(data).decode("ascii")
-    data_url = f"data:application/zip;base64,{encoded}"
-    return data_url, len(data)
+                names.add(arcname)
+                compress_type = zipfile.ZIP_STORED if path.suffix.lower() in _PRECOMPRESSED_SUFFIXES else None
+                zf.write(path, arcname=arcname, compress_type=compress_type)
+        size = bundle.tell()
+        bundle.seek(0)
+        return _upload_or_inline(bundle, size), size, writer.digest.hexdigest()
+
+
+def _upload_or_inline(bundle: BinaryIO, size: int) -> str:
+    """Upload bundles above the inline limit to object storage, otherwise return a data URL.
+
+    Uploads return a stable ``s3://bucket/key`` reference; the API presigns it when the
+    run is read, so stored receipts never expire.
+    """
+    bucket = os.getenv("CLAIMSCOPE_TRACE_BUCKET")
+    if bucket and boto3 is not None and size > _INLINE_MAX_BYTES:
+        key = f"traces/{os.urandom(16).hex()}/playwright_trace.zip"
+        try:
+            client = boto3.client("s3", endpoint_url=os.getenv("CLAIMSCOPE_TRACE_ENDPOINT_URL") or None)
+            client.upload_fileobj(
+                bundle,
+                bucket,
+                key,
+                ExtraArgs={"ContentType": "application/zip"},
+                Config=TransferConfig(multipart_threshold=_SPOOL_MAX_BYTES, use_threads=True),
+            )
+            return f"s3://{bucket}/{key}"
+        except Exception:
+            logger.warning("trace upload to s3://%s/%s failed; inlining bundle", bucket, key, exc_info=True)
+            bundle.seek(0)
+    encoded = base64.b64encode(bundle.read()).decode("ascii")
+    return f"data:application/zip;base64,{encoded}"
+
+
+def _iter_files(root: Path, suffix: Optional[str] = None) -> Iterator[os.DirEntry]:
+    """Yield file entries under ``root`` (optionally filtered by suffix) without recursion."""
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif (suffix is None or entry.name.endswith(suffix)) and entry.is_file():
+                        yield entry
+        except FileNotFoundError:
+            continue
+
+
+def _dataset_digest() -> str:
+    entries = itertools.chain(
+        _iter_files(TESTS_DIR, ".ts"),
+        _iter_files(WEB_APP_DIR, ".tsx"),
+        _iter_files(STATIC_DIR),
+    )
+    signature = []
+    for entry in entries:
+        stat = entry.stat()
+        signature.append((entry.path, stat.st_mtime_ns, stat.st_size))
+    return _cached_digest("dataset", signature)
+
+
+def _harness_digest() -> str:
+    signature = []
+    for path in (Path(__file__).resolve(), CONFIG_PATH):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return _cached_digest("harness", signature)
+
+
+def _cached_digest(corpus: str, signature: List[Tuple[str, int, int]]) -> str:
+    """Return ``compute_digest`` for the files in ``signature``, skipping it when unchanged.
+
+    The (path, mtime, size) fingerprint of each corpus is persisted under
+    ``~/.claimscope`` so a restarted worker can also skip re-hashing file contents.
+    """
+    global _DIGEST_CACHE
+    signature.sort()
+    fingerprint = hashlib.sha256(json_utils.dumps(signature).encode("utf-8")).hexdigest()
+    with _DIGEST_LOCK:
+        if _DIGEST_CACHE is None:
+            try:
+                _DIGEST_CACHE = json_utils.loads(DIGEST_CACHE_PATH.read_bytes())
+            except (OSError, ValueError):
+                _DIGEST_CACHE = {}
+        cached = _DIGEST_CACHE.get(corpus)
+        if isinstance(cached, dict) and cached.get("fingerprint") == fingerprint:
+            return cached["digest"]
+    digest = compute_digest([path for path, _, _ in signature])
+    with _DIGEST_LOCK:
+        _DIGEST_CACHE[corpus] = {"fingerprint": fingerprint, "digest": digest}
+        try:
+            DIGEST_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            DIGEST_CACHE_PATH.write_text(json_utils.dumps(_DIGEST_CACHE), encoding="utf-8")
+        except OSError:
+            pass
+    return digest
 
 
 def run_cgui_suite() -> Tuple[Dict[str, Any], List[float], Dict[str, Any] | None, Dict[str, Any]]:
@@ -135,13 +307,25 @@ def run_cgui_suite() -> Tuple[Dict[str, Any], List[float], Dict[str, Any] | None
         "--config",
         str(CONFIG_PATH),
     ]
-    completed = subprocess.run(cmd, cwd=PACKAGE_DIR, env=env, capture_output=True, text=True)
-    if completed.returncode != 0:
-        raise RuntimeError(
-            "Playwright suite failed",
-            completed.stdout,
-            completed.stderr,
-        )
+    # Stream the (potentially very verbose) output into the log and keep only a tail
+    # for the failure payload instead of buffering everything until exit.
+    tail: Deque[str] = collections.deque(maxlen=_OUTPUT_TAIL_LINES)
+    with subprocess.Popen(
+        cmd,
+        cwd=PACKAGE_DIR,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    ) as proc:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            tail.append(line)
+            logger.info("playwright: %s", line.rstrip())
+        returncode = proc.wait()
+    if returncode != 0:
+        raise RuntimeError("Playwright suite failed", "".join(tail))
 
     results = _collect_results()
     total = len(results) or 1
@@ -149,13 +333,12 @@ def run_cgui_suite() -> Tuple[Dict[str, Any], List[float], Dict[str, Any] | None
     timeouts = sum(1 for result in results if result.status == "timedOut")
     durations_ms = [result.duration_ms for result in results]
 
-    sorted_ms = sorted(durations_ms)
     p95 = 0.0
-    if sorted_ms:
-        index = int(0.95 * (len(sorted_ms) - 1))
-        p95 = sorted_ms[index] / 1000.0
+    if durations_ms:
+        # Same nearest-rank index as the other harnesses' p95, selected in C.
+        p95 = float(np.percentile(np.asarray(durations_ms, dtype=np.float64), 95, method="lower")) / 1000.0
 
-    bundle_url, bundle_size = _bundle_traces(results)
+    bundle_url, bundle_size, bundle_sha256 = _bundle_traces(results)
 
     metrics = {
         "task_success": passes / total,
@@ -180,29 +363,19 @@ def run_cgui_suite() -> Tuple[Dict[str, Any], List[float], Dict[str, Any] | None
         artifact = {
             "name": "playwright_trace.zip",
             "content_type": "application/zip",
-            "data_url": bundle_url,
+            # data_url is only ever a data: URL; uploaded bundles carry their reference as url.
+            ("url" if bundle_url.startswith("s3://") else "data_url"): bundle_url,
             "bytes": bundle_size,
-            "sha256": None,
+            "sha256": bundle_sha256,
         }
 
     durations = [ms / 1000.0 for ms in durations_ms]
 
-    tests_dir = PACKAGE_DIR / "tests"
-    web_app_dir = REPO_ROOT / "apps" / "web" / "app" / "cgui"
-    static_dir = REPO_ROOT / "apps" / "web" / "public" / "cgui"
-
-    dataset_paths = (
-        [p for p in tests_dir.rglob("*.ts")]
-        + [p for p in web_app_dir.rglob("*.tsx")]
-        + [p for p in static_dir.rglob("*") if p.is_file()]
-    )
-    harness_paths = [Path(__file__), CONFIG_PATH]
-
     metadata = {
         "suite": "cGUI-10",
         "dataset_id": "cgui-10",
-        "dataset_hash": compute_digest(dataset_paths),
-        "harness_hash": compute_digest(harness_paths),
+        "dataset_hash": _dataset_digest(),
+        "harness_hash": _harness_digest(),
         "seeds": {"playwright": 0},
         "params": {
             "test_count": len(results),
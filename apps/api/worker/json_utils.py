@@ -0,0 +1,43 @@
+"""JSON helpers that prefer orjson and fall back to the standard library."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Mapping, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+# NumPy arrays/scalars (e.g. latency samples) serialise natively, without tolist().
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def _to_builtin(value: Any) -> Any:
+    # NumPy values orjson could not take (or when it is absent), and read-only
+    # mappings such as MappingProxyType.
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps(value: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=_to_builtin, option=_ORJSON_OPTIONS).decode("utf-8")
+        except TypeError:
+            # orjson rejects some values the stdlib accepts (e.g. float subclasses,
+            # non-contiguous arrays); keep those payloads serialisable.
+            pass
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=_to_builtin)
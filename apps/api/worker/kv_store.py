@@ -0,0 +1,60 @@
+"""Tiny SQLite-backed key/value store used by the on-disk worker caches."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from . import json_utils
+from .logging_utils import get_logger
+
+logger = get_logger("kv_store")
+
+
+class KeyValueStore:
+    """Thread-safe JSON value store in a single SQLite table.
+
+    The database is opened lazily; if it cannot be created the store disables itself
+    and behaves as permanently empty.
+    """
+
+    def __init__(self, path: Path, table: str, enabled: bool = True) -> None:
+        self.path = Path(path)
+        self.table = table
+        self.enabled = enabled
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or not self.enabled:
+            return self._conn
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+        except (OSError, sqlite3.Error) as exc:  # pragma: no cover - unwritable home directories
+            logger.warning("%s cache disabled: %s", self.table, exc)
+            self.enabled = False
+            return None
+        self._conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        return json_utils.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any) -> None:
+        payload = json_utils.dumps(value)
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            with conn:
+                conn.execute(f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)", (key, payload))
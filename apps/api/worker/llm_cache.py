@@ -0,0 +1,52 @@
+"""Exact-match cache for deterministic (temperature 0) model responses.
+
+Entries live in a small SQLite file so repeated runs of the same benchmark skip the
+provider API entirely. Set ``CLAIMSCOPE_LLM_CACHE=0`` to bypass the cache. Entries
+expire after ``CLAIMSCOPE_LLM_CACHE_TTL`` seconds (a day by default): responses are
+attributed to the configured model name, and aliases such as ``-latest`` or a
+provider fallback chain can resolve to a different model from one day to the next.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from . import json_utils
+from .kv_store import KeyValueStore
+
+CACHE_PATH = Path(os.getenv("CLAIMSCOPE_LLM_CACHE_PATH") or Path.home() / ".claimscope" / "cache.db")
+TTL_S = float(os.getenv("CLAIMSCOPE_LLM_CACHE_TTL", "86400"))
+
+stats: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0}
+
+_STORE = KeyValueStore(
+    CACHE_PATH,
+    "responses",
+    enabled=os.getenv("CLAIMSCOPE_LLM_CACHE", "1").lower() not in {"0", "false", "off", "no"},
+)
+
+
+def make_key(**fields: Any) -> str:
+    """Hash the request fields that determine a deterministic response."""
+    canonical = json_utils.dumps({name: fields[name] for name in sorted(fields)})
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    """Return the value stored under ``key`` unless it is missing or older than TTL_S."""
+    entry = _STORE.get(key)
+    value = None
+    # Entries without a timestamp predate expiry and are treated as stale.
+    if isinstance(entry, dict) and time.time() - entry.get("recorded_at", 0.0) < TTL_S:
+        value = entry.get("value")
+    stats["hits" if value is not None else "misses"] += 1
+    return value
+
+
+def set(key: str, value: Dict[str, Any]) -> None:
+    _STORE.set(key, {"recorded_at": time.time(), "value": value})
+    stats["writes"] += 1
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 import os
 from typing import Optional
@@ -20,7 +21,9 @@ def _initialise_root(level: str) -> None:
     _LOGGER_INITIALISED = True
 
 
+@functools.lru_cache(maxsize=128)
 def get_logger(name: Optional[str] = None) -> logging.Logger:
+    # Cached per name: the environment read and root setup only happen on first use.
     level = os.getenv("WORKER_LOG_LEVEL", "INFO").upper()
     _initialise_root(level)
     return logging.getLogger(name or "worker")
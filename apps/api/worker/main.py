@@ -1,26 +1,57 @@
-import json
 import os
+import select
 import time
-import uuid
 from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
 
+import numpy as np
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import NullPool
 
+from . import json_utils
 from .agents_cagent import run_cagent_suite
 from .coding_humaneval import run_humaneval_subset
 from .coding_swebench import DATASET_ID as SWEBENCH_DATASET_ID, run_swebench_verified
 from .coding_competition import run_coding_competition, CodingBenchError
 from .gui_cgui import run_cgui_suite
 from .logging_utils import get_logger
-from .reasoning_gsm8k import bootstrap_ci, run_gsm8k_subset
-from .trace_manifest import record_trace
+from .reasoning_gsm8k import run_gsm8k_subset, wilson_ci
+from .trace_manifest import INSERT_TRACE, record_trace, trace_values
 from .vision_mmmu import MMMU_DATASET_DIGEST, MMMU_DATASET_ID, MMMUDataError, run_mmmu_subset
 from .efficiency_tokens import run_efficiency_telemetry, TokenTelemetryError
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/claimscope")
-engine = create_engine(DATABASE_URL, future=True)
+
+
+def _engine_options() -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    if make_url(DATABASE_URL).get_dialect().driver == "psycopg2":
+        # Multi-row executes go out as batched statements instead of one round trip per row.
+        options.update(executemany_mode="values_plus_batch", executemany_batch_page_size=500)
+    # Behind a transaction-mode pooler (e.g. PgBouncer) the app should not pool on top.
+    if os.getenv("WORKER_DB_NULLPOOL", "0").lower() in {"1", "true", "yes", "on"}:
+        options["poolclass"] = NullPool
+        return options
+    options.update(
+        pool_size=int(os.getenv("WORKER_DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("WORKER_DB_MAX_OVERFLOW", "10")),
+        # Recycle before typical server/proxy idle timeouts drop the socket.
+        pool_recycle=int(os.getenv("WORKER_DB_POOL_RECYCLE_S", "1800")),
+        # One cheap ping per checkout (i.e. per run) so a connection dropped while the
+        # worker sat idle is replaced up front instead of failing the run's writes.
+        pool_pre_ping=os.getenv("WORKER_DB_PRE_PING", "1").lower() not in {"0", "false", "off", "no"},
+    )
+    return options
+
+
+engine = create_engine(DATABASE_URL, future=True, **_engine_options())
 logger = get_logger("worker")
 
 REPO_ROOT = Path(__file__).resolve().parents[3]
@@ -38,13 +69,26 @@ VISION_PATHS = [
     REPO_ROOT / "apps" / "api" / "worker" / "data" / "vision_mmmu.json",
 ]
 
-ESTIMATED_LLM_COSTS: Dict[str, float] = {
-    "coding": 0.02,
-    "reasoning-math": 0.02,
-    "vision": 0.02,
-}
+# Module-level tables are shared by every run, so they are exposed read-only (nested
+# entries included) and handlers can reference them without defensive copies.
+ESTIMATED_LLM_COSTS: Mapping[str, float] = MappingProxyType(
+    {
+        "coding": 0.02,
+        "reasoning-math": 0.02,
+        "vision": 0.02,
+    }
+)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 
-SEED_RESULTS: Dict[str, Dict[str, Any]] = {
+SEED_RESULTS: Mapping[str, Mapping[str, Any]] = _freeze({
     "coding": {
         "score_value": 0.76,
         "ci_lower": 0.69,
@@ -77,14 +121,152 @@ SEED_RESULTS: Dict[str, Dict[str, Any]] = {
         "diffs": [],
         "status_label": "Replicated",
     },
-}
+})
 
-ARTIFACTS: Dict[str, Dict[str, Any]] = {
+ARTIFACTS: Mapping[str, Mapping[str, Any]] = _freeze({
     "coding": {"name": "logs.txt", "url": "http://localhost:3000/demo/artifacts/logs.txt", "sha256": "demo", "bytes": 64, "content_type": "text/plain"},
     "agents": {"name": "agent_trace.json", "url": "http://localhost:3000/demo/artifacts/agent_trace.json", "sha256": "demo", "bytes": 128, "content_type": "application/json"},
     "computer-use": {"name": "playwright_trace.zip", "url": "http://localhost:3000/demo/artifacts/playwright_trace.zip", "sha256": "demo", "bytes": 256, "content_type": "application/zip"},
     "reasoning-math": {"name": "logs.txt", "url": "http://localhost:3000/demo/artifacts/logs.txt", "sha256": "demo", "bytes": 64, "content_type": "text/plain"},
-}
+})
+
+# Each LLM-backed handler serves a single domain, so its cost estimate is resolved once.
+_COST_CODING = ESTIMATED_LLM_COSTS["coding"]
+_COST_REASONING_MATH = ESTIMATED_LLM_COSTS["reasoning-math"]
+_COST_VISION = ESTIMATED_LLM_COSTS["vision"]
+
+# Seeded ops and diffs never change, so their JSON is rendered once rather than on
+# every run.
+_SEED_OPS_JSON: Mapping[str, str] = MappingProxyType(
+    {domain: json_utils.dumps(seed["ops"]) for domain, seed in SEED_RESULTS.items()}
+)
+_SEED_DIFFS: Mapping[str, Tuple[Mapping[str, Any], ...]] = MappingProxyType(
+    {
+        domain: tuple(entry for entry in seed.get("diffs", ()) if isinstance(entry, Mapping))
+        for domain, seed in SEED_RESULTS.items()
+    }
+)
+_SEED_DIFFS_JSON: Mapping[str, str] = MappingProxyType(
+    {domain: json_utils.dumps(list(diffs)) for domain, diffs in _SEED_DIFFS.items()}
+)
+
+_DEFAULT_ARTIFACT = ARTIFACTS["coding"]
+
+
+# SQL statements are built once at import instead of on every run.
+_RECORD_FAILURE_SQL = text(
+    "UPDATE runs SET status='failed', trace_id=:trace_id, diffs=CAST(:diffs AS JSONB), status_label=:label WHERE id=:id"
+)
+_MARK_UNDERSPECIFIED_SQL = text(
+    """
+    UPDATE runs
+    SET status='succeeded',
+        score_value=NULL,
+        ci_lower=NULL,
+        ci_upper=NULL,
+        ops=CAST(:ops AS JSONB),
+        diffs=CAST(:diffs AS JSONB),
+        status_label='Underspecified',
+        trace_id=:trace_id,
+        completed_at=now()
+    WHERE id=:id
+    """
+)
+_LOAD_RUN_CONTEXT_SQL = text(
+    """
+    SELECT c.domain, c.task, c.metric, c.model, c.settings, r.model_config
+    FROM runs r
+    JOIN claims c ON c.id = r.claim_id
+    WHERE r.id = :run_id
+    """
+)
+_MARK_RUN_FAILED_SQL = text("UPDATE runs SET status='failed' WHERE id=:id")
+_BUDGET_FAILURE_SQL = text(
+    "UPDATE runs SET status='failed', trace_id=:trace_id, diffs=CAST(:diffs AS JSONB) WHERE id=:id"
+)
+_UPDATE_RESULT_NO_CI_SQL = text(
+    """
+    UPDATE runs SET status=:status, score_value=:score_value, ci_lower=NULL, ci_upper=NULL,
+      ops=CAST(:ops AS JSONB), diffs=CAST(:diffs AS JSONB), status_label=:status_label,
+      trace_id=:trace_id, completed_at=now()
+    WHERE id=:id
+    """
+)
+_UPDATE_PROGRESS_SQL = text("UPDATE runs SET ops=:ops WHERE id=:id")
+_UPDATE_RESULT_SQL = text(
+    """
+    UPDATE runs SET status=:status, score_value=:score_value, ci_lower=:ci_lower, ci_upper=:ci_upper,
+      ops=CAST(:ops AS JSONB), diffs=CAST(:diffs AS JSONB), status_label=:status_label,
+      trace_id=:trace_id, completed_at=now()
+    WHERE id=:id
+    """
+)
+_UPDATE_RESULT_KEEP_CI_SQL = text(
+    """
+    UPDATE runs
+    SET status=:status,
+        score_value=:score_value,
+        ops=CAST(:ops AS JSONB),
+        diffs=CAST(:diffs AS JSONB),
+        status_label=:status_label,
+        trace_id=:trace_id,
+        completed_at=now()
+    WHERE id=:id
+    """
+)
+# A successful run is recorded by one statement: the result update, the optional
+# artifact keyed off the updated run, the trace row and the claim's validation
+# count. Data-modifying CTEs always run to completion, so all of it lands in one
+# round trip.
+_INSERT_ARTIFACT_FROM_UPDATED = """
+    INSERT INTO artifacts (id, run_id, name, url, sha256, bytes, content_type)
+    SELECT :artifact_id, updated.id, :name, :url, :sha256, CAST(:bytes AS BIGINT), :content_type
+    FROM updated
+"""
+_BUMP_VALIDATION_COUNT = (
+    "UPDATE claims SET validation_count = COALESCE(validation_count, 0) + 1 WHERE id = :claim_id"
+)
+
+
+def _result_statements(update_sql: Any) -> Tuple[Any, Any]:
+    # (without artifact, with artifact) variants of one way of handling the CI.
+    head = f"WITH updated AS ({update_sql.text} RETURNING id), "
+    tail = f"trace AS ({INSERT_TRACE} RETURNING run_id) {_BUMP_VALIDATION_COUNT}"
+    return (
+        text(head + tail),
+        text(f"{head}artifact AS ({_INSERT_ARTIFACT_FROM_UPDATED}), {tail}"),
+    )
+
+
+_NO_CI_STATEMENTS = _result_statements(_UPDATE_RESULT_NO_CI_SQL)
+_CI_STATEMENTS = _result_statements(_UPDATE_RESULT_SQL)
+_KEEP_CI_STATEMENTS = _result_statements(_UPDATE_RESULT_KEEP_CI_SQL)
+# Claims up to :limit of the oldest queued runs and marks them running in one
+# statement; SKIP LOCKED lets several workers poll without picking the same run. The run's context comes back
+# with it so process_one does not re-query it, and the LEFT JOIN keeps runs whose
+# claim is missing visible so they can be marked failed.
+_CLAIM_NEXT_RUNS_SQL = text(
+    """
+    WITH next_run AS (
+      SELECT id FROM runs
+      WHERE status='queued'
+      ORDER BY created_at ASC
+      LIMIT :limit
+      FOR UPDATE SKIP LOCKED
+    ), claimed AS (
+      UPDATE runs r SET status='running'
+      FROM next_run
+      WHERE r.id = next_run.id
+      RETURNING r.id, r.claim_id, r.model_config
+    )
+    SELECT claimed.id, claimed.claim_id, c.id AS context_claim_id,
+           c.domain, c.task, c.metric, c.model, c.settings, claimed.model_config
+    FROM claimed
+    LEFT JOIN claims c ON c.id = claimed.claim_id
+    """
+)
+# Delivered to LISTEN run_completed sessions when the run's transaction commits.
+_NOTIFY_RUN_COMPLETED_SQL = text("SELECT pg_notify('run_completed', :id)")
 
 
 def _status_from_exception(exc: Exception) -> Optional[int]:
@@ -114,17 +296,14 @@ def _record_failure(
     if extra:
         payload.update(extra)
     conn.execute(
-        text(
-            "UPDATE runs SET status='failed', trace_id=:trace_id, diffs=CAST(:diffs AS JSONB), status_label=:label WHERE id=:id"
-        ),
+        _RECORD_FAILURE_SQL,
         {
             "id": run_id,
             "trace_id": trace_id,
             "label": status_label,
-            "diffs": json.dumps([payload]),
+            "diffs": json_utils.dumps([payload]),
         },
     )
-    conn.commit()
 
 
 def _mark_underspecified(
@@ -134,45 +313,21 @@ def _mark_underspecified(
     *,
     reason: str,
     message: str,
-    details: Optional[Dict[str, Any]] = None,
+    details: Optional[Mapping[str, Any]] = None,
     ops: Optional[Dict[str, Any]] = None,
 ) -> None:
     payload = {"reason": reason, "message": message}
     if details:
         payload.update(details)
     conn.execute(
-        text(
-            """
-            UPDATE runs
-            SET status='succeeded',
-                score_value=NULL,
-                ci_lower=NULL,
-                ci_upper=NULL,
-                ops=CAST(:ops AS JSONB),
-                diffs=CAST(:diffs AS JSONB),
-                status_label='Underspecified',
-                trace_id=:trace_id,
-                completed_at=now()
-            WHERE id=:id
-            """
-        ),
+        _MARK_UNDERSPECIFIED_SQL,
         {
             "id": run_id,
             "trace_id": trace_id,
-            "ops": json.dumps(ops or {}),
-            "diffs": json.dumps([payload]),
+            "ops": json_utils.dumps(ops or {}),
+            "diffs": json_utils.dumps([payload]),
         },
     )
-    conn.commit()
-
-def _increment_validation_count(conn, claim_id: str) -> None:
-    conn.execute(
-        text(
-            "UPDATE claims SET validation_count = COALESCE(validation_count, 0) + 1 WHERE id = :id"
-        ),
-        {"id": claim_id},
-    )
-
 
 def _coerce_budget(model_cfg: Dict[str, Any]) -> float:
     raw = model_cfg.get("budget_usd", 0.0)
@@ -184,30 +339,26 @@ def _coerce_budget(model_cfg: Dict[str, Any]) -> float:
 
 def _load_run_context(conn, run_id: str) -> Optional[Dict[str, Any]]:
     row = conn.execute(
-        text(
-            """
-            SELECT c.domain, c.task, c.metric, c.model, c.settings, r.model_config
-            FROM runs r
-            JOIN claims c ON c.id = r.claim_id
-            WHERE r.id = :run_id
-            """
-        ),
+        _LOAD_RUN_CONTEXT_SQL,
         {"run_id": run_id},
     ).mappings().first()
     if not row:
         return None
+    return _context_from_row(row)
 
+
+def _context_from_row(row: Any) -> Dict[str, Any]:
     model_cfg = row["model_config"]
     if isinstance(model_cfg, str):
         try:
-            model_cfg = json.loads(model_cfg)
-        except json.JSONDecodeError:
+            model_cfg = json_utils.loads(model_cfg)
+        except ValueError:
             model_cfg = {}
     settings = row["settings"]
     if isinstance(settings, str):
         try:
-            settings = json.loads(settings)
-        except json.JSONDecodeError:
+            settings = json_utils.loads(settings)
+        except ValueError:
             settings = {}
 
     return {
@@ -215,1262 +366,1016 @@ def _load_run_context(conn, run_id: str) -> Optional[Dict[str, Any]]:
         "task": row["task"],
         "metric": row["metric"],
         "model": row.get("model"),
-        "settings": settings or {},
+        "settings": _normalise_settings(settings or {}),
         "model_config": model_cfg or {},
     }
 
 
-def process_one(run_id: str, claim_id: str) -> None:
-    with engine.connect() as conn:
-        ctx = _load_run_context(conn, run_id)
-        if ctx is None:
-            logger.error("run %s missing context; marking failed", run_id)
-            conn.execute(text("UPDATE runs SET status='failed' WHERE id=:id"), {"id": run_id})
-            conn.commit()
-            return
-
-        domain = ctx["domain"] or "coding"
-        task = ctx["task"] or ""
-        metric = ctx.get("metric")
-        settings = ctx.get("settings") or {}
-        model_cfg = ctx["model_config"]
-        model_name = ctx.get("model") or "Unspecified Model"
-        budget = _coerce_budget(model_cfg)
-        trace_id = f"tr_{uuid.uuid4().hex[:6]}"
-
-        requires_comparison = bool(settings.get("requires_comparison"))
-        comparators = settings.get("comparand_models") or []
-        if isinstance(comparators, str):
-            comparators = [comparators]
-        requires_multimodal = bool(settings.get("requires_multimodal_harness"))
-
-        def _comparison_details() -> Dict[str, Any]:
-            details: Dict[str, Any] = {
-                "domain": domain,
-                "task": task,
-            }
-            if metric:
-                details["metric"] = metric
-            details["model"] = model_name
-            if comparators:
-                details["expected_comparators"] = comparators
-            return details
-
-        def _summarise_failure(stderr: str) -> str:
-            if not stderr:
-                return "unknown"
-            lines = [line.strip() for line in stderr.splitlines() if line.strip()]
-            if not lines:
-                return "unknown"
-            candidate = lines[-1]
-            if candidate.lower().startswith('file "') and len(lines) > 1:
-                candidate = lines[-2]
-            if candidate.lower().startswith("traceback") and len(lines) > 1:
-                candidate = lines[-1]
-            reason = candidate.split(":", 1)[0]
-            return reason or candidate
-
-        def _guard_cost(expected_cost: float) -> bool:
-            if expected_cost <= 0:
-                return True
-            if budget <= 0:
-                logger.warning(
-                    "run %s requires >= %.4f budget but none provided; marking failed",
-                    run_id,
-                    expected_cost,
-                )
-                conn.execute(
-                    text(
-                        "UPDATE runs SET status='failed', trace_id=:trace_id, diffs=CAST(:diffs AS JSONB) WHERE id=:id"
-                    ),
-                    {
-                        "id": run_id,
-                        "trace_id": trace_id,
-                        "diffs": json.dumps([{"reason": "missing_budget", "required_usd": expected_cost}]),
-                    },
-                )
-                conn.commit()
-                return False
-            if expected_cost <= budget:
-                return True
+def _normalise_settings(settings: Any) -> Any:
+    # Coerce the list-valued settings once per run so handlers can consume them as-is.
+    if not isinstance(settings, dict):
+        return settings
+    comparators = settings.get("comparand_models") or []
+    if isinstance(comparators, str):
+        comparators = [comparators]
+    settings["comparand_models"] = comparators
+    telemetry = settings.get("telemetry")
+    if isinstance(telemetry, dict):
+        prompts = telemetry.get("prompts")
+        if isinstance(prompts, str):
+            telemetry["prompts"] = [prompts]
+        elif prompts and not isinstance(prompts, list):
+            telemetry["prompts"] = list(prompts)
+        comparator_configs = telemetry.get("comparators")
+        if isinstance(comparator_configs, dict):
+            telemetry["comparators"] = [comparator_configs]
+        elif comparator_configs and not isinstance(comparator_configs, list):
+            telemetry["comparators"] = list(comparator_configs)
+    return settings
+
+
+@dataclass
+class _RunContext:
+    run_id: str
+    claim_id: str
+    trace_id: str
+    domain: str
+    task: str
+    task_lc: str
+    metric: Optional[str]
+    settings: Dict[str, Any]
+    model_cfg: Dict[str, Any]
+    model_name: str
+    budget: float
+    requires_comparison: bool
+    comparators: List[str]
+    requires_multimodal: bool
+
+    def comparison_details(self) -> Mapping[str, Any]:
+        return self._comparison_details
+
+    @cached_property
+    def _comparison_details(self) -> Mapping[str, Any]:
+        # Handlers pull this into several diff entries and failure payloads per run,
+        # so it is assembled once and handed out read-only.
+        details: Dict[str, Any] = {
+            "domain": self.domain,
+            "task": self.task,
+        }
+        if self.metric:
+            details["metric"] = self.metric
+        details["model"] = self.model_name
+        if self.comparators:
+            details["expected_comparators"] = self.comparators
+        return MappingProxyType(details)
+
+    def guard_cost(self, conn, expected_cost: float) -> bool:
+        # Common case first: nothing to spend, or the budget covers it.
+        if expected_cost <= 0 or expected_cost <= self.budget:
+            return True
+        if self.budget <= 0:
             logger.warning(
-                "run %s exceeds budget (expected %.4f > budget %.4f); marking failed",
-                run_id,
+                "run %s requires >= %.4f budget but none provided; marking failed",
+                self.run_id,
                 expected_cost,
-                budget,
             )
             conn.execute(
-                text(
-                    "UPDATE runs SET status='failed', trace_id=:trace_id, diffs=CAST(:diffs AS JSONB) WHERE id=:id"
-                ),
+                _BUDGET_FAILURE_SQL,
                 {
-                    "id": run_id,
-                    "trace_id": trace_id,
-                    "diffs": json.dumps([{"reason": "budget_exceeded", "expected_cost_usd": expected_cost}]),
+                    "id": self.run_id,
+                    "trace_id": self.trace_id,
+                    "diffs": json_utils.dumps([{"reason": "missing_budget", "required_usd": expected_cost}]),
                 },
             )
-            conn.commit()
             return False
+        logger.warning(
+            "run %s exceeds budget (expected %.4f > budget %.4f); marking failed",
+            self.run_id,
+            expected_cost,
+            self.budget,
+        )
+        conn.execute(
+            _BUDGET_FAILURE_SQL,
+            {
+                "id": self.run_id,
+                "trace_id": self.trace_id,
+                "diffs": json_utils.dumps([{"reason": "budget_exceeded", "expected_cost_usd": expected_cost}]),
+            },
+        )
+        return False
 
-        if domain == "efficiency" or metric == "token_delta":
-            telemetry_settings = settings.get("telemetry") if isinstance(settings, dict) else None
-            prompts = telemetry_settings.get("prompts") if isinstance(telemetry_settings, dict) else None
-            if isinstance(prompts, str):
-                prompts = [prompts]
-            elif prompts and not isinstance(prompts, list):
-                prompts = list(prompts)
-            comparator_configs = telemetry_settings.get("comparators") if isinstance(telemetry_settings, dict) else None
-            if isinstance(comparator_configs, dict):
-                comparator_configs = [comparator_configs]
-            elif comparator_configs and not isinstance(comparator_configs, list):
-                comparator_configs = list(comparator_configs)
-            temperature = float(telemetry_settings.get("temperature", 0.0)) if telemetry_settings else 0.0
-            max_output_tokens_value = telemetry_settings.get("max_output_tokens") if telemetry_settings else None
-            try:
-                max_output_tokens = int(max_output_tokens_value) if max_output_tokens_value is not None else 1024
-            except (TypeError, ValueError):
-                max_output_tokens = 1024
-
-            if not prompts or not comparator_configs:
-                _mark_underspecified(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason="missing_telemetry",
-                    message="Efficiency claims require token telemetry bundles.",
-                    details={**_comparison_details(), "required_artifact": "token_telemetry"},
-                )
-                record_trace(
-                    conn,
-                    run_id,
-                    harness_cmd="guard::efficiency_telemetry_missing",
-                    dataset_id="token-telemetry@pending",
-                    params={
-                        "domain": domain,
-                        "task": task,
-                        "metric": metric,
-                        "comparators": comparators,
-                    },
-                    seeds={},
-                    tokens_prompt=0,
-                    tokens_output=0,
-                    cost_usd=0.0,
-                    errors={"reason": "missing_telemetry"},
-                )
-                return
 
-            try:
-                telemetry_result = run_efficiency_telemetry(
-                    prompts=prompts,
-                    primary_config=model_cfg,
-                    comparator_configs=comparator_configs,
-                    temperature=temperature,
-                    max_output_tokens=max_output_tokens,
-                )
-            except TokenTelemetryError as exc:
-                logger.exception("Efficiency telemetry error for %s", run_id)
-                _mark_underspecified(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason="telemetry_error",
-                    message=str(exc),
-                    details={**_comparison_details(), "required_artifact": "token_telemetry"},
-                )
-                record_trace(
-                    conn,
-                    run_id,
-                    harness_cmd="guard::efficiency_telemetry_error",
-                    dataset_id="token-telemetry@pending",
-                    params={
-                        "domain": domain,
-                        "task": task,
-                        "metric": metric,
-                        "comparators": comparators,
-                    },
-                    seeds={},
-                    tokens_prompt=0,
-                    tokens_output=0,
-                    cost_usd=0.0,
-                    errors={"reason": "telemetry_error", "message": str(exc)},
-                )
-                return
+def _summarise_failure(stderr: str) -> str:
+    if not stderr:
+        return "unknown"
+    lines = [line.strip() for line in stderr.splitlines() if line.strip()]
+    if not lines:
+        return "unknown"
+    candidate = lines[-1]
+    if candidate.lower().startswith('file "') and len(lines) > 1:
+        candidate = lines[-2]
+    if candidate.lower().startswith("traceback") and len(lines) > 1:
+        candidate = lines[-1]
+    reason = candidate.split(":", 1)[0]
+    return reason or candidate
 
-            primary_summary = telemetry_result.get("primary", {})
-            comparator_summaries = telemetry_result.get("comparators", [])
-            savings = comparator_summaries[0].get("savings_pct") if comparator_summaries else None
-            score_value = None if savings is None else savings / 100.0
-            status_label = "Replicated"
 
-            diff_entries: List[Dict[str, Any]] = []
-            diff_entries.append(
-                {
-                    "reason": "token_usage",
-                    "message": "Primary token usage",
-                    "input_tokens": primary_summary.get("input_tokens"),
-                    "output_tokens": primary_summary.get("output_tokens"),
-                    "total_tokens": primary_summary.get("total_tokens"),
-                    "requests": primary_summary.get("requests"),
-                }
-            )
-            for comp in comparator_summaries:
-                diff_entries.append(
-                    {
-                        "reason": "comparator",
-                        "message": f"{comp.get('model')} tokens",
-                        "provider": comp.get("provider"),
-                        "input_tokens": comp.get("input_tokens"),
-                        "output_tokens": comp.get("output_tokens"),
-                        "total_tokens": comp.get("total_tokens"),
-                        "requests": comp.get("requests"),
-                        "savings_pct": comp.get("savings_pct"),
-                    }
-                )
+def _finalize_run(
+    conn,
+    run: _RunContext,
+    *,
+    score_value: Any,
+    ops: Any,
+    diffs: Any,
+    status_label: str,
+    ci: Optional[Tuple[float, float]] = None,
+    keep_ci: bool = False,
+    artifact: Optional[Mapping[str, Any]] = None,
+    **trace: Any,
+) -> None:
+    """Record a successful run: its result, an optional artifact and its trace.
+
+    Without ``ci`` the stored interval is cleared, unless ``keep_ci`` leaves it as is.
+    ``ops`` and ``diffs`` may be pre-rendered JSON. Remaining keyword arguments
+    describe the trace (see trace_values). Everything is written by one statement.
+    """
+    values: Dict[str, Any] = {
+        "id": run.run_id,
+        "status": "succeeded",
+        "score_value": score_value,
+        "ops": ops if isinstance(ops, str) else json_utils.dumps(ops),
+        "diffs": diffs if isinstance(diffs, str) else json_utils.dumps(diffs),
+        "status_label": status_label,
+        "trace_id": run.trace_id,
+        "claim_id": run.claim_id,
+        **trace_values(run.run_id, **trace),
+    }
+    if keep_ci:
+        statements = _KEEP_CI_STATEMENTS
+    elif ci is None:
+        statements = _NO_CI_STATEMENTS
+    else:
+        statements = _CI_STATEMENTS
+        values["ci_lower"], values["ci_upper"] = ci
+    if artifact is None:
+        conn.execute(statements[0], values)
+    else:
+        conn.execute(statements[1], {**values, **artifact, "artifact_id": f"art_{os.urandom(4).hex()}"})
+
+
+def _harness_artifact(artifact: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not artifact:
+        return None
+    return {
+        "name": artifact["name"],
+        "url": artifact.get("url") or artifact["data_url"],
+        "sha256": artifact.get("sha256"),
+        "bytes": artifact.get("bytes"),
+        "content_type": artifact.get("content_type"),
+    }
 
-            conn.execute(
-                text(
-                    """
-                    UPDATE runs SET status=:status, score_value=:score_value, ci_lower=NULL, ci_upper=NULL,
-                      ops=CAST(:ops AS JSONB), diffs=CAST(:diffs AS JSONB), status_label=:status_label,
-                      trace_id=:trace_id, completed_at=now()
-                    WHERE id=:id
-                    """
-                ),
-                {
-                    "id": run_id,
-                    "status": "succeeded",
-                    "score_value": score_value,
-                    "ci_lower": None,
-                    "ci_upper": None,
-                    "ops": json.dumps(
-                        {
-                            "primary_input_tokens": primary_summary.get("input_tokens"),
-                            "primary_output_tokens": primary_summary.get("output_tokens"),
-                            "requests": primary_summary.get("requests"),
-                        }
-                    ),
-                    "diffs": json.dumps(diff_entries),
-                    "status_label": status_label,
-                    "trace_id": trace_id,
-                },
-            )
-            record_trace(
-                conn,
-                run_id,
-                harness_cmd="python -m worker.efficiency_tokens",
-                harness_paths=EFFICIENCY_PATHS,
-                dataset_id="token-telemetry",
-                params={
-                    "domain": domain,
-                    "task": task,
-                    "metric": metric,
-                    "comparators": comparators,
-                    "prompts": list(prompts),
-                },
-                seeds={},
-                tokens_prompt=int(primary_summary.get("input_tokens") or 0),
-                tokens_output=int(primary_summary.get("output_tokens") or 0),
-                cost_usd=0.0,
-                latencies=telemetry_result.get("latencies", []),
-            )
-            _increment_validation_count(conn, claim_id)
-            conn.commit()
+
+def process_one(run_id: str, claim_id: str, ctx: Optional[Dict[str, Any]] = None) -> None:
+    # Every write for a run (status, trace, artifacts, claim counter) lands in one
+    # transaction, committed once the outcome is recorded. The completion notice
+    # rides in the same transaction, so listeners never see it before the rows.
+    with engine.connect() as conn:
+        _process_run(conn, run_id, claim_id, ctx)
+        if conn.dialect.name == "postgresql":
+            conn.execute(_NOTIFY_RUN_COMPLETED_SQL, {"id": run_id})
+        conn.commit()
+
+
+def _process_run(conn, run_id: str, claim_id: str, ctx: Optional[Dict[str, Any]]) -> None:
+    if ctx is None:
+        ctx = _load_run_context(conn, run_id)
+    if ctx is None:
+        logger.error("run %s missing context; marking failed", run_id)
+        conn.execute(_MARK_RUN_FAILED_SQL, {"id": run_id})
+        return
+
+    settings = ctx.get("settings") or {}
+    model_cfg = ctx["model_config"]
+    task = ctx["task"] or ""
+    run = _RunContext(
+        run_id=run_id,
+        claim_id=claim_id,
+        trace_id=f"tr_{os.urandom(3).hex()}",
+        domain=ctx["domain"] or "coding",
+        task=task,
+        # Lowercased once here for every handler predicate below.
+        task_lc=task.lower(),
+        metric=ctx.get("metric"),
+        settings=settings,
+        model_cfg=model_cfg,
+        model_name=ctx.get("model") or "Unspecified Model",
+        budget=_coerce_budget(model_cfg),
+        requires_comparison=bool(settings.get("requires_comparison")),
+        comparators=settings.get("comparand_models") or [],
+        requires_multimodal=bool(settings.get("requires_multimodal_harness")),
+    )
+    for matches, handler in _HANDLERS:
+        if matches(run):
+            handler(conn, run)
             return
+    _handle_seeded(conn, run)
 
-        if domain == "coding" and settings.get("comparative_suite") == "coding_competition":
-            primary_provider = (model_cfg.get("provider") or "").lower()
-            if primary_provider == "gemini":
-                _record_failure(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason="unsupported_model",
-                    message="Gemini models are temporarily disabled for the coding competition harness.",
-                    status_label="Failed",
-                )
-                return
-
-            comp_cfgs = settings.get("telemetry", {}).get("comparators") if isinstance(settings.get("telemetry"), dict) else settings.get("comparative_models")
-            if isinstance(comp_cfgs, dict):
-                comp_cfgs = [comp_cfgs]
-            if not isinstance(comp_cfgs, list) or not comp_cfgs:
-                _mark_underspecified(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason="missing_comparator_config",
-                    message="Comparative suite requires comparator model configs.",
-                    details=_comparison_details(),
-                )
-                record_trace(
-                    conn,
-                    run_id,
-                    harness_cmd="guard::coding_competition_missing_comparators",
-                    dataset_id="coding-competition",
-                    params={"domain": domain, "task": task, "metric": metric},
-                    seeds={},
-                    tokens_prompt=0,
-                    tokens_output=0,
-                    cost_usd=0.0,
-                    errors={"reason": "missing_comparators"},
-                )
-                return
 
-            filtered_cfgs = []
-            for cfg in comp_cfgs:
-                provider = (cfg.get("provider") or "").lower()
-                if provider == "gemini":
-                    continue
-                filtered_cfgs.append(cfg)
-
-            primary_api_key_ref = model_cfg.get("api_key_ref")
-            for cfg in filtered_cfgs:
-                provider = (cfg.get("provider") or "").lower()
-                api_key_ref = cfg.get("api_key_ref")
-                if provider == primary_provider and primary_api_key_ref:
-                    if not api_key_ref or not os.getenv(api_key_ref):
-                        cfg["api_key_ref"] = primary_api_key_ref
-
-            if not filtered_cfgs:
-                _mark_underspecified(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason="unsupported_comparators",
-                    message="Gemini comparators are temporarily disabled for the coding competition harness.",
-                    details=_comparison_details(),
-                )
-                record_trace(
-                    conn,
-                    run_id,
-                    harness_cmd="guard::coding_competition_disabled_gemini",
-                    dataset_id="coding-competition",
-                    params={"domain": domain, "task": task, "metric": metric},
-                    seeds={},
-                    tokens_prompt=0,
-                    tokens_output=0,
-                    cost_usd=0.0,
-                    errors={"reason": "gemini_disabled"},
-                )
-                return
-
-            comp_cfgs = filtered_cfgs
-            temperature = float(settings.get("temperature") or 0.0)
-            progress_cache: Dict[str, Any] = {}
-            last_progress_at = 0.0
-
-            def _report_progress(snapshot: Dict[str, Any]) -> None:
-                nonlocal progress_cache, last_progress_at
-                progress_cache = snapshot
-                now = time.time()
-                should_flush = snapshot.get("units_completed") == snapshot.get("units_total")
-                if not should_flush and now - last_progress_at < 1.0:
-                    return
-                last_progress_at = now
-                try:
-                    conn.execute(
-                        text("UPDATE runs SET ops=:ops WHERE id=:id"),
-                        {"id": run_id, "ops": json.dumps({"progress": snapshot})},
-                    )
-                    conn.commit()
-                except Exception:
-                    conn.rollback()
-                    logger.exception("failed to persist coding progress for %s", run_id)
+def _handle_efficiency(conn, run: _RunContext) -> None:
+    telemetry_settings = run.settings.get("telemetry") if isinstance(run.settings, dict) else None
+    prompts = telemetry_settings.get("prompts") if isinstance(telemetry_settings, dict) else None
+    comparator_configs = telemetry_settings.get("comparators") if isinstance(telemetry_settings, dict) else None
+    temperature = float(telemetry_settings.get("temperature", 0.0)) if telemetry_settings else 0.0
+    max_output_tokens_value = telemetry_settings.get("max_output_tokens") if telemetry_settings else None
+    try:
+        max_output_tokens = int(max_output_tokens_value) if max_output_tokens_value is not None else 1024
+    except (TypeError, ValueError):
+        max_output_tokens = 1024
 
-            try:
-                results = run_coding_competition(
-                    primary_config=model_cfg,
-                    comparator_configs=comp_cfgs,
-                    temperature=temperature,
-                    progress_callback=_report_progress,
-                )
-            except CodingBenchError as exc:
-                logger.exception("Coding competition harness failed for %s", run_id)
-                _record_failure(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason="coding_competition_error",
-                    message=str(exc),
-                    status_label="Failed",
+    if not prompts or not comparator_configs:
+        _mark_underspecified(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason="missing_telemetry",
+            message="Efficiency claims require token telemetry bundles.",
+            details={**run.comparison_details(), "required_artifact": "token_telemetry"},
+        )
+        record_trace(
+            conn,
+            run.run_id,
+            harness_cmd="guard::efficiency_telemetry_missing",
+            dataset_id="token-telemetry@pending",
+            params={
+                "domain": run.domain,
+                "task": run.task,
+                "metric": run.metric,
+                "comparators": run.comparators,
+            },
+            seeds={},
+            tokens_prompt=0,
+            tokens_output=0,
+            cost_usd=0.0,
+            errors={"reason": "missing_telemetry"},
+        )
+        return
+
+    try:
+        telemetry_result = run_efficiency_telemetry(
+            prompts=prompts,
+            primary_config=run.model_cfg,
+            comparator_configs=comparator_configs,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+        )
+    except TokenTelemetryError as exc:
+        logger.exception("Efficiency telemetry error for %s", run.run_id)
+        _mark_underspecified(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason="telemetry_error",
+            message=str(exc),
+            details={**run.comparison_details(), "required_artifact": "token_telemetry"},
+        )
+        record_trace(
+            conn,
+            run.run_id,
+            harness_cmd="guard::efficiency_telemetry_error",
+            dataset_id="token-telemetry@pending",
+            params={
+                "domain": run.domain,
+                "task": run.task,
+                "metric": run.metric,
+                "comparators": run.comparators,
+            },
+            seeds={},
+            tokens_prompt=0,
+            tokens_output=0,
+            cost_usd=0.0,
+            errors={"reason": "telemetry_error", "message": str(exc)},
+        )
+        return
+
+    primary_summary = telemetry_result.get("primary", {})
+    comparator_summaries = telemetry_result.get("comparators", [])
+    savings = comparator_summaries[0].get("savings_pct") if comparator_summaries else None
+    score_value = None if savings is None else savings / 100.0
+    status_label = "Replicated"
+
+    diff_entries: List[Dict[str, Any]] = [
+        {
+            "reason": "token_usage",
+            "message": "Primary token usage",
+            "input_tokens": primary_summary.get("input_tokens"),
+            "output_tokens": primary_summary.get("output_tokens"),
+            "total_tokens": primary_summary.get("total_tokens"),
+            "requests": primary_summary.get("requests"),
+            "cached_requests": primary_summary.get("cached_requests"),
+        }
+    ]
+    diff_entries.extend(
+        {
+            "reason": "comparator",
+            "message": f"{comp.get('model')} tokens",
+            "provider": comp.get("provider"),
+            "input_tokens": comp.get("input_tokens"),
+            "output_tokens": comp.get("output_tokens"),
+            "total_tokens": comp.get("total_tokens"),
+            "requests": comp.get("requests"),
+            "cached_requests": comp.get("cached_requests"),
+            "savings_pct": comp.get("savings_pct"),
+        }
+        for comp in comparator_summaries
+    )
+
+    _finalize_run(
+        conn,
+        run,
+        score_value=score_value,
+        ops={
+            "primary_input_tokens": primary_summary.get("input_tokens"),
+            "primary_output_tokens": primary_summary.get("output_tokens"),
+            "requests": primary_summary.get("requests"),
+        },
+        diffs=diff_entries,
+        status_label=status_label,
+        harness_cmd="python -m worker.efficiency_tokens",
+        harness_paths=EFFICIENCY_PATHS,
+        dataset_id="token-telemetry",
+        params={
+            "domain": run.domain,
+            "task": run.task,
+            "metric": run.metric,
+            "comparators": run.comparators,
+            "prompts": list(prompts),
+        },
+        seeds={},
+        tokens_prompt=int(primary_summary.get("input_tokens") or 0),
+        tokens_output=int(primary_summary.get("output_tokens") or 0),
+        cost_usd=0.0,
+        latencies=telemetry_result.get("latencies", []),
+    )
+
+
+def _handle_coding_competition(conn, run: _RunContext) -> None:
+    primary_provider = (run.model_cfg.get("provider") or "").lower()
+    if primary_provider == "gemini":
+        _record_failure(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason="unsupported_model",
+            message="Gemini models are temporarily disabled for the coding competition harness.",
+            status_label="Failed",
+        )
+        return
+
+    comp_cfgs = run.settings.get("telemetry", {}).get("comparators") if isinstance(run.settings.get("telemetry"), dict) else run.settings.get("comparative_models")
+    if isinstance(comp_cfgs, dict):
+        comp_cfgs = [comp_cfgs]
+    if not isinstance(comp_cfgs, list) or not comp_cfgs:
+        _mark_underspecified(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason="missing_comparator_config",
+            message="Comparative suite requires comparator model configs.",
+            details=run.comparison_details(),
+        )
+        record_trace(
+            conn,
+            run.run_id,
+            harness_cmd="guard::coding_competition_missing_comparators",
+            dataset_id="coding-competition",
+            params={"domain": run.domain, "task": run.task, "metric": run.metric},
+            seeds={},
+            tokens_prompt=0,
+            tokens_output=0,
+            cost_usd=0.0,
+            errors={"reason": "missing_comparators"},
+        )
+        return
+
+    filtered_cfgs = []
+    for cfg in comp_cfgs:
+        provider = (cfg.get("provider") or "").lower()
+        if provider == "gemini":
+            continue
+        filtered_cfgs.append(cfg)
+
+    primary_api_key_ref = run.model_cfg.get("api_key_ref")
+    for cfg in filtered_cfgs:
+        provider = (cfg.get("provider") or "").lower()
+        api_key_ref = cfg.get("api_key_ref")
+        if provider == primary_provider and primary_api_key_ref:
+            if not api_key_ref or not os.getenv(api_key_ref):
+                cfg["api_key_ref"] = primary_api_key_ref
+
+    if not filtered_cfgs:
+        _mark_underspecified(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason="unsupported_comparators",
+            message="Gemini comparators are temporarily disabled for the coding competition harness.",
+            details=run.comparison_details(),
+        )
+        record_trace(
+            conn,
+            run.run_id,
+            harness_cmd="guard::coding_competition_disabled_gemini",
+            dataset_id="coding-competition",
+            params={"domain": run.domain, "task": run.task, "metric": run.metric},
+            seeds={},
+            tokens_prompt=0,
+            tokens_output=0,
+            cost_usd=0.0,
+            errors={"reason": "gemini_disabled"},
+        )
+        return
+
+    comp_cfgs = filtered_cfgs
+    temperature = float(run.settings.get("temperature") or 0.0)
+    progress_cache: Dict[str, Any] = {}
+    last_progress_at = 0.0
+
+    def _report_progress(snapshot: Dict[str, Any]) -> None:
+        nonlocal progress_cache, last_progress_at
+        progress_cache = snapshot
+        now = time.time()
+        should_flush = snapshot.get("units_completed") == snapshot.get("units_total")
+        if not should_flush and now - last_progress_at < 1.0:
+            return
+        last_progress_at = now
+        # Progress has to be visible while the run is still going, so it is committed on
+        # its own short-lived connection; the run's transaction stays atomic and has not
+        # touched the runs row yet, so this never waits on its lock.
+        try:
+            with engine.begin() as progress_conn:
+                progress_conn.execute(
+                    _UPDATE_PROGRESS_SQL,
+                    {"id": run.run_id, "ops": json_utils.dumps({"progress": snapshot})},
                 )
-                return
+        except Exception:
+            logger.exception("failed to persist coding progress for %s", run.run_id)
 
-            baseline = results.get("baseline", {})
-            comparators_info = results.get("comparators", [])
-            tasks_info = results.get("tasks", [])
-            status_label = "Replicated"
-            diff_entries: List[Dict[str, Any]] = []
+    try:
+        results = run_coding_competition(
+            primary_config=run.model_cfg,
+            comparator_configs=comp_cfgs,
+            temperature=temperature,
+            progress_callback=_report_progress,
+        )
+    except CodingBenchError as exc:
+        logger.exception("Coding competition harness failed for %s", run.run_id)
+        _record_failure(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason="coding_competition_error",
+            message=str(exc),
+            status_label="Failed",
+        )
+        return
+
+    baseline = results.get("baseline", {})
+    comparators_info = results.get("comparators", [])
+    tasks_info = results.get("tasks", [])
+    status_label = "Replicated"
+    diff_entries: List[Dict[str, Any]] = [
+        {
+            "reason": "baseline",
+            "message": "Baseline pass rate",
+            "passed": baseline.get("passed"),
+            "attempted": baseline.get("attempted"),
+            "pass_rate": baseline.get("pass_rate"),
+        }
+    ]
+    diff_entries.extend(
+        {
+            "reason": "comparator",
+            "message": f"{comp.get('model')} performance",
+            "passed": comp.get("passed"),
+            "attempted": comp.get("attempted"),
+            "pass_rate": comp.get("pass_rate"),
+            "avg_latency_s": comp.get("avg_latency_s"),
+            "cached_responses": comp.get("cached_responses"),
+            "input_tokens": comp.get("input_tokens"),
+            "output_tokens": comp.get("output_tokens"),
+        }
+        for comp in comparators_info
+    )
+
+    baseline_rate = baseline.get("pass_rate")
+    if baseline_rate is not None:
+        underperformers: Dict[str, Any] = {}
+        for comp in comparators_info:
+            comp_rate = comp.get("pass_rate")
+            if comp_rate is None:
+                continue
+            if baseline_rate <= comp_rate:
+                label = comp.get("model") or f"comparator@{comp.get('provider', 'unknown')}"
+                underperformers[label] = {
+                    "pass_rate": comp_rate,
+                    "passed": comp.get("passed"),
+                    "attempted": comp.get("attempted"),
+                }
+        if underperformers:
+            status_label = "Not Reproduced"
             diff_entries.append(
                 {
-                    "reason": "baseline",
-                    "message": "Baseline pass rate",
-                    "passed": baseline.get("passed"),
-                    "attempted": baseline.get("attempted"),
-                    "pass_rate": baseline.get("pass_rate"),
+                    "reason": "comparison_deficit",
+                    "message": "Baseline does not exceed comparator pass rates.",
+                    "comparators": underperformers,
+                    **run.comparison_details(),
                 }
             )
-            for comp in comparators_info:
-                diff_entries.append(
-                    {
-                        "reason": "comparator",
-                        "message": f"{comp.get('model')} performance",
-                        "passed": comp.get("passed"),
-                        "attempted": comp.get("attempted"),
-                        "pass_rate": comp.get("pass_rate"),
-                        "avg_latency_s": comp.get("avg_latency_s"),
-                        "input_tokens": comp.get("input_tokens"),
-                        "output_tokens": comp.get("output_tokens"),
-                    }
-                )
-
-            baseline_rate = baseline.get("pass_rate")
-            if baseline_rate is not None:
-                underperformers: Dict[str, Any] = {}
-                for comp in comparators_info:
-                    comp_rate = comp.get("pass_rate")
-                    if comp_rate is None:
-                        continue
-                    if baseline_rate <= comp_rate:
-                        label = comp.get("model") or f"comparator@{comp.get('provider', 'unknown')}"
-                        underperformers[label] = {
-                            "pass_rate": comp_rate,
-                            "passed": comp.get("passed"),
-                            "attempted": comp.get("attempted"),
-                        }
-                if underperformers:
-                    status_label = "Not Reproduced"
-                    diff_entries.append(
-                        {
-                            "reason": "comparison_deficit",
-                            "message": "Baseline does not exceed comparator pass rates.",
-                            "comparators": underperformers,
-                            **_comparison_details(),
-                        }
-                    )
-
-            if isinstance(tasks_info, list) and tasks_info:
-                per_task: List[Dict[str, Any]] = []
-                baseline_only_fail: List[str] = []
-                everyone_fail: List[str] = []
-                baseline_only_pass: List[str] = []
-                baseline_failure_types: Counter[str] = Counter()
-                comparator_failure_types: Counter[str] = Counter()
-
-                for item in tasks_info:
-                    task_id = item.get("task_id") or "unknown"
-                    primary = item.get("primary") or {}
-                    comps = item.get("comparators") or []
-                    primary_success = bool(primary.get("success"))
-                    comparator_successes = [c for c in comps if c and c.get("success")]
-                    comparator_pass = bool(comparator_successes)
-
-                    if not primary_success and comparator_successes:
-                        baseline_only_fail.append(task_id)
-                    elif not primary_success and not comparator_pass:
-                        everyone_fail.append(task_id)
-                    elif primary_success and not comparator_pass:
-                        baseline_only_pass.append(task_id)
-
-                    if not primary_success:
-                        err = primary.get("stderr")
-                        if isinstance(err, str) and err:
-                            baseline_failure_types[_summarise_failure(err)] += 1
-
-                    for comp in comps:
-                        if not isinstance(comp, dict) or comp.get("success"):
-                            continue
-                        err = comp.get("stderr")
-                        if isinstance(err, str) and err:
-                            comparator_failure_types[_summarise_failure(err)] += 1
-
-                    per_task.append(
-                        {
-                            "task": task_id,
-                            "baseline": {
-                                "model": primary.get("model"),
-                                "success": primary_success,
-                                "stderr": primary.get("stderr"),
-                            },
-                            "comparators": [
-                                {
-                                    "model": comp.get("model"),
-                                    "success": bool(comp.get("success")),
-                                    "stderr": comp.get("stderr"),
-                                }
-                                for comp in comps
-                                if isinstance(comp, dict)
-                            ],
-                        }
-                    )
 
-                diff_entries.append(
-                    {
-                        "reason": "task_breakdown",
-                        "message": "Task-level outcomes",
-                        "tasks": per_task,
-                        "insights": {
-                            "baseline_failed_tasks": baseline_only_fail,
-                            "all_models_failed_tasks": everyone_fail,
-                            "baseline_only_pass_tasks": baseline_only_pass,
-                        },
-                    }
-                )
+    if isinstance(tasks_info, list) and tasks_info:
+        per_task: List[Dict[str, Any]] = []
+        baseline_only_fail: List[str] = []
+        everyone_fail: List[str] = []
+        baseline_only_pass: List[str] = []
+        baseline_failure_types: Counter[str] = Counter()
+        comparator_failure_types: Counter[str] = Counter()
+
+        for item in tasks_info:
+            task_id = item.get("task_id") or "unknown"
+            primary = item.get("primary") or {}
+            comps = item.get("comparators") or []
+            primary_success = bool(primary.get("success"))
+            comparator_successes = [c for c in comps if c and c.get("success")]
+            comparator_pass = bool(comparator_successes)
+
+            if not primary_success and comparator_successes:
+                baseline_only_fail.append(task_id)
+            elif not primary_success and not comparator_pass:
+                everyone_fail.append(task_id)
+            elif primary_success and not comparator_pass:
+                baseline_only_pass.append(task_id)
+
+            if not primary_success:
+                err = primary.get("stderr")
+                if isinstance(err, str) and err:
+                    baseline_failure_types[_summarise_failure(err)] += 1
+
+            for comp in comps:
+                if not isinstance(comp, dict) or comp.get("success"):
+                    continue
+                err = comp.get("stderr")
+                if isinstance(err, str) and err:
+                    comparator_failure_types[_summarise_failure(err)] += 1
 
-                if baseline_failure_types or comparator_failure_types:
-                    diff_entries.append(
+            per_task.append(
+                {
+                    "task": task_id,
+                    "baseline": {
+                        "model": primary.get("model"),
+                        "success": primary_success,
+                        "stderr": primary.get("stderr"),
+                        "cached": bool(primary.get("cached")),
+                    },
+                    "comparators": [
                         {
-                            "reason": "failure_summary",
-                            "message": "Aggregated failure reasons",
-                            "baseline": [
-                                {"reason": reason, "count": count}
-                                for reason, count in baseline_failure_types.most_common()
-                            ],
-                            "comparators": [
-                                {"reason": reason, "count": count}
-                                for reason, count in comparator_failure_types.most_common()
-                            ],
+                            "model": comp.get("model"),
+                            "success": bool(comp.get("success")),
+                            "stderr": comp.get("stderr"),
+                            "cached": bool(comp.get("cached")),
                         }
-                    )
+                        for comp in comps
+                        if isinstance(comp, dict)
+                    ],
+                }
+            )
 
-            final_ops = {"tasks": baseline.get("attempted")}
-            if progress_cache:
-                final_ops["progress"] = progress_cache
+        diff_entries.append(
+            {
+                "reason": "task_breakdown",
+                "message": "Task-level outcomes",
+                "tasks": per_task,
+                "insights": {
+                    "baseline_failed_tasks": baseline_only_fail,
+                    "all_models_failed_tasks": everyone_fail,
+                    "baseline_only_pass_tasks": baseline_only_pass,
+                },
+            }
+        )
 
-            conn.execute(
-                text(
-                    """
-                    UPDATE runs SET status=:status, score_value=:score_value, ci_lower=NULL, ci_upper=NULL,
-                      ops=CAST(:ops AS JSONB), diffs=CAST(:diffs AS JSONB), status_label=:status_label,
-                      trace_id=:trace_id, completed_at=now()
-                    WHERE id=:id
-                    """
-                ),
+        if baseline_failure_types or comparator_failure_types:
+            diff_entries.append(
                 {
-                    "id": run_id,
-                    "status": "succeeded",
-                    "score_value": baseline.get("pass_rate"),
-                    "ci_lower": None,
-                    "ci_upper": None,
-                    "ops": json.dumps(final_ops),
-                    "diffs": json.dumps(diff_entries),
-                    "status_label": status_label,
-                    "trace_id": trace_id,
-                },
-            )
-            record_trace(
-                conn,
-                run_id,
-                harness_cmd="python -m worker.coding_competition",
-                harness_paths=[REPO_ROOT / "apps" / "api" / "worker" / "coding_competition.py"],
-                dataset_id="coding-competition",
-                params={"domain": domain, "task": task, "metric": metric},
-                seeds={},
-                tokens_prompt=0,
-                tokens_output=0,
-                cost_usd=0.0,
+                    "reason": "failure_summary",
+                    "message": "Aggregated failure reasons",
+                    "baseline": [
+                        {"reason": reason, "count": count}
+                        for reason, count in baseline_failure_types.most_common()
+                    ],
+                    "comparators": [
+                        {"reason": reason, "count": count}
+                        for reason, count in comparator_failure_types.most_common()
+                    ],
+                }
             )
-            _increment_validation_count(conn, claim_id)
-            conn.commit()
-            return
 
-        if domain == "vision":
-            if not _guard_cost(ESTIMATED_LLM_COSTS.get(domain, 0.0)):
-                return
-            try:
-                res, latencies, report = run_mmmu_subset(
-                    model_name=model_name,
-                    comparators=comparators,
-                )
-            except MMMUDataError as exc:
-                _mark_underspecified(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason="missing_fixture",
-                    message=str(exc),
-                    details=_comparison_details(),
-                )
-                record_trace(
-                    conn,
-                    run_id,
-                    harness_cmd="guard::missing_mmmu_fixture",
-                    dataset_id=MMMU_DATASET_ID,
-                    params={
-                        "domain": domain,
-                        "task": task,
-                        "metric": metric,
-                        "comparators": comparators,
-                        "budget_usd": budget,
-                        "model": model_name,
-                    },
-                    seeds={},
-                    tokens_prompt=0,
-                    tokens_output=0,
-                    cost_usd=0.0,
-                    errors={"reason": "missing_fixture"},
-                )
-                return
+    final_ops = {"tasks": baseline.get("attempted")}
+    if progress_cache:
+        final_ops["progress"] = progress_cache
+
+    _finalize_run(
+        conn,
+        run,
+        score_value=baseline.get("pass_rate"),
+        ops=final_ops,
+        diffs=diff_entries,
+        status_label=status_label,
+        harness_cmd="python -m worker.coding_competition",
+        harness_paths=[REPO_ROOT / "apps" / "api" / "worker" / "coding_competition.py"],
+        dataset_id="coding-competition",
+        params={"domain": run.domain, "task": run.task, "metric": run.metric},
+        seeds={},
+        tokens_prompt=0,
+        tokens_output=0,
+        cost_usd=0.0,
+    )
 
-            metric_key = report.get("metric", "accuracy")
-            available = report.get("available") or {}
-            missing = report.get("missing") or []
-            leaderboard = report.get("leaderboard") or []
 
-            status_label = "Replicated"
-            diff_entries: list[Dict[str, Any]] = []
+def _handle_vision(conn, run: _RunContext) -> None:
+    if not run.guard_cost(conn, _COST_VISION):
+        return
+    try:
+        res, latencies, report = run_mmmu_subset(
+            model_name=run.model_name,
+            comparators=run.comparators,
+        )
+    except MMMUDataError as exc:
+        _mark_underspecified(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason="missing_fixture",
+            message=str(exc),
+            details=run.comparison_details(),
+        )
+        record_trace(
+            conn,
+            run.run_id,
+            harness_cmd="guard::missing_mmmu_fixture",
+            dataset_id=MMMU_DATASET_ID,
+            params={
+                "domain": run.domain,
+                "task": run.task,
+                "metric": run.metric,
+                "comparators": run.comparators,
+                "budget_usd": run.budget,
+                "model": run.model_name,
+            },
+            seeds={},
+            tokens_prompt=0,
+            tokens_output=0,
+            cost_usd=0.0,
+            errors={"reason": "missing_fixture"},
+        )
+        return
 
-            if leaderboard:
-                diff_entries.append({"leaderboard": leaderboard})
+    metric_key = report.get("metric", "accuracy")
+    available = report.get("available") or {}
+    missing = report.get("missing") or []
+    leaderboard = report.get("leaderboard") or []
 
-            if missing:
-                status_label = "Underspecified"
-                diff_entries.append(
-                    {
-                        "reason": "missing_comparator",
-                        "message": "Comparative baseline not found in MMMU fixtures.",
-                        "missing": missing,
-                        **_comparison_details(),
-                    }
-                )
+    status_label = "Replicated"
+    diff_entries: list[Dict[str, Any]] = []
 
-            if requires_comparison and not missing:
-                worse_than = {}
-                for name, data in available.items():
-                    comparator_score = data.get(metric_key)
-                    if comparator_score is None:
-                        continue
-                    if comparator_score > res["score_value"]:
-                        worse_than[name] = comparator_score
-                if worse_than:
-                    status_label = "Not Reproduced"
-                    diff_entries.append(
-                        {
-                            "reason": "comparison_deficit",
-                            "message": "Claim model underperforms one or more comparators on MMMU.",
-                            "comparators": worse_than,
-                            **_comparison_details(),
-                        }
-                    )
-                else:
-                    diff_entries.append(
-                        {
-                            "reason": "comparison_pass",
-                            "message": "Claim model meets or exceeds provided comparators on MMMU.",
-                            **_comparison_details(),
-                        }
-                    )
-
-            conn.execute(
-                text(
-                    """
-                    UPDATE runs SET status=:status, score_value=:score_value, ci_lower=NULL, ci_upper=NULL,
-                      ops=CAST(:ops AS JSONB), diffs=CAST(:diffs AS JSONB), status_label=:status_label,
-                      trace_id=:trace_id, completed_at=now()
-                    WHERE id=:id
-                    """
-                ),
-                {
-                    "id": run_id,
-                    "status": "succeeded",
-                    "score_value": res["score_value"],
-                    "ops": json.dumps(res.get("ops") or {}),
-                    "diffs": json.dumps(diff_entries),
-                    "status_label": status_label,
-                    "trace_id": trace_id,
-                },
-            )
+    if leaderboard:
+        diff_entries.append({"leaderboard": leaderboard})
 
-            record_trace(
-                conn,
-                run_id,
-                harness_cmd="python -m worker.vision_mmmu",
-                harness_paths=VISION_PATHS,
-                dataset_id=MMMU_DATASET_ID,
-                dataset_digest=MMMU_DATASET_DIGEST,
-                params={
-                    "domain": domain,
-                    "task": task,
-                    "metric": metric,
-                    "model": model_name,
-                    "comparators": comparators,
-                    "budget_usd": budget,
-                },
-                seeds={"mode": "offline_fixture"},
-                tokens_prompt=int(res.get("ops", {}).get("tokens_prompt") or 0),
-                tokens_output=int(res.get("ops", {}).get("tokens_output") or 0),
-                latencies=latencies,
-                cost_usd=float(res.get("ops", {}).get("cost_usd") or 0.0),
-            )
-            _increment_validation_count(conn, claim_id)
-            conn.commit()
-            return
+    if missing:
+        status_label = "Underspecified"
+        diff_entries.append(
+            {
+                "reason": "missing_comparator",
+                "message": "Comparative baseline not found in MMMU fixtures.",
+                "missing": missing,
+                **run.comparison_details(),
+            }
+        )
 
-        if requires_multimodal:
-            _mark_underspecified(
-                conn,
-                run_id,
-                trace_id,
-                reason="missing_multimodal_support",
-                message="Claim expects multimodal evaluation but the target domain lacks a vision harness.",
-                details=_comparison_details(),
-            )
-            record_trace(
-                conn,
-                run_id,
-                harness_cmd="guard::missing_multimodal_support",
-                dataset_id="guard::vision",
-                params={
-                    "domain": domain,
-                    "task": task,
-                    "metric": metric,
-                    "comparators": comparators,
-                    "budget_usd": budget,
-                    "model": model_name,
-                },
-                seeds={},
-                tokens_prompt=0,
-                tokens_output=0,
-                cost_usd=0.0,
-                errors={"reason": "missing_multimodal_support"},
+    if run.requires_comparison and not missing:
+        worse_than = {}
+        for name, data in available.items():
+            comparator_score = data.get(metric_key)
+            if comparator_score is None:
+                continue
+            if comparator_score > res["score_value"]:
+                worse_than[name] = comparator_score
+        if worse_than:
+            status_label = "Not Reproduced"
+            diff_entries.append(
+                {
+                    "reason": "comparison_deficit",
+                    "message": "Claim model underperforms one or more comparators on MMMU.",
+                    "comparators": worse_than,
+                    **run.comparison_details(),
+                }
             )
-            return
-
-        # Real GSM8K path
-        if domain == "reasoning-math" and task.lower().startswith("gsm8k"):
-            if not _guard_cost(ESTIMATED_LLM_COSTS.get(domain, 0.0)):
-                return
-            try:
-                res, lats = run_gsm8k_subset(n=25, seed=1234, temperature=0.2)
-                acc = res["score_value"]
-                # Build binary list for bootstrap
-                n = res.get("n", 25)
-                # Approximate successes from accuracy
-                k = int(round(acc * n))
-                vals = [1]*k + [0]*(n-k)
-                lo, hi = bootstrap_ci(vals, n=n, reps=1000, seed=1234)
-                status_label = "Replicated"
-                diff_entries: list[Dict[str, Any]] = []
-                if requires_comparison:
-                    status_label = "Underspecified"
-                    if comparators:
-                        diff_entries.append(
-                            {
-                                "reason": "comparison_pending",
-                                "message": "Comparator baselines pending for reasoning-math harness.",
-                                "comparators": comparators,
-                                **_comparison_details(),
-                            }
-                        )
-                    else:
-                        diff_entries.append(
-                            {
-                                "reason": "missing_comparator",
-                                "message": "Comparative claim evaluated without competitor baselines.",
-                                **_comparison_details(),
-                            }
-                        )
-                conn.execute(
-                    text(
-                        """
-                        UPDATE runs SET status=:status, score_value=:score_value, ci_lower=:ci_lower, ci_upper=:ci_upper,
-                          ops=CAST(:ops AS JSONB), diffs=CAST(:diffs AS JSONB), status_label=:status_label,
-                          trace_id=:trace_id, completed_at=now()
-                        WHERE id=:id
-                        """
-                    ),
-                    {
-                        "id": run_id,
-                        "status": "succeeded",
-                        "score_value": acc,
-                        "ci_lower": lo,
-                        "ci_upper": hi,
-                        "ops": json.dumps(res["ops"]),
-                        "diffs": json.dumps(diff_entries),
-                        "status_label": status_label,
-                        "trace_id": trace_id,
-                    },
-                )
-                record_trace(
-                    conn,
-                    run_id,
-                    harness_cmd="python -m worker.reasoning_gsm8k",
-                    harness_paths=GSM8K_PATHS,
-                    dataset_id="gsm8k@subset-25",
-                    params={
-                        "n": n,
-                        "temperature": 0.2,
-                        "budget_usd": budget,
-                        "comparators": comparators if requires_comparison else [],
-                    },
-                    seeds={"sample_seed": 1234},
-                    tokens_prompt=int(res["ops"].get("tokens_prompt") or 0),
-                    tokens_output=int(res["ops"].get("tokens_output") or 0),
-                    latencies=lats,
-                    cost_usd=float(res["ops"].get("cost_usd", 0.0)),
-                )
-                _increment_validation_count(conn, claim_id)
-                conn.commit()
-                return
-            except Exception as e:
-                logger.exception("GSM8K runner error for %s", run_id)
-                status = _status_from_exception(e)
-                reason = "anthropic_overloaded" if status == 529 else "anthropic_error"
-                extra = {"status_code": status} if status else {}
-                _record_failure(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason=reason,
-                    message=str(e),
-                    extra=extra if extra else None,
-                    status_label="Failed",
-                )
-                return
-
-        # SWE-bench Verified (coding)
-        if domain == "coding" and "swe-bench" in task.lower():
-            # SWE-bench Verified harness is primarily offline, so budget checks are
-            # skipped. Provide knobs for trial count via claim settings.
-            try:
-                limit = int(settings.get("swebench_case_limit") or settings.get("n") or 25)
-            except (TypeError, ValueError):
-                limit = 25
-            limit = max(limit, 0)
-            try:
-                seed = int(settings.get("seed") or 1234)
-            except (TypeError, ValueError):
-                seed = 1234
-            cli_entry = settings.get("swebench_cli") or os.getenv("SWEBENCH_CLI_ENTRYPOINT")
-            dataset_root = settings.get("swebench_dataset") or os.getenv("SWEBENCH_DATASET_ROOT")
-            predictions_path = settings.get("swebench_predictions") or os.getenv("SWEBENCH_PREDICTIONS")
-            if not predictions_path:
-                _mark_underspecified(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason="missing_predictions",
-                    message="SWE-bench claims require swebench_predictions setting",
-                    details={**_comparison_details(), "required_setting": "swebench_predictions"},
-                )
-                record_trace(
-                    conn,
-                    run_id,
-                    harness_cmd="guard::swebench_predictions_missing",
-                    dataset_id=SWEBENCH_DATASET_ID,
-                    params={
-                        "domain": domain,
-                        "task": task,
-                        "metric": metric,
-                        "comparators": comparators,
-                    },
-                    seeds={},
-                    tokens_prompt=0,
-                    tokens_output=0,
-                    cost_usd=0.0,
-                    errors={"reason": "missing_predictions"},
-                )
-                return
-            max_workers = settings.get("swebench_max_workers") or os.getenv("SWEBENCH_MAX_WORKERS")
-            timeout_override = settings.get("swebench_timeout_s") or os.getenv("SWEBENCH_TIMEOUT_S")
-            try:
-                max_workers_int = int(max_workers) if max_workers is not None else None
-            except (TypeError, ValueError):
-                max_workers_int = None
-            try:
-                timeout_int = int(timeout_override) if timeout_override is not None else None
-            except (TypeError, ValueError):
-                timeout_int = None
-            try:
-                res, latencies = run_swebench_verified(
-                    limit=limit,
-                    seed=seed,
-                    cli_entrypoint=cli_entry,
-                    dataset_root=dataset_root,
-                    predictions_path=predictions_path,
-                    run_identifier=run_id,
-                    max_workers=max_workers_int,
-                    timeout=timeout_int,
-                )
-            except Exception as exc:
-                logger.exception("SWE-bench runner error for %s", run_id)
-                _record_failure(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason="swebench_error",
-                    message=str(exc),
-                    status_label="Failed",
-                )
-                return
-
-            n = int(res.get("n") or limit)
-            cases = res.get("cases") or []
-            passed = sum(1 for case in cases if case.get("status") == "resolved") if cases else int(round(res["score_value"] * n))
-            if n > 0:
-                vals = [1] * passed + [0] * max(n - passed, 0)
-                lo, hi = bootstrap_ci(vals, n=n, reps=1000, seed=seed)
-            else:
-                lo = hi = 0.0
-            status_label = "Replicated"
-            diff_entries: list[Dict[str, Any]] = []
+        else:
             diff_entries.append(
                 {
-                    "reason": "swebench_cases",
-                    "message": "SWE-bench Verified evaluation summary",
-                    "evaluated": n,
-                    "passed": passed,
-                    "failed": max(n - passed, 0),
-                    "report_path": res.get("report_path"),
+                    "reason": "comparison_pass",
+                    "message": "Claim model meets or exceeds provided comparators on MMMU.",
+                    **run.comparison_details(),
                 }
             )
-            if limit and n < limit:
-                status_label = "Underspecified"
+
+    _finalize_run(
+        conn,
+        run,
+        score_value=res["score_value"],
+        ops=res.get("ops") or {},
+        diffs=diff_entries,
+        status_label=status_label,
+        harness_cmd="python -m worker.vision_mmmu",
+        harness_paths=VISION_PATHS,
+        dataset_id=MMMU_DATASET_ID,
+        dataset_digest=MMMU_DATASET_DIGEST,
+        params={
+            "domain": run.domain,
+            "task": run.task,
+            "metric": run.metric,
+            "model": run.model_name,
+            "comparators": run.comparators,
+            "budget_usd": run.budget,
+        },
+        seeds={"mode": "offline_fixture"},
+        tokens_prompt=int(res.get("ops", {}).get("tokens_prompt") or 0),
+        tokens_output=int(res.get("ops", {}).get("tokens_output") or 0),
+        latencies=latencies,
+        cost_usd=float(res.get("ops", {}).get("cost_usd") or 0.0),
+    )
+
+
+def _handle_missing_multimodal(conn, run: _RunContext) -> None:
+    _mark_underspecified(
+        conn,
+        run.run_id,
+        run.trace_id,
+        reason="missing_multimodal_support",
+        message="Claim expects multimodal evaluation but the target domain lacks a vision harness.",
+        details=run.comparison_details(),
+    )
+    record_trace(
+        conn,
+        run.run_id,
+        harness_cmd="guard::missing_multimodal_support",
+        dataset_id="guard::vision",
+        params={
+            "domain": run.domain,
+            "task": run.task,
+            "metric": run.metric,
+            "comparators": run.comparators,
+            "budget_usd": run.budget,
+            "model": run.model_name,
+        },
+        seeds={},
+        tokens_prompt=0,
+        tokens_output=0,
+        cost_usd=0.0,
+        errors={"reason": "missing_multimodal_support"},
+    )
+
+
+def _handle_gsm8k(conn, run: _RunContext) -> None:
+    # Real GSM8K path
+    if not run.guard_cost(conn, _COST_REASONING_MATH):
+        return
+    try:
+        res, lats = run_gsm8k_subset(n=25, seed=1234, temperature=0.2)
+        acc = res["score_value"]
+        n = res.get("n", 25)
+        # Approximate successes from accuracy
+        k = int(round(acc * n))
+        lo, hi = wilson_ci(k, n)
+        status_label = "Replicated"
+        diff_entries: list[Dict[str, Any]] = []
+        if run.requires_comparison:
+            status_label = "Underspecified"
+            if run.comparators:
                 diff_entries.append(
                     {
-                        "reason": "case_shortfall",
-                        "message": "Runner evaluated fewer cases than requested limit.",
-                        "requested": limit,
-                        "evaluated": n,
+                        "reason": "comparison_pending",
+                        "message": "Comparator baselines pending for reasoning-math harness.",
+                        "comparators": run.comparators,
+                        **run.comparison_details(),
                     }
                 )
-            if requires_comparison:
-                status_label = "Underspecified"
+            else:
                 diff_entries.append(
                     {
                         "reason": "missing_comparator",
                         "message": "Comparative claim evaluated without competitor baselines.",
-                        **_comparison_details(),
+                        **run.comparison_details(),
                     }
                 )
+        _finalize_run(
+            conn,
+            run,
+            score_value=acc,
+            ci=(lo, hi),
+            ops=res["ops"],
+            diffs=diff_entries,
+            status_label=status_label,
+            harness_cmd="python -m worker.reasoning_gsm8k",
+            harness_paths=GSM8K_PATHS,
+            dataset_id="gsm8k@subset-25",
+            params={
+                "n": n,
+                "temperature": 0.2,
+                "budget_usd": run.budget,
+                "comparators": run.comparators if run.requires_comparison else [],
+            },
+            seeds={"sample_seed": 1234},
+            tokens_prompt=int(res["ops"].get("tokens_prompt") or 0),
+            tokens_output=int(res["ops"].get("tokens_output") or 0),
+            latencies=lats,
+            cost_usd=float(res["ops"].get("cost_usd", 0.0)),
+        )
+        return
+    except Exception as e:
+        logger.exception("GSM8K runner error for %s", run.run_id)
+        status = _status_from_exception(e)
+        reason = "anthropic_overloaded" if status == 529 else "anthropic_error"
+        extra = {"status_code": status} if status else {}
+        _record_failure(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason=reason,
+            message=str(e),
+            extra=extra if extra else None,
+            status_label="Failed",
+        )
+        return
 
-            conn.execute(
-                text(
-                    """
-                    UPDATE runs SET status=:status, score_value=:score_value, ci_lower=:ci_lower, ci_upper=:ci_upper,
-                      ops=CAST(:ops AS JSONB), diffs=CAST(:diffs AS JSONB), status_label=:status_label,
-                      trace_id=:trace_id, completed_at=now()
-                    WHERE id=:id
-                    """
-                ),
-                {
-                    "id": run_id,
-                    "status": "succeeded",
-                    "score_value": res["score_value"],
-                    "ci_lower": lo,
-                    "ci_upper": hi,
-                    "ops": json.dumps(res.get("ops") or {}),
-                    "diffs": json.dumps(diff_entries),
-                    "status_label": status_label,
-                    "trace_id": trace_id,
-                },
-            )
-            record_trace(
-                conn,
-                run_id,
-                harness_cmd="python -m worker.coding_swebench",
-                harness_paths=SWEBENCH_PATHS,
-                dataset_id=SWEBENCH_DATASET_ID,
-                params={
-                    "limit": limit,
-                    "seed": seed,
-                    "cli_entrypoint": cli_entry,
-                    "dataset_root": dataset_root,
-                    "comparators": comparators if requires_comparison else [],
-                },
-                seeds={"sample_seed": seed},
-                tokens_prompt=0,
-                tokens_output=0,
-                latencies=latencies,
-                cost_usd=float(res.get("ops", {}).get("cost_usd", 0.0)),
-            )
-            _increment_validation_count(conn, claim_id)
-            conn.commit()
-            return
 
-        # Real HumanEval (coding)
-        if domain == "coding" and task.lower().startswith("humaneval"):
-            if not _guard_cost(ESTIMATED_LLM_COSTS.get(domain, 0.0)):
-                return
-            try:
-                res, lats = run_humaneval_subset(n=25, seed=1234, temperature=0.0, max_tokens=1024)
-                acc = res["score_value"]
-                n = res.get("n", 25)
-                k = int(round(acc * n))
-                vals = [1]*k + [0]*(n-k)
-                lo, hi = bootstrap_ci(vals, n=n, reps=1000, seed=1234)
-                status_label = "Replicated"
-                diff_entries: list[Dict[str, Any]] = []
-                if requires_comparison:
-                    status_label = "Underspecified"
-                    if comparators:
-                        diff_entries.append(
-                            {
-                                "reason": "comparison_pending",
-                                "message": "Comparator baselines pending for coding harness.",
-                                "comparators": comparators,
-                                **_comparison_details(),
-                            }
-                        )
-                    else:
-                        diff_entries.append(
-                            {
-                                "reason": "missing_comparator",
-                                "message": "Comparative claim evaluated without competitor baselines.",
-                                **_comparison_details(),
-                            }
-                        )
-                conn.execute(
-                    text(
-                        """
-                        UPDATE runs SET status=:status, score_value=:score_value, ci_lower=:ci_lower, ci_upper=:ci_upper,
-                          ops=CAST(:ops AS JSONB), diffs=CAST(:diffs AS JSONB), status_label=:status_label,
-                          trace_id=:trace_id, completed_at=now()
-                        WHERE id=:id
-                        """
-                    ),
-                    {
-                        "id": run_id,
-                        "status": "succeeded",
-                        "score_value": acc,
-                        "ci_lower": lo,
-                        "ci_upper": hi,
-                        "ops": json.dumps(res["ops"]),
-                        "diffs": json.dumps(diff_entries),
-                        "status_label": status_label,
-                        "trace_id": trace_id,
-                    },
-                )
-                record_trace(
-                    conn,
-                    run_id,
-                    harness_cmd="python -m worker.coding_humaneval",
-                    harness_paths=HUMANEVAL_PATHS,
-                    dataset_id="openai/humaneval",
-                    params={
-                        "n": n,
-                        "temperature": 0.0,
-                        "max_tokens": 1024,
-                        "budget_usd": budget,
-                        "comparators": comparators if requires_comparison else [],
-                    },
-                    seeds={"sample_seed": 1234},
-                    tokens_prompt=int(res["ops"].get("tokens_prompt") or 0),
-                    tokens_output=int(res["ops"].get("tokens_output") or 0),
-                    latencies=lats,
-                    cost_usd=float(res["ops"].get("cost_usd", 0.0)),
-                )
-                _increment_validation_count(conn, claim_id)
-                conn.commit()
-                return
-            except Exception as e:
-                logger.exception("HumanEval runner error for %s", run_id)
-                status = _status_from_exception(e)
-                reason = "anthropic_overloaded" if status == 529 else "anthropic_error"
-                extra = {"status_code": status} if status else {}
-                _record_failure(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason=reason,
-                    message=str(e),
-                    extra=extra if extra else None,
-                    status_label="Failed",
-                )
-                return
+def _handle_swebench(conn, run: _RunContext) -> None:
+    # SWE-bench Verified (coding)
+    # SWE-bench Verified harness is primarily offline, so budget checks are
+    # skipped. Provide knobs for trial count via claim settings.
+    try:
+        limit = int(run.settings.get("swebench_case_limit") or run.settings.get("n") or 25)
+    except (TypeError, ValueError):
+        limit = 25
+    limit = max(limit, 0)
+    try:
+        seed = int(run.settings.get("seed") or 1234)
+    except (TypeError, ValueError):
+        seed = 1234
+    cli_entry = run.settings.get("swebench_cli") or os.getenv("SWEBENCH_CLI_ENTRYPOINT")
+    dataset_root = run.settings.get("swebench_dataset") or os.getenv("SWEBENCH_DATASET_ROOT")
+    predictions_path = run.settings.get("swebench_predictions") or os.getenv("SWEBENCH_PREDICTIONS")
+    if not predictions_path:
+        _mark_underspecified(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason="missing_predictions",
+            message="SWE-bench claims require swebench_predictions setting",
+            details={**run.comparison_details(), "required_setting": "swebench_predictions"},
+        )
+        record_trace(
+            conn,
+            run.run_id,
+            harness_cmd="guard::swebench_predictions_missing",
+            dataset_id=SWEBENCH_DATASET_ID,
+            params={
+                "domain": run.domain,
+                "task": run.task,
+                "metric": run.metric,
+                "comparators": run.comparators,
+            },
+            seeds={},
+            tokens_prompt=0,
+            tokens_output=0,
+            cost_usd=0.0,
+            errors={"reason": "missing_predictions"},
+        )
+        return
+    max_workers = run.settings.get("swebench_max_workers") or os.getenv("SWEBENCH_MAX_WORKERS")
+    timeout_override = run.settings.get("swebench_timeout_s") or os.getenv("SWEBENCH_TIMEOUT_S")
+    try:
+        max_workers_int = int(max_workers) if max_workers is not None else None
+    except (TypeError, ValueError):
+        max_workers_int = None
+    try:
+        timeout_int = int(timeout_override) if timeout_override is not None else None
+    except (TypeError, ValueError):
+        timeout_int = None
+    try:
+        res, latencies = run_swebench_verified(
+            limit=limit,
+            seed=seed,
+            cli_entrypoint=cli_entry,
+            dataset_root=dataset_root,
+            predictions_path=predictions_path,
+            run_identifier=run.run_id,
+            max_workers=max_workers_int,
+            timeout=timeout_int,
+        )
+    except Exception as exc:
+        logger.exception("SWE-bench runner error for %s", run.run_id)
+        _record_failure(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason="swebench_error",
+            message=str(exc),
+            status_label="Failed",
+        )
+        return
+
+    n = int(res.get("n") or limit)
+    cases = res.get("cases") or []
+    passed = sum(1 for case in cases if case.get("status") == "resolved") if cases else int(round(res["score_value"] * n))
+    lo, hi = wilson_ci(passed, n)
+    status_label = "Replicated"
+    diff_entries: list[Dict[str, Any]] = []
+    diff_entries.append(
+        {
+            "reason": "swebench_cases",
+            "message": "SWE-bench Verified evaluation summary",
+            "evaluated": n,
+            "passed": passed,
+            "failed": max(n - passed, 0),
+            "report_path": res.get("report_path"),
+        }
+    )
+    if limit and n < limit:
+        status_label = "Underspecified"
+        diff_entries.append(
+            {
+                "reason": "case_shortfall",
+                "message": "Runner evaluated fewer cases than requested limit.",
+                "requested": limit,
+                "evaluated": n,
+            }
+        )
+    if run.requires_comparison:
+        status_label = "Underspecified"
+        diff_entries.append(
+            {
+                "reason": "missing_comparator",
+                "message": "Comparative claim evaluated without competitor baselines.",
+                **run.comparison_details(),
+            }
+        )
 
-        if domain == "agents" and task.lower().startswith("cagent"):
-            try:
-                res, durations, artifact, metadata = run_cagent_suite()
-                status_label = "Replicated"
-                diff_entries: list[Dict[str, Any]] = [{"metrics": res["metrics"]}]
-                if requires_comparison:
-                    status_label = "Underspecified"
-                    diff_entries.append(
-                        {
-                            "reason": "missing_comparator",
-                            "message": "Comparative claim evaluated without competitor baselines.",
-                            **_comparison_details(),
-                        }
-                    )
-                conn.execute(
-                    text(
-                        """
-                        UPDATE runs
-                        SET status=:status,
-                            score_value=:score_value,
-                            ops=CAST(:ops AS JSONB),
-                            diffs=CAST(:diffs AS JSONB),
-                            status_label=:status_label,
-                            trace_id=:trace_id,
-                            completed_at=now()
-                        WHERE id=:id
-                        """
-                    ),
-                    {
-                        "id": run_id,
-                        "status": "succeeded",
-                        "score_value": res["score_value"],
-                        "ops": json.dumps(res["ops"]),
-                        "diffs": json.dumps(diff_entries),
-                        "status_label": status_label,
-                        "trace_id": trace_id,
-                    },
-                )
-                if artifact:
-                    conn.execute(
-                        text(
-                            """
-                            INSERT INTO artifacts (id, run_id, name, url, sha256, bytes, content_type)
-                            VALUES (:id, :run_id, :name, :url, :sha256, :bytes, :content_type)
-                            """
-                        ),
-                        {
-                            "id": f"art_{uuid.uuid4().hex[:8]}",
-                            "run_id": run_id,
-                            "name": artifact["name"],
-                            "url": artifact["data_url"],
-                            "sha256": artifact.get("sha256"),
-                            "bytes": artifact.get("bytes"),
-                            "content_type": artifact.get("content_type"),
-                        },
-                    )
-                record_trace(
-                    conn,
-                    run_id,
-                    harness_cmd="python -m worker.agents_cagent",
-                    harness_digest=metadata.get("harness_hash"),
-                    dataset_id=metadata.get("dataset_id"),
-                    dataset_digest=metadata.get("dataset_hash"),
-                    params={
-                        **metadata.get("params", {}),
-                        "budget_usd": budget,
-                        "comparators": comparators if requires_comparison else [],
-                    },
-                    seeds=metadata.get("seeds"),
-                    tokens_prompt=0,
-                    tokens_output=0,
-                    latencies=[d / 1000.0 for d in durations],
-                    cost_usd=0.0,
-                )
-                _increment_validation_count(conn, claim_id)
-                conn.commit()
-                return
-            except Exception as exc:
-                logger.exception("cAgent suite error for %s", run_id)
-                _record_failure(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason="harness_error",
-                    message=str(exc),
-                )
-                return
+    _finalize_run(
+        conn,
+        run,
+        score_value=res["score_value"],
+        ci=(lo, hi),
+        ops=res.get("ops") or {},
+        diffs=diff_entries,
+        status_label=status_label,
+        harness_cmd="python -m worker.coding_swebench",
+        harness_paths=SWEBENCH_PATHS,
+        dataset_id=SWEBENCH_DATASET_ID,
+        params={
+            "limit": limit,
+            "seed": seed,
+            "cli_entrypoint": cli_entry,
+            "dataset_root": dataset_root,
+            "comparators": run.comparators if run.requires_comparison else [],
+        },
+        seeds={"sample_seed": seed},
+        tokens_prompt=0,
+        tokens_output=0,
+        latencies=latencies,
+        cost_usd=float(res.get("ops", {}).get("cost_usd", 0.0)),
+    )
 
-        if domain == "computer-use" and task.lower().startswith("cgui"):
-            try:
-                res, durations, artifact, metadata = run_cgui_suite()
-                status_label = "Replicated"
-                diff_entries: list[Dict[str, Any]] = [{"metrics": res["metrics"]}]
-                if requires_comparison:
-                    status_label = "Underspecified"
-                    diff_entries.append(
-                        {
-                            "reason": "missing_comparator",
-                            "message": "Comparative claim evaluated without competitor baselines.",
-                            **_comparison_details(),
-                        }
-                    )
-                conn.execute(
-                    text(
-                        """
-                        UPDATE runs
-                        SET status=:status,
-                            score_value=:score_value,
-                            ops=CAST(:ops AS JSONB),
-                            diffs=CAST(:diffs AS JSONB),
-                            status_label=:status_label,
-                            trace_id=:trace_id,
-                            completed_at=now()
-                        WHERE id=:id
-                        """
-                    ),
-                    {
-                        "id": run_id,
-                        "status": "succeeded",
-                        "score_value": res["score_value"],
-                        "ops": json.dumps(res["ops"]),
-                        "diffs": json.dumps(diff_entries),
-                        "status_label": status_label,
-                        "trace_id": trace_id,
-                    },
-                )
-                if artifact:
-                    conn.execute(
-                        text(
-                            """
-                            INSERT INTO artifacts (id, run_id, name, url, sha256, bytes, content_type)
-                            VALUES (:id, :run_id, :name, :url, :sha256, :bytes, :content_type)
-                            """
-                        ),
-                        {
-                            "id": f"art_{uuid.uuid4().hex[:8]}",
-                            "run_id": run_id,
-                            "name": artifact["name"],
-                            "url": artifact["data_url"],
-                            "sha256": artifact.get("sha256"),
-                            "bytes": artifact.get("bytes"),
-                            "content_type": artifact.get("content_type"),
-                        },
-                    )
-                record_trace(
-                    conn,
-                    run_id,
-                    harness_cmd="python -m worker.gui_cgui",
-                    harness_digest=metadata.get("harness_hash"),
-                    dataset_id=metadata.get("dataset_id"),
-                    dataset_digest=metadata.get("dataset_hash"),
-                    params={
-                        **metadata.get("params", {}),
-                        "budget_usd": budget,
-                        "comparators": comparators if requires_comparison else [],
-                    },
-                    seeds=metadata.get("seeds"),
-                    tokens_prompt=0,
-                    tokens_output=0,
-                    latencies=durations,
-                    cost_usd=0.0,
-                )
-                _increment_validation_count(conn, claim_id)
-                conn.commit()
-                return
-            except Exception as exc:
-                logger.exception("cGUI suite error for %s", run_id)
-                _record_failure(
-                    conn,
-                    run_id,
-                    trace_id,
-                    reason="harness_error",
-                    message=str(exc),
-                )
-                return
 
-        # Fallback to seeded paths for other domains
-        seed = SEED_RESULTS.get(domain, SEED_RESULTS["coding"])
-        status_label = seed.get("status_label", "Replicated")
+def _handle_humaneval(conn, run: _RunContext) -> None:
+    # Real HumanEval (coding)
+    if not run.guard_cost(conn, _COST_CODING):
+        return
+    try:
+        res, lats = run_humaneval_subset(n=25, seed=1234, temperature=0.0, max_tokens=1024)
+        acc = res["score_value"]
+        n = res.get("n", 25)
+        k = int(round(acc * n))
+        lo, hi = wilson_ci(k, n)
+        status_label = "Replicated"
         diff_entries: list[Dict[str, Any]] = []
-        for entry in seed.get("diffs", []):
-            if isinstance(entry, dict):
-                diff_entries.append(dict(entry))
-        if requires_comparison:
+        if run.requires_comparison:
             status_label = "Underspecified"
-            if comparators:
+            if run.comparators:
                 diff_entries.append(
                     {
                         "reason": "comparison_pending",
-                        "message": "Comparator baselines pending for this harness.",
-                        "comparators": comparators,
-                        **_comparison_details(),
+                        "message": "Comparator baselines pending for coding harness.",
+                        "comparators": run.comparators,
+                        **run.comparison_details(),
                     }
                 )
             else:
@@ -1478,90 +1383,308 @@ def process_one(run_id: str, claim_id: str) -> None:
                     {
                         "reason": "missing_comparator",
                         "message": "Comparative claim evaluated without competitor baselines.",
-                        **_comparison_details(),
+                        **run.comparison_details(),
                     }
                 )
-        conn.execute(
-            text(
-                """
-                UPDATE runs SET status=:status, score_value=:score_value, ci_lower=:ci_lower, ci_upper=:ci_upper,
-                  ops=CAST(:ops AS JSONB), diffs=CAST(:diffs AS JSONB), status_label=:status_label,
-                  trace_id=:trace_id, completed_at=now()
-                WHERE id=:id
-                """
-            ),
-            {
-                "id": run_id,
-                "status": "succeeded",
-                "score_value": seed["score_value"],
-                "ci_lower": seed["ci_lower"],
-                "ci_upper": seed["ci_upper"],
-                "ops": json.dumps(seed["ops"]),
-                "diffs": json.dumps(diff_entries),
-                "status_label": status_label,
-                "trace_id": trace_id,
+        _finalize_run(
+            conn,
+            run,
+            score_value=acc,
+            ci=(lo, hi),
+            ops=res["ops"],
+            diffs=diff_entries,
+            status_label=status_label,
+            harness_cmd="python -m worker.coding_humaneval",
+            harness_paths=HUMANEVAL_PATHS,
+            dataset_id="openai/humaneval",
+            params={
+                "n": n,
+                "temperature": 0.0,
+                "max_tokens": 1024,
+                "budget_usd": run.budget,
+                "comparators": run.comparators if run.requires_comparison else [],
             },
+            seeds={"sample_seed": 1234},
+            tokens_prompt=int(res["ops"].get("tokens_prompt") or 0),
+            tokens_output=int(res["ops"].get("tokens_output") or 0),
+            latencies=lats,
+            cost_usd=float(res["ops"].get("cost_usd", 0.0)),
         )
-        # add one artifact
-        art = ARTIFACTS.get(domain, ARTIFACTS["coding"])
-        conn.execute(
-            text(
-                """
-                INSERT INTO artifacts (id, run_id, name, url, sha256, bytes, content_type)
-                VALUES (:id, :run_id, :name, :url, :sha256, :bytes, :content_type)
-                """
-            ),
-            {
-                "id": f"art_{uuid.uuid4().hex[:8]}",
-                "run_id": run_id,
-                "name": art["name"],
-                "url": art["url"],
-                "sha256": art["sha256"],
-                "bytes": art["bytes"],
-                "content_type": art["content_type"],
+        return
+    except Exception as e:
+        logger.exception("HumanEval runner error for %s", run.run_id)
+        status = _status_from_exception(e)
+        reason = "anthropic_overloaded" if status == 529 else "anthropic_error"
+        extra = {"status_code": status} if status else {}
+        _record_failure(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason=reason,
+            message=str(e),
+            extra=extra if extra else None,
+            status_label="Failed",
+        )
+        return
+
+
+def _handle_cagent(conn, run: _RunContext) -> None:
+    try:
+        res, durations, artifact, metadata = run_cagent_suite()
+        status_label = "Replicated"
+        diff_entries: list[Dict[str, Any]] = [{"metrics": res["metrics"]}]
+        if run.requires_comparison:
+            status_label = "Underspecified"
+            diff_entries.append(
+                {
+                    "reason": "missing_comparator",
+                    "message": "Comparative claim evaluated without competitor baselines.",
+                    **run.comparison_details(),
+                }
+            )
+        _finalize_run(
+            conn,
+            run,
+            score_value=res["score_value"],
+            keep_ci=True,
+            ops=res["ops"],
+            diffs=diff_entries,
+            status_label=status_label,
+            artifact=_harness_artifact(artifact),
+            harness_cmd="python -m worker.agents_cagent",
+            harness_digest=metadata.get("harness_hash"),
+            dataset_id=metadata.get("dataset_id"),
+            dataset_digest=metadata.get("dataset_hash"),
+            params={
+                **metadata.get("params", {}),
+                "budget_usd": run.budget,
+                "comparators": run.comparators if run.requires_comparison else [],
             },
+            seeds=metadata.get("seeds"),
+            tokens_prompt=0,
+            tokens_output=0,
+            # Milliseconds to seconds in one vectorised pass; record_trace and
+            # json_utils consume the array without a list round trip.
+            latencies=np.asarray(durations, dtype=np.float64) * 1e-3,
+            cost_usd=0.0,
         )
-        record_trace(
+        return
+    except Exception as exc:
+        logger.exception("cAgent suite error for %s", run.run_id)
+        _record_failure(
             conn,
-            run_id,
-            harness_cmd=f"seeded::{domain}",
-            dataset_id=f"seeded::{domain}",
+            run.run_id,
+            run.trace_id,
+            reason="harness_error",
+            message=str(exc),
+        )
+        return
+
+
+def _handle_cgui(conn, run: _RunContext) -> None:
+    try:
+        res, durations, artifact, metadata = run_cgui_suite()
+        status_label = "Replicated"
+        diff_entries: list[Dict[str, Any]] = [{"metrics": res["metrics"]}]
+        if run.requires_comparison:
+            status_label = "Underspecified"
+            diff_entries.append(
+                {
+                    "reason": "missing_comparator",
+                    "message": "Comparative claim evaluated without competitor baselines.",
+                    **run.comparison_details(),
+                }
+            )
+        _finalize_run(
+            conn,
+            run,
+            score_value=res["score_value"],
+            keep_ci=True,
+            ops=res["ops"],
+            diffs=diff_entries,
+            status_label=status_label,
+            artifact=_harness_artifact(artifact),
+            harness_cmd="python -m worker.gui_cgui",
+            harness_digest=metadata.get("harness_hash"),
+            dataset_id=metadata.get("dataset_id"),
+            dataset_digest=metadata.get("dataset_hash"),
             params={
-                "domain": domain,
-                "task": task,
-                "budget_usd": budget,
-                "comparators": comparators if requires_comparison else [],
+                **metadata.get("params", {}),
+                "budget_usd": run.budget,
+                "comparators": run.comparators if run.requires_comparison else [],
             },
-            seeds={"mode": "seeded"},
-            tokens_prompt=int(seed["ops"].get("tokens_prompt") or 0),
-            tokens_output=int(seed["ops"].get("tokens_output") or 0),
-            cost_usd=float(seed["ops"].get("cost_usd") or 0.0),
+            seeds=metadata.get("seeds"),
+            tokens_prompt=0,
+            tokens_output=0,
+            latencies=durations,
+            cost_usd=0.0,
         )
-        _increment_validation_count(conn, claim_id)
-        conn.commit()
+        return
+    except Exception as exc:
+        logger.exception("cGUI suite error for %s", run.run_id)
+        _record_failure(
+            conn,
+            run.run_id,
+            run.trace_id,
+            reason="harness_error",
+            message=str(exc),
+        )
+        return
+
+
+def _handle_seeded(conn, run: _RunContext) -> None:
+    # Fallback to seeded paths for other domains
+    seed_domain = run.domain if run.domain in SEED_RESULTS else "coding"
+    seed = SEED_RESULTS[seed_domain]
+    status_label = seed.get("status_label", "Replicated")
+    diffs: Any = _SEED_DIFFS_JSON[seed_domain]
+    if run.requires_comparison:
+        status_label = "Underspecified"
+        diff_entries: list[Mapping[str, Any]] = [*_SEED_DIFFS[seed_domain]]
+        diffs = diff_entries
+        if run.comparators:
+            diff_entries.append(
+                {
+                    "reason": "comparison_pending",
+                    "message": "Comparator baselines pending for this harness.",
+                    "comparators": run.comparators,
+                    **run.comparison_details(),
+                }
+            )
+        else:
+            diff_entries.append(
+                {
+                    "reason": "missing_comparator",
+                    "message": "Comparative claim evaluated without competitor baselines.",
+                    **run.comparison_details(),
+                }
+            )
+    # add one artifact
+    art = ARTIFACTS.get(run.domain, _DEFAULT_ARTIFACT)
+    _finalize_run(
+        conn,
+        run,
+        score_value=seed["score_value"],
+        ci=(seed["ci_lower"], seed["ci_upper"]),
+        ops=_SEED_OPS_JSON[seed_domain],
+        diffs=diffs,
+        status_label=status_label,
+        artifact=art,
+        harness_cmd=f"seeded::{run.domain}",
+        dataset_id=f"seeded::{run.domain}",
+        params={
+            "domain": run.domain,
+            "task": run.task,
+            "budget_usd": run.budget,
+            "comparators": run.comparators if run.requires_comparison else [],
+        },
+        seeds={"mode": "seeded"},
+        tokens_prompt=int(seed["ops"].get("tokens_prompt") or 0),
+        tokens_output=int(seed["ops"].get("tokens_output") or 0),
+        cost_usd=float(seed["ops"].get("cost_usd") or 0.0),
+    )
+
+
+# Checked in order; the first matching predicate handles the run and anything
+# unmatched falls back to the seeded path.
+_HANDLERS: Tuple[Tuple[Callable[[_RunContext], bool], Callable[..., None]], ...] = (
+    (lambda run: run.domain == "efficiency" or run.metric == "token_delta", _handle_efficiency),
+    (
+        lambda run: run.domain == "coding" and run.settings.get("comparative_suite") == "coding_competition",
+        _handle_coding_competition,
+    ),
+    (lambda run: run.domain == "vision", _handle_vision),
+    (lambda run: run.requires_multimodal, _handle_missing_multimodal),
+    (lambda run: run.domain == "reasoning-math" and run.task_lc.startswith("gsm8k"), _handle_gsm8k),
+    (lambda run: run.domain == "coding" and "swe-bench" in run.task_lc, _handle_swebench),
+    (lambda run: run.domain == "coding" and run.task_lc.startswith("humaneval"), _handle_humaneval),
+    (lambda run: run.domain == "agents" and run.task_lc.startswith("cagent"), _handle_cagent),
+    (lambda run: run.domain == "computer-use" and run.task_lc.startswith("cgui"), _handle_cgui),
+)
+
+
+_IDLE_WAIT_S = float(os.getenv("WORKER_IDLE_WAIT_S", "5"))
+# Runs processed at once; each holds its own pooled connection while it runs.
+_WORKER_CONCURRENCY = max(1, int(os.getenv("WORKER_CONCURRENCY", "1")))
+_listener: Any = None
+
+
+def _wait_for_queued_run() -> None:
+    """Block until the API announces a queued run, or the idle timeout passes.
+
+    The timeout doubles as a safety poll for runs queued without a notification.
+    """
+    global _listener
+    try:
+        if _listener is None:
+            # A dedicated autocommit connection, detached so the pool never reclaims it.
+            listener = engine.raw_connection()
+            listener.detach()
+            listener.driver_connection.autocommit = True
+            with listener.driver_connection.cursor() as cursor:
+                cursor.execute("LISTEN run_queued")
+            _listener = listener
+        dbapi_conn = _listener.driver_connection
+        if select.select([dbapi_conn], [], [], _IDLE_WAIT_S) != ([], [], []):
+            dbapi_conn.poll()
+            dbapi_conn.notifies.clear()
+    except Exception:
+        logger.warning("run_queued listener unavailable; falling back to polling", exc_info=True)
+        stale, _listener = _listener, None
+        if stale is not None:
+            try:
+                stale.close()
+            except Exception:
+                pass
+        time.sleep(0.5)
+
+
+def _run_claimed(row: Any) -> None:
+    try:
+        ctx = _context_from_row(row) if row["context_claim_id"] is not None else None
+        process_one(run_id=row["id"], claim_id=row["claim_id"], ctx=ctx)
+        logger.info("finished run %s", row['id'])
+    except Exception:
+        logger.exception("run %s failed outside its handler", row['id'])
 
 
 def main() -> None:
-    logger.info("worker starting")
-    while True:
-        try:
-            with engine.connect() as conn:
-                row = conn.execute(
-                    text("SELECT id, claim_id FROM runs WHERE status='queued' ORDER BY created_at ASC LIMIT 1")
-                ).mappings().first()
-                if row:
+    logger.info("worker starting (concurrency=%d)", _WORKER_CONCURRENCY)
+    # The queue is polled over one long-lived connection, replaced only after a
+    # database error, rather than checking one out of the pool on every poll.
+    poll_conn = None
+    inflight: Set[Future] = set()
+    with ThreadPoolExecutor(max_workers=_WORKER_CONCURRENCY, thread_name_prefix="run") as executor:
+        while True:
+            try:
+                inflight = {future for future in inflight if not future.done()}
+                free = _WORKER_CONCURRENCY - len(inflight)
+                rows: List[Any] = []
+                if free > 0:
+                    if poll_conn is None:
+                        poll_conn = engine.connect()
+                    rows = poll_conn.execute(_CLAIM_NEXT_RUNS_SQL, {"limit": free}).mappings().all()
+                    poll_conn.commit()
+                for row in rows:
                     logger.info("picked run %s for claim %s", row['id'], row['claim_id'])
-                    # Mark running
-                    conn.execute(text("UPDATE runs SET status='running' WHERE id=:id"), {"id": row["id"]})
-                    conn.commit()
-                    time.sleep(0.2)
-                    process_one(run_id=row["id"], claim_id=row["claim_id"])
-                    logger.info("finished run %s", row['id'])
-                else:
-                    time.sleep(0.5)
-        except Exception as e:
-            logger.exception("worker loop error")
-            time.sleep(1.0)
+                    inflight.add(executor.submit(_run_claimed, row))
+                if len(inflight) >= _WORKER_CONCURRENCY:
+                    wait(inflight, return_when=FIRST_COMPLETED)
+                elif not rows:
+                    if inflight:
+                        # Spare capacity while runs are in flight: re-poll soon or when one finishes.
+                        wait(inflight, timeout=0.5, return_when=FIRST_COMPLETED)
+                    else:
+                        _wait_for_queued_run()
+            except Exception as e:
+                logger.exception("worker loop error")
+                if isinstance(e, DBAPIError) and poll_conn is not None:
+                    stale, poll_conn = poll_conn, None
+                    try:
+                        stale.close()
+                    except Exception:
+                        pass
+                time.sleep(1.0)
 
 if __name__ == "__main__":
     main()
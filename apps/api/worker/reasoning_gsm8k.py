@@ -1,11 +1,17 @@
+import asyncio
+import functools
+import math
 import os
+import re
 import time
 import random
-import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Tuple
+
+import numpy as np
 from datasets import load_dataset
 import anthropic
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 
 DEFAULT_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-20240620")
 API_KEY = os.getenv("ANTHROPIC_API_KEY")
@@ -14,6 +20,19 @@ PRICE_OUT = float(os.getenv("ANTHROPIC_PRICE_OUTPUT_PER_MTOK", "0"))
 RETRIABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 521, 522, 523, 524, 525, 526, 527, 529}
 MAX_RETRIES = max(1, int(os.getenv("ANTHROPIC_MAX_RETRIES", "5")))
 BACKOFF_BASE_SECONDS = max(0.1, float(os.getenv("ANTHROPIC_BACKOFF_BASE", "1.0")))
+MAX_CONCURRENCY = max(1, int(os.getenv("GSM8K_CONCURRENCY", "8")))
+# Exception classes vary across SDK versions, so only those present are kept.
+_RETRIABLE_EXC_TYPES = tuple(
+    t
+    for t in (
+        getattr(anthropic, "RateLimitError", None),
+        getattr(anthropic, "APIConnectionError", None),
+        getattr(anthropic, "ServiceUnavailableError", None),
+        getattr(anthropic, "InternalServerError", None),
+        getattr(anthropic, "OverloadedError", None),
+    )
+    if isinstance(t, type)
+)
 
 PROMPT_TEMPLATE = (
     "You are a careful mathematician. Solve the following problem. "
@@ -21,74 +40,151 @@ PROMPT_TEMPLATE = (
 )
 
 
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str) -> Anthropic:
+    return Anthropic(api_key=api_key)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_gsm8k_test() -> Any:
+    # Loaded once per process; later runs skip the builder and metadata reads.
+    # Only the columns the harness reads are kept.
+    return load_dataset("openai/gsm8k", "main")["test"].select_columns(["question", "answer"])
+
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
 def extract_numeric(s: str) -> str:
     # Grab last number-like token
-    import re
-    matches = re.findall(r"-?\d+(?:\.\d+)?", s)
-    return matches[-1] if matches else s.strip()
+    last = None
+    for last in _NUMBER_RE.finditer(s):
+        pass
+    return last.group(0) if last is not None else s.strip()
+
+
+def _retry_delay(exc: Exception, attempt: int, rng: random.Random) -> float | None:
+    # Back-off before the next attempt, or None when the error should propagate.
+    status = getattr(exc, "status_code", None)
+    if status is None and hasattr(exc, "response"):
+        status = getattr(getattr(exc, "response"), "status_code", None)
+    retriable = status in RETRIABLE_STATUS or isinstance(exc, _RETRIABLE_EXC_TYPES)
+    if retriable and attempt < MAX_RETRIES - 1:
+        return BACKOFF_BASE_SECONDS * (2 ** attempt) + rng.random() * 0.5
+    return None
+
+
+def _request(prompt: str, temperature: float) -> Dict[str, Any]:
+    return {
+        "model": DEFAULT_MODEL,
+        "max_tokens": 512,
+        "temperature": temperature,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+
+
+def _ask(client: Anthropic, prompt: str, temperature: float, rng: random.Random) -> Tuple[Any, float]:
+    t0 = time.perf_counter()
+    msg = None
+    last_exc: Exception | None = None
+    for attempt in range(MAX_RETRIES):
+        try:
+            msg = client.messages.create(**_request(prompt, temperature))
+            last_exc = None
+            break
+        except Exception as exc:
+            last_exc = exc
+            delay = _retry_delay(exc, attempt, rng)
+            if delay is None:
+                raise
+            time.sleep(delay)
+
+    if msg is None:
+        raise RuntimeError("Anthropic call failed without response") from last_exc
+    return msg, time.perf_counter() - t0
+
+
+async def _ask_async(
+    client: AsyncAnthropic, prompt: str, temperature: float, rng: random.Random
+) -> Tuple[Any, float]:
+    t0 = time.perf_counter()
+    msg = None
+    last_exc: Exception | None = None
+    for attempt in range(MAX_RETRIES):
+        try:
+            msg = await client.messages.create(**_request(prompt, temperature))
+            last_exc = None
+            break
+        except Exception as exc:
+            last_exc = exc
+            delay = _retry_delay(exc, attempt, rng)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+
+    if msg is None:
+        raise RuntimeError("Anthropic call failed without response") from last_exc
+    return msg, time.perf_counter() - t0
+
+
+def _message_text(msg: Any) -> str:
+    content = getattr(msg, "content", None)
+    if content is None:
+        return str(msg)
+    # This prompt almost always gets back a single text block.
+    if len(content) == 1 and getattr(content[0], "type", "text") == "text":
+        return content[0].text
+    return "".join(blk.text for blk in content if getattr(blk, "type", "text") == "text")
+
+
+async def _ask_all(api_key: str, prompts: List[str], temperature: float, rng: random.Random) -> List[Tuple[Any, float]]:
+    # Problems are independent, so their calls overlap up to MAX_CONCURRENCY at a time
+    # on one event loop, rather than each holding a thread while it waits on the API.
+    # The async client is bound to this loop, so it lives only as long as the batch.
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+    async with AsyncAnthropic(api_key=api_key) as client:
+
+        async def _one(prompt: str) -> Tuple[Any, float]:
+            async with semaphore:
+                return await _ask_async(client, prompt, temperature, rng)
+
+        return list(await asyncio.gather(*(_one(prompt) for prompt in prompts)))
 
 
 def run_gsm8k_subset(n: int = 25, seed: int = 1234, temperature: float = 0.2, shots: int = 0) -> Tuple[Dict[str, Any], List[float]]:
     assert API_KEY, "ANTHROPIC_API_KEY not set"
-    client = Anthropic(api_key=API_KEY)
 
-    ds = load_dataset("openai/gsm8k", "main")
-    test = ds["test"]
+    test = _load_gsm8k_test()
     rng = random.Random(seed)
     idxs = list(range(len(test)))
     rng.shuffle(idxs)
     idxs = idxs[:n]
 
+    # One columnar read of the sampled rows instead of a dict per row.
+    sample = test.select(idxs)
+    # Gold solutions end in "#### <answer>"; only that tail needs scanning, and it is
+    # done before the API calls rather than while scoring their responses.
+    gold_nums = [extract_numeric(gold.rpartition("####")[2]) for gold in sample["answer"]]
+    prompts = [PROMPT_TEMPLATE.format(question=question) for question in sample["question"]]
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        responses = asyncio.run(_ask_all(API_KEY, prompts, temperature, rng))
+    else:
+        # asyncio.run cannot nest inside a caller's event loop; fan out on threads instead.
+        client = _get_client(API_KEY)
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as executor:
+            responses = list(executor.map(lambda prompt: _ask(client, prompt, temperature, rng), prompts))
+
     latencies: List[float] = []
     correct = 0
     usage_in = 0
     usage_out = 0
 
-    for i in idxs:
-        q = test[i]["question"]
-        gold = test[i]["answer"]
-        prompt = PROMPT_TEMPLATE.format(question=q)
-        t0 = time.time()
-        msg = None
-        last_exc: Exception | None = None
-        for attempt in range(MAX_RETRIES):
-            try:
-                msg = client.messages.create(
-                    model=DEFAULT_MODEL,
-                    max_tokens=512,
-                    temperature=temperature,
-                    messages=[{"role": "user", "content": prompt}],
-                )
-                last_exc = None
-                break
-            except Exception as exc:
-                status = getattr(exc, "status_code", None)
-                if status is None and hasattr(exc, "response"):
-                    status = getattr(getattr(exc, "response"), "status_code", None)
-                retriable_candidates = [
-                    getattr(anthropic, "RateLimitError", None),
-                    getattr(anthropic, "APIConnectionError", None),
-                    getattr(anthropic, "ServiceUnavailableError", None),
-                    getattr(anthropic, "InternalServerError", None),
-                    getattr(anthropic, "OverloadedError", None),
-                ]
-                retriable_types = tuple(t for t in retriable_candidates if isinstance(t, type)) or tuple()
-                retriable = status in RETRIABLE_STATUS or isinstance(exc, retriable_types)
-                last_exc = exc
-                if retriable and attempt < MAX_RETRIES - 1:
-                    delay = BACKOFF_BASE_SECONDS * (2 ** attempt) + rng.random() * 0.5
-                    time.sleep(delay)
-                    continue
-                raise
-
-        if msg is None:
-            raise RuntimeError("Anthropic call failed without response") from last_exc
-
-        dt = time.time() - t0
+    for gold_num, (msg, dt) in zip(gold_nums, responses):
         latencies.append(dt)
-        text = "".join([blk.text for blk in msg.content if getattr(blk, "type", "text") == "text"]) if hasattr(msg, "content") else str(msg)
-        pred = extract_numeric(text)
-        gold_num = extract_numeric(gold)
+        pred = extract_numeric(_message_text(msg))
         if pred == gold_num:
             correct += 1
         # usage
@@ -99,8 +195,11 @@ def run_gsm8k_subset(n: int = 25, seed: int = 1234, temperature: float = 0.2, sh
             pass
 
     acc = correct / n if n else 0.0
-    lat_sorted = sorted(latencies)
-    p95 = lat_sorted[int(0.95 * (len(lat_sorted) - 1))] if latencies else 0.0
+    p95 = 0.0
+    if latencies:
+        # Same order statistic as indexing the sorted list, selected without a full sort.
+        k = int(0.95 * (len(latencies) - 1))
+        p95 = float(np.partition(np.asarray(latencies, dtype=np.float64), k)[k])
 
     cost = 0.0
     if PRICE_IN or PRICE_OUT:
@@ -122,14 +221,29 @@ def run_gsm8k_subset(n: int = 25, seed: int = 1234, temperature: float = 0.2, sh
 
 
 def bootstrap_ci(values: List[int], n: int, reps: int = 1000, seed: int = 1234) -> Tuple[float, float]:
-    # values are 0/1 correctness
-    import random as _r
-    _r.seed(seed)
-    means: List[float] = []
-    for _ in range(reps):
-        sample = [_r.choice(values) for __ in range(n)]
-        means.append(sum(sample) / float(n))
-    means.sort()
-    lo = means[int(0.025 * reps)]
-    hi = means[int(0.975 * reps)]
-    return lo, hi
+    # values are 0/1 correctness; every replicate is drawn in one vectorised call.
+    rng = np.random.default_rng(seed)
+    data = np.asarray(values, dtype=np.float64)
+    if np.all((data == 0.0) | (data == 1.0)):
+        # Resampling n Bernoulli outcomes is a binomial draw, so skip the (reps, n) matrix.
+        means = rng.binomial(n, data.mean(), size=reps) / n
+    else:
+        means = rng.choice(data, size=(reps, n), replace=True).mean(axis=1)
+    # Only two order statistics are needed, so select them instead of sorting.
+    lo_index, hi_index = int(0.025 * reps), int(0.975 * reps)
+    means = np.partition(means, (lo_index, hi_index))
+    return float(means[lo_index]), float(means[hi_index])
+
+
+def wilson_ci(successes: int, n: int, z: float = 1.959963984540054) -> Tuple[float, float]:
+    # Closed-form 95% Wilson score interval for a pass/fail proportion; unlike a
+    # percentile bootstrap it stays sensible at small n and near 0 or 1.
+    if n <= 0:
+        return 0.0, 0.0
+    k = min(max(successes, 0), n)
+    p = k / n
+    z2 = z * z
+    denom = 1.0 + z2 / n
+    center = (p + z2 / (2 * n)) / denom
+    half = z * math.sqrt(p * (1.0 - p) / n + z2 / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
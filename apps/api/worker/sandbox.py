@@ -0,0 +1,235 @@
+"""Isolated Python workers for executing generated solutions against tests.
+
+Each job runs in its own process, forked from a ``forkserver`` that has already
+imported the common stdlib modules, so jobs skip interpreter start-up without
+sharing state. The child executes the solution as an in-memory ``solution`` module
+and then runs the test source in a fresh namespace, inside a temporary working
+directory. At most ``CLAIMSCOPE_SANDBOX_WORKERS`` jobs run at once across all
+callers, and each job has its own deadline; a job that overruns it is killed
+without affecting any other.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import hashlib
+import io
+import linecache
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import types
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from .kv_store import KeyValueStore
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+_POOL_SIZE = max(1, int(os.getenv("CLAIMSCOPE_SANDBOX_WORKERS", str(min(8, os.cpu_count() or 2)))))
+_HANG_GRACE_S = 2.0
+# Tracebacks are trimmed to their tail so a result always fits in the pipe buffer,
+# letting the parent wait for the child to exit before reading it.
+_MAX_STDERR_CHARS = 8192
+
+# Verdicts for identical (solution, tests) pairs are replayed instead of re-executed.
+# Timeouts are never stored since they depend on machine load.
+# Part of every verdict key: bump it whenever job execution changes in a way that
+# could change a verdict, so verdicts recorded by an older sandbox are never replayed.
+_SANDBOX_VERSION = b"2"
+_VERDICTS = KeyValueStore(
+    Path(os.getenv("CLAIMSCOPE_TEST_CACHE_PATH") or Path.home() / ".claimscope" / "testcache.db"),
+    "verdicts",
+    enabled=os.getenv("CLAIMSCOPE_TEST_CACHE", "1").lower() not in {"0", "false", "off", "no"},
+)
+
+
+class _SandboxTimeout(BaseException):
+    """Raised inside a worker when a job exceeds its time budget.
+
+    Derives from BaseException so ``except Exception`` in user code cannot swallow it.
+    """
+
+
+# Stdlib modules generated solutions and tests commonly import; the forkserver loads
+# them once, so forked jobs inherit them instead of importing them each time.
+_PRELOAD_MODULES = (
+    "ast",
+    "bisect",
+    "collections",
+    "dataclasses",
+    "datetime",
+    "decimal",
+    "functools",
+    "heapq",
+    "inspect",
+    "itertools",
+    "json",
+    "math",
+    "re",
+    "string",
+    "typing",
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _context() -> multiprocessing.context.BaseContext:
+    # A forkserver is single-threaded, so forking jobs from it stays safe while the
+    # parent runs harness threads.
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([*_PRELOAD_MODULES, __name__])
+    return context
+
+
+def _on_alarm(signum, frame):  # pragma: no cover - runs inside the worker process
+    raise _SandboxTimeout()
+
+
+def _execute(solution: str, tests: str, timeout_s: float) -> Tuple[bool, Optional[str]]:
+    """Run ``tests`` against ``solution`` inside the current (worker) process."""
+    previous_handler = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout_s)
+    module = types.ModuleType("solution")
+    module.__file__ = "solution.py"
+    try:
+        with tempfile.TemporaryDirectory() as workdir, redirect_stdout(io.StringIO()):
+            os.chdir(workdir)
+            linecache.cache["solution.py"] = (len(solution), None, solution.splitlines(True), "solution.py")
+            sys.modules["solution"] = module
+            exec(compile(solution, "solution.py", "exec"), module.__dict__)
+            namespace = {"__name__": "__main__"}
+            namespace.update({name: value for name, value in vars(module).items() if not name.startswith("_")})
+            exec(compile(tests, "tests.py", "exec"), namespace)
+        return True, None
+    except _SandboxTimeout:
+        return False, "timeout"
+    except SystemExit as exc:
+        if exc.code in (None, 0):
+            return True, None
+        return False, f"SystemExit: {exc.code}"
+    except BaseException:
+        return False, traceback.format_exc()
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+        sys.modules.pop("solution", None)
+        linecache.cache.pop("solution.py", None)
+
+
+def _child(writer, solution: str, tests: str, timeout_s: float) -> None:  # pragma: no cover - runs in the child
+    # Ctrl-C is handled by the parent, which kills its jobs.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    started = time.perf_counter()
+    passed, stderr = _execute(solution, tests, timeout_s)
+    if stderr is not None:
+        stderr = stderr[-_MAX_STDERR_CHARS:]
+    writer.send((passed, stderr, time.perf_counter() - started))
+    writer.close()
+
+
+def _run_job(solution: str, tests: str, timeout_s: float) -> Tuple[bool, Optional[str], float]:
+    """Execute one job in a fresh child process and wait for its own deadline."""
+    context = _context()
+    reader, writer = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(writer, solution, tests, timeout_s), daemon=True)
+    started = time.perf_counter()
+    process.start()
+    writer.close()
+    try:
+        # The in-worker alarm normally ends the job at timeout_s; the grace period
+        # covers a child where it cannot fire (e.g. stuck in C code).
+        process.join(timeout_s + _HANG_GRACE_S)
+        if process.is_alive():
+            return False, "timeout", timeout_s
+        # The child has exited, so reading cannot block. A solution that patched
+        # builtins can garble or skip the result, which counts as a failure.
+        try:
+            return reader.recv()
+        except Exception:
+            return False, f"worker exited with code {process.exitcode}", time.perf_counter() - started
+    finally:
+        reader.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            # Shared by every caller, so the worker limit holds across harness threads;
+            # a job's deadline only starts once it has a slot.
+            _EXECUTOR = ThreadPoolExecutor(max_workers=_POOL_SIZE, thread_name_prefix="sandbox")
+            atexit.register(shutdown)
+        return _EXECUTOR
+
+
+def run_solution(solution: str, tests: str, timeout_s: float) -> Tuple[bool, Optional[str]]:
+    """Execute ``tests`` against ``solution`` in an isolated worker.
+
+    Returns ``(passed, stderr)`` where ``stderr`` carries the traceback on failure.
+    """
+    passed, stderr, _ = run_batch([solution], tests, timeout_s)[0]
+    return passed, stderr
+
+
+def run_batch(solutions: Sequence[str], tests: str, timeout_s: float) -> List[Tuple[bool, Optional[str], float]]:
+    """Execute the same ``tests`` against several solutions concurrently.
+
+    Returns ``(passed, stderr, elapsed_s)`` per solution, in input order.
+    """
+    return run_many([(solution, tests) for solution in solutions], timeout_s)
+
+
+def run_many(jobs: Sequence[Tuple[str, str]], timeout_s: float) -> List[Tuple[bool, Optional[str], float]]:
+    """Execute independent ``(solution, tests)`` jobs concurrently on isolated workers.
+
+    Jobs with a stored verdict are answered from the cache without execution.
+    Returns ``(passed, stderr, elapsed_s)`` per job, in input order.
+    """
+    keys = [_verdict_key(solution, tests) for solution, tests in jobs]
+    results: List[Optional[Tuple[bool, Optional[str], float]]] = []
+    for key in keys:
+        cached = _VERDICTS.get(key)
+        results.append(tuple(cached) if cached is not None else None)
+    misses = [index for index, result in enumerate(results) if result is None]
+    if not misses:
+        return results  # type: ignore[return-value]
+
+    executor = _get_executor()
+    pending = {index: executor.submit(_run_job, *jobs[index], timeout_s) for index in misses}
+    for index, future in pending.items():
+        outcome = future.result()
+        results[index] = outcome
+        if outcome[1] != "timeout":
+            _VERDICTS.set(keys[index], list(outcome))
+    return results  # type: ignore[return-value]
+
+
+def _verdict_key(solution: str, tests: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_SANDBOX_VERSION)
+    digest.update(b"\x00")
+    digest.update(solution.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(tests.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def shutdown() -> None:
+    global _EXECUTOR
+    atexit.unregister(shutdown)
+    with _EXECUTOR_LOCK:
+        executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        # Running jobs end within their own deadlines; queued ones are dropped.
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -2,56 +2,111 @@
 
 from __future__ import annotations
 
+import functools
 import hashlib
-import json
-import uuid
+import os
 from pathlib import Path
 from typing import Any, Iterable, Optional, Sequence
 
+import numpy as np
 from sqlalchemy import text
 from sqlalchemy.engine import Connection
 
+from . import json_utils
+
+# Raw latency samples are kept in the trace only up to this many; longer series are
+# summarised, so a large run does not produce an oversized (TOASTed) JSONB row.
+MAX_LATENCY_SAMPLES = max(0, int(os.getenv("CLAIMSCOPE_TRACE_MAX_SAMPLES", "1000")))
+
 
 def _resolve_paths(paths: Optional[Sequence[Any]]) -> list[Path]:
     if not paths:
         return []
-    resolved: list[Path] = []
-    for entry in paths:
-        if isinstance(entry, Path):
-            resolved.append(entry.resolve())
-        else:
-            resolved.append(Path(str(entry)).resolve())
-    return [p for p in resolved if p.exists() and p.is_file()]
+    # os.path.isfile is one stat and is False for missing paths, where
+    # exists() + is_file() took two; Path objects are only built for the survivors.
+    resolved = (os.path.realpath(os.fspath(entry) if isinstance(entry, Path) else str(entry)) for entry in paths)
+    return [Path(path) for path in resolved if os.path.isfile(path)]
+
+
+_DIGEST_CHUNK_BYTES = 1 << 20
 
 
 def compute_digest(paths: Sequence[Any]) -> str:
-    files = _resolve_paths(paths)
+    signature = []
+    for file_path in sorted(_resolve_paths(paths), key=lambda p: str(p)):
+        stat = file_path.stat()
+        signature.append((str(file_path), stat.st_mtime_ns, stat.st_size))
+    return _digest_files(tuple(signature))
+
+
+@functools.lru_cache(maxsize=128)
+def _digest_files(signature: tuple[tuple[str, int, int], ...]) -> str:
+    # Keyed on each file's (path, mtime, size), so the fixed harness bundles hashed on
+    # every run are read once per process and again only after they change.
     digest = hashlib.sha256()
-    for file_path in sorted(files, key=lambda p: str(p)):
-        digest.update(f"FILE::{file_path.name}".encode("utf-8"))
-        digest.update(file_path.read_bytes())
+    # Files are streamed through one reusable buffer so large bundles are never held
+    # in memory whole; the digest is identical to hashing each file's full contents.
+    buffer = bytearray(_DIGEST_CHUNK_BYTES)
+    view = memoryview(buffer)
+    for path, _, _ in signature:
+        digest.update(f"FILE::{Path(path).name}".encode("utf-8"))
+        with open(path, "rb", buffering=0) as fh:
+            while read := fh.readinto(buffer):
+                digest.update(view[:read])
     return digest.hexdigest()
 
 
-def _percentile(values: Sequence[float], fraction: float) -> Optional[float]:
-    data = [float(v) for v in values if v is not None]
-    if not data:
-        return None
-    ordered = sorted(data)
-    if len(ordered) == 1:
-        return ordered[0]
-    index = int(max(0, min(len(ordered) - 1, round((len(ordered) - 1) * fraction))))
-    return ordered[index]
+def _percentile_index(size: int, fraction: float) -> int:
+    return int(max(0, min(size - 1, round((size - 1) * fraction))))
 
 
 def _as_json(value: Any) -> str:
     if value is None:
         return "null"
-    return json.dumps(value)
+    return json_utils.dumps(value)
+
+
+# Also embedded by the worker in its result statements; the row id is bound as
+# :trace_row_id so it cannot clash with a run's :id.
+INSERT_TRACE = """
+    INSERT INTO traces (
+      id,
+      run_id,
+      harness_cmd,
+      harness_commit_sha,
+      dataset_id,
+      dataset_commit_sha,
+      dataset_hash,
+      docker_image_sha,
+      params,
+      seeds,
+      tokens_prompt,
+      tokens_output,
+      latency_breakdown,
+      cost_usd,
+      errors
+    ) VALUES (
+      :trace_row_id,
+      :run_id,
+      :harness_cmd,
+      :harness_commit_sha,
+      :dataset_id,
+      :dataset_commit_sha,
+      :dataset_hash,
+      :docker_image_sha,
+      CAST(:params AS JSONB),
+      CAST(:seeds AS JSONB),
+      :tokens_prompt,
+      :tokens_output,
+      CAST(:latency AS JSONB),
+      :cost_usd,
+      CAST(:errors AS JSONB)
+    )
+"""
+_INSERT_TRACE_SQL = text(INSERT_TRACE)
 
 
-def record_trace(
-    conn: Connection,
+def trace_values(
     run_id: str,
     *,
     harness_cmd: str,
@@ -68,74 +123,46 @@ def record_trace(
     latencies: Optional[Sequence[float]] = None,
     cost_usd: Optional[float] = None,
     errors: Optional[dict[str, Any]] = None,
-) -> None:
+) -> dict[str, Any]:
+    """Bind parameters for ``INSERT_TRACE`` describing a trace row for ``run_id``."""
     harness_hash = harness_digest or (compute_digest(harness_paths or []) if harness_paths else None)
     dataset_hash = dataset_digest or (compute_digest(dataset_paths or []) if dataset_paths else None)
 
-    latency_series = [float(v) for v in (latencies or [])]
+    latency_series = np.asarray(latencies if latencies is not None else (), dtype=np.float64)
     latency_payload: Optional[dict[str, Any]] = None
-    if latency_series:
+    if latency_series.size:
+        # Both order statistics are selected in one partition instead of a full sort.
+        p50_index = _percentile_index(latency_series.size, 0.5)
+        p95_index = _percentile_index(latency_series.size, 0.95)
+        selected = np.partition(latency_series, (p50_index, p95_index))
         latency_payload = {
-            "p50": _percentile(latency_series, 0.5),
-            "p95": _percentile(latency_series, 0.95),
-            "samples": latency_series,
+            "p50": float(selected[p50_index]),
+            "p95": float(selected[p95_index]),
+            "count": int(latency_series.size),
         }
-
-    trace_id = f"trc_{uuid.uuid4().hex[:12]}"
-
-    conn.execute(
-        text(
-            """
-            INSERT INTO traces (
-              id,
-              run_id,
-              harness_cmd,
-              harness_commit_sha,
-              dataset_id,
-              dataset_commit_sha,
-              dataset_hash,
-              docker_image_sha,
-              params,
-              seeds,
-              tokens_prompt,
-              tokens_output,
-              latency_breakdown,
-              cost_usd,
-              errors
-            ) VALUES (
-              :id,
-              :run_id,
-              :harness_cmd,
-              :harness_commit_sha,
-              :dataset_id,
-              :dataset_commit_sha,
-              :dataset_hash,
-              :docker_image_sha,
-              CAST(:params AS JSONB),
-              CAST(:seeds AS JSONB),
-              :tokens_prompt,
-              :tokens_output,
-              CAST(:latency AS JSONB),
-              :cost_usd,
-              CAST(:errors AS JSONB)
-            )
-            """
-        ),
-        {
-            "id": trace_id,
-            "run_id": run_id,
-            "harness_cmd": harness_cmd,
-            "harness_commit_sha": harness_hash,
-            "dataset_id": dataset_id,
-            "dataset_commit_sha": None,
-            "dataset_hash": dataset_hash,
-            "docker_image_sha": docker_image_sha,
-            "params": _as_json(params),
-            "seeds": _as_json(seeds),
-            "tokens_prompt": tokens_prompt,
-            "tokens_output": tokens_output,
-            "latency": _as_json(latency_payload),
-            "cost_usd": cost_usd,
-            "errors": _as_json(errors),
-        },
-    )
+        if latency_series.size <= MAX_LATENCY_SAMPLES:
+            # Serialised straight from the array buffer by json_utils.
+            latency_payload["samples"] = latency_series
+
+    return {
+        "trace_row_id": f"trc_{os.urandom(6).hex()}",
+        "run_id": run_id,
+        "harness_cmd": harness_cmd,
+        "harness_commit_sha": harness_hash,
+        "dataset_id": dataset_id,
+        "dataset_commit_sha": None,
+        "dataset_hash": dataset_hash,
+        "docker_image_sha": docker_image_sha,
+        "params": _as_json(params),
+        "seeds": _as_json(seeds),
+        "tokens_prompt": tokens_prompt,
+        "tokens_output": tokens_output,
+        "latency": _as_json(latency_payload),
+        "cost_usd": cost_usd,
+        "errors": _as_json(errors),
+    }
+
+
+def record_trace(conn: Connection, run_id: str, **fields: Any) -> None:
+    """Insert a trace row for ``run_id``; ``fields`` are those of trace_values."""
+    conn.execute(_INSERT_TRACE_SQL, trace_values(run_id, **fields))
@@ -1,11 +1,14 @@
 """Offline MMMU vision harness for deterministic claim validation."""
 from __future__ import annotations
 
-import json
+import functools
 from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 
+from . import json_utils
+
 DATA_PATH = Path(__file__).resolve().parent / "data" / "vision_mmmu.json"
 
 MMMU_DATASET_ID = "mmmu-mini@claimscope-demo"
@@ -16,13 +19,13 @@ class MMMUDataError(RuntimeError):
     """Raised when MMMU fixtures are missing or malformed."""
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BenchmarkEntry:
     name: str
     accuracy: float
     n: int
-    ops: Dict[str, Any]
-    latencies: List[float]
+    ops: Mapping[str, Any]
+    latencies: Tuple[float, ...]
 
     @property
     def score_value(self) -> float:
@@ -40,7 +43,7 @@ class MMMUBenchmark:
     def load(cls, path: Path = DATA_PATH) -> "MMMUBenchmark":
         if not path.exists():
             raise MMMUDataError(f"Vision benchmark fixture not found: {path}")
-        payload = json.loads(path.read_text())
+        payload = json_utils.loads(path.read_bytes())
         try:
             dataset_id = payload["dataset_id"]
             metric = payload["metric"]
@@ -54,28 +57,52 @@ class MMMUBenchmark:
             try:
                 accuracy = float(spec["accuracy"])
                 n = int(spec.get("n") or size)
-                ops = dict(spec.get("ops") or {})
-                latencies = [float(v) for v in spec.get("latencies", [])]
+                # Entries are shared by every run, so ops is a read-only view over the
+                # parsed dict rather than a copy. Latencies already parsed as floats
+                # are kept as-is; only other numeric forms are coerced.
+                ops = MappingProxyType(spec.get("ops") or {})
+                raw_latencies = spec.get("latencies") or ()
+                if all(type(v) is float for v in raw_latencies):
+                    latencies = tuple(raw_latencies)
+                else:
+                    latencies = tuple(float(v) for v in raw_latencies)
             except (TypeError, ValueError, KeyError) as exc:
                 raise MMMUDataError(f"Malformed entry for {name}") from exc
             models[name] = BenchmarkEntry(name=name, accuracy=accuracy, n=n, ops=ops, latencies=latencies)
         return cls(dataset_id=dataset_id, metric=metric, size=size, models=models)
 
+    @functools.cached_property
+    def _lowered(self) -> Dict[str, BenchmarkEntry]:
+        # Loaded benchmarks are cached and never mutated, so the lookup is built once.
+        return {name.lower(): entry for name, entry in self.models.items()}
+
+    @functools.cached_property
+    def _aliases(self) -> Dict[str, BenchmarkEntry]:
+        # Every substring of every lowered name, so partial matches (e.g., missing
+        # "vision") are a dict lookup too. Exact names are inserted first and substrings
+        # only via setdefault in model order, which keeps the old precedence: an exact
+        # match, else the first model whose name contains the query. Model names are
+        # short, so the index stays small.
+        aliases = dict(self._lowered)
+        for key, entry in self._lowered.items():
+            aliases.setdefault("", entry)
+            for start in range(len(key)):
+                for end in range(start + 1, len(key) + 1):
+                    aliases.setdefault(key[start:end], entry)
+        return aliases
+
     def resolve(self, model_name: str) -> BenchmarkEntry:
-        lowered = model_name.lower().strip()
-        lookup: Dict[str, BenchmarkEntry] = {name.lower(): entry for name, entry in self.models.items()}
-        if lowered in lookup:
-            return lookup[lowered]
-        # attempt partial match (e.g., missing "vision")
-        for key, entry in lookup.items():
-            if lowered in key:
-                return entry
-        raise MMMUDataError(f"Model '{model_name}' not present in MMMU fixtures")
+        entry = self._aliases.get(model_name.lower().strip())
+        if entry is None:
+            raise MMMUDataError(f"Model '{model_name}' not present in MMMU fixtures")
+        return entry
+
+    @functools.cached_property
+    def _ranked(self) -> Tuple[BenchmarkEntry, ...]:
+        return tuple(sorted(self.models.values(), key=lambda entry: entry.score_value, reverse=True))
 
     def leaderboard(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        ranked = sorted(self.models.values(), key=lambda entry: entry.score_value, reverse=True)
-        if limit is not None:
-            ranked = ranked[:limit]
+        ranked = self._ranked if limit is None else self._ranked[:limit]
         return [
             {
                 "model": entry.name,
@@ -86,6 +113,18 @@ class MMMUBenchmark:
         ]
 
 
+@functools.lru_cache(maxsize=2)
+def _load_benchmark(path: str, mtime_ns: int) -> MMMUBenchmark:
+    # Keyed on mtime so the fixture is parsed once per process unless it changes on disk.
+    return MMMUBenchmark.load(Path(path))
+
+
+def _cached_benchmark(path: Path = DATA_PATH) -> MMMUBenchmark:
+    if not path.exists():
+        raise MMMUDataError(f"Vision benchmark fixture not found: {path}")
+    return _load_benchmark(str(path), path.stat().st_mtime_ns)
+
+
 def _collect_comparators(benchmark: MMMUBenchmark, comparators: Sequence[str]) -> Tuple[Dict[str, BenchmarkEntry], List[str]]:
     available: Dict[str, BenchmarkEntry] = {}
     missing: List[str] = []
@@ -108,7 +147,7 @@ def run_mmmu_subset(
 ) -> Tuple[Dict[str, Any], List[float], Dict[str, Any]]:
     """Return MMMU accuracy for the target model and comparator metadata."""
 
-    benchmark = MMMUBenchmark.load()
+    benchmark = _cached_benchmark()
     subject = benchmark.resolve(model_name)
     available, missing = _collect_comparators(benchmark, comparators or [])
 
@@ -116,7 +155,7 @@ def run_mmmu_subset(
     result = {
         "score_value": subject.score_value,
         "n": sample_size,
-        "ops": subject.ops,
+        "ops": dict(subject.ops),
         "metrics": {benchmark.metric: subject.score_value},
     }
 
@@ -133,7 +172,8 @@ def run_mmmu_subset(
         "metric": benchmark.metric,
     }
 
-    return result, subject.latencies, comparator_payload
+    # The benchmark is shared across calls, so callers get their own copies of its parts.
+    return result, list(subject.latencies), comparator_payload
 
 
 __all__ = [
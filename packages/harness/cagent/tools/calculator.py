@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import ast
+import functools
 import operator
 from decimal import Decimal, getcontext
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 getcontext().prec = 28
 
@@ -39,45 +40,122 @@ _BIN_OPS: Dict[type, Any] = {
 }
 
 
-def _ensure_safe(node: ast.AST) -> None:
-    for child in ast.walk(node):
-        if type(child) not in _ALLOWED_NODES:
-            raise ValueError(f"unsupported expression node: {type(child).__name__}")
-        if isinstance(child, ast.Constant) and not isinstance(child.value, (int, float)):
-            raise ValueError("constants must be numeric")
+def _check_allowed(node: ast.AST) -> None:
+    if type(node) not in _ALLOWED_NODES:
+        raise ValueError(f"unsupported expression node: {type(node).__name__}")
 
 
 def _eval(node: ast.AST) -> Decimal:
-    if isinstance(node, ast.Expression):
-        return _eval(node.body)
-    if isinstance(node, ast.Constant):
-        return Decimal(str(node.value))
-    if isinstance(node, ast.Num):  # pragma: no cover - legacy AST
-        return Decimal(str(node.n))
-    if isinstance(node, ast.UnaryOp):
-        operand = _eval(node.operand)
+    # Validation is fused into evaluation: each node is checked against the allow-list
+    # as it is visited, so the tree is walked once. Operators are checked before their
+    # operands are evaluated.
+    _check_allowed(node)
+    evaluator = _EVALUATORS.get(type(node))
+    if evaluator is None:
+        raise ValueError("unsupported expression")
+    return evaluator(node)
+
+
+def _eval_constant(node: ast.Constant) -> Decimal:
+    if not isinstance(node.value, (int, float)):
+        raise ValueError("constants must be numeric")
+    return Decimal(str(node.value))
+
+
+def _eval_unary(node: ast.UnaryOp) -> Decimal:
+    _check_allowed(node.op)
+    operand = _eval(node.operand)
+    if isinstance(node.op, ast.USub):
+        return -operand
+    if isinstance(node.op, ast.UAdd):
+        return operand
+    raise ValueError("unsupported unary operator")
+
+
+def _eval_binary(node: ast.BinOp) -> Decimal:
+    _check_allowed(node.op)
+    left = _eval(node.left)
+    right = _eval(node.right)
+    op = _BIN_OPS.get(type(node.op))
+    if op is None:
+        raise ValueError("unsupported binary operator")
+    return Decimal(op(left, right))
+
+
+def _reject_tuple(node: ast.Tuple) -> Decimal:
+    raise ValueError("tuple literal not allowed")
+
+
+_EVALUATORS: Dict[type, Callable[[Any], Decimal]] = {
+    ast.Expression: lambda node: _eval(node.body),
+    ast.Constant: _eval_constant,
+    ast.UnaryOp: _eval_unary,
+    ast.BinOp: _eval_binary,
+    ast.Tuple: _reject_tuple,
+}
+
+
+# Integer results below this bound are exactly what the Decimal context produces;
+# anything larger could be rounded there, so it is left to the Decimal path.
+_EXACT_INT_LIMIT = 10 ** getcontext().prec
+
+
+class _NeedsDecimal(Exception):
+    """Raised when the integer fast path could disagree with Decimal evaluation."""
+
+
+def _eval_int(node: ast.AST) -> int:
+    # Plain int arithmetic for integer-only expressions; any node outside it (including
+    # disallowed ones) defers to _eval, which validates. It also bails out wherever int and
+    # Decimal semantics differ: true division, negative powers, floor/mod with negative
+    # or zero operands, 0 ** 0, and magnitudes the Decimal context would round.
+    node_type = type(node)
+    if node_type is ast.Expression:
+        return _eval_int(node.body)
+    if node_type is ast.Constant:
+        if type(node.value) is not int:
+            raise _NeedsDecimal
+        value = node.value
+    elif node_type is ast.UnaryOp:
+        operand = _eval_int(node.operand)
         if isinstance(node.op, ast.USub):
-            return -operand
-        if isinstance(node.op, ast.UAdd):
-            return operand
-        raise ValueError("unsupported unary operator")
-    if isinstance(node, ast.BinOp):
-        left = _eval(node.left)
-        right = _eval(node.right)
-        op = _BIN_OPS.get(type(node.op))
+            value = -operand
+        elif isinstance(node.op, ast.UAdd):
+            value = operand
+        else:
+            raise _NeedsDecimal
+    elif node_type is ast.BinOp:
+        op_type = type(node.op)
+        left = _eval_int(node.left)
+        right = _eval_int(node.right)
+        if op_type is ast.Div:
+            raise _NeedsDecimal
+        if op_type is ast.Pow and (right < 0 or (left == 0 and right == 0) or (abs(left) > 1 and right >= 94)):
+            # 2 ** 94 already exceeds the limit; avoid building huge ints first.
+            raise _NeedsDecimal
+        if op_type in (ast.Mod, ast.FloorDiv) and (left < 0 or right <= 0):
+            raise _NeedsDecimal
+        op = _BIN_OPS.get(op_type)
         if op is None:
-            raise ValueError("unsupported binary operator")
-        return Decimal(op(left, right))
-    if isinstance(node, ast.Tuple):
-        raise ValueError("tuple literal not allowed")
-    raise ValueError("unsupported expression")
+            raise _NeedsDecimal
+        value = op(left, right)
+    else:
+        raise _NeedsDecimal
+    if abs(value) >= _EXACT_INT_LIMIT:
+        raise _NeedsDecimal
+    return value
 
 
+# Evaluation is pure, and agent tasks repeat the same expressions across runs.
+@functools.lru_cache(maxsize=4096)
 def run(expression: str) -> str:
     if not expression or not expression.strip():
         raise ValueError("expression required")
     tree = ast.parse(expression, mode="eval")
-    _ensure_safe(tree)
+    try:
+        return str(_eval_int(tree))
+    except _NeedsDecimal:
+        pass
     result = _eval(tree)
     # normalise ints vs decimals
     if result == result.to_integral():
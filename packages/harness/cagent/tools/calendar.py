@@ -9,5 +9,9 @@ from dateutil import parser
 def run(phrase: str) -> str:
     if not phrase:
         raise ValueError("phrase required")
-    dt = parser.parse(phrase, dayfirst=False, yearfirst=False, fuzzy=True)
+    try:
+        # ISO 8601 input is parsed in C; free-form phrases fall through to dateutil.
+        dt = datetime.fromisoformat(phrase.strip())
+    except ValueError:
+        dt = parser.parse(phrase, dayfirst=False, yearfirst=False, fuzzy=True)
     return dt.date().isoformat()
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import os
+import re
 import sqlite3
+import threading
 from importlib.resources import files
 from typing import Any, Iterable, List
 
@@ -14,27 +16,51 @@ class SQLiteToolError(RuntimeError):
     pass
 
 
+# Whole words only, so identifiers such as ``updated_at`` are not mistaken for them.
+_DISALLOWED_RE = re.compile(r"\b(?:update|insert|delete|drop|alter|pragma|attach|detach|vacuum)\b", re.IGNORECASE)
+
+# Actions a plain SELECT needs; SQLite refuses to prepare anything else.
+_ALLOWED_ACTIONS = frozenset({sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION})
+
+
+def _authorize(action: int, *_: Any) -> int:
+    return sqlite3.SQLITE_OK if action in _ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+
 def _ensure_allowed(query: str) -> None:
-    stripped = query.strip().lower()
-    if not stripped.startswith("select"):
+    if query.lstrip()[:6].lower() != "select":
         raise SQLiteToolError("only SELECT queries are permitted")
-    disallowed = {"update", "insert", "delete", "drop", "alter", "pragma"}
-    if any(word in stripped for word in disallowed):
+    if _DISALLOWED_RE.search(query):
         raise SQLiteToolError("mutation queries are not allowed")
 
 
+_LOCAL = threading.local()
+
+
+def _connection() -> sqlite3.Connection:
+    # One connection per thread, opened on first use and kept. The bundled database is
+    # never written, so ``immutable=1`` also lets SQLite skip file locking.
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is None:
+        if not os.path.exists(DB_PATH):
+            raise SQLiteToolError("database not found")
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro&immutable=1", uri=True)
+        conn.set_authorizer(_authorize)
+        _LOCAL.conn = conn
+    return conn
+
+
 def run(query: str) -> str:
-    if not os.path.exists(DB_PATH):
-        raise SQLiteToolError("database not found")
     _ensure_allowed(query)
-    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    cur = _connection().execute(query)
     try:
-        conn.row_factory = sqlite3.Row
-        cur = conn.execute(query)
         rows = cur.fetchall()
-        if not rows:
-            return "[]"
-        result: List[dict[str, Any]] = [dict(row) for row in rows]
-        return str(result)
+        names = [column[0] for column in cur.description or ()]
     finally:
-        conn.close()
+        cur.close()
+    if not rows:
+        return "[]"
+    # Plain tuples zipped with the column names once, rather than a Row object per
+    # row copied into a dict. Task fixtures expect this Python-literal rendering.
+    result: List[dict[str, Any]] = [dict(zip(names, row)) for row in rows]
+    return str(result)
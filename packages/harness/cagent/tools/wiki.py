@@ -6,28 +6,31 @@ import json
 from importlib.resources import files
 from typing import Dict
 
-_CACHE: Dict[str, dict] | None = None
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
 
+_CACHE: Dict[str, str] | None = None
 
-def _load() -> Dict[str, dict]:
+
+def _load() -> Dict[str, str]:
     global _CACHE
     if _CACHE is None:
-        data_path = files("packages.harness.cagent.data").joinpath("wiki.json")
-        with data_path.open("r", encoding="utf-8") as fh:
-            entries = json.load(fh)
-        _CACHE = {entry["title"].lower(): entry for entry in entries}
+        data = files("packages.harness.cagent.data").joinpath("wiki.json").read_bytes()
+        entries = orjson.loads(data) if orjson is not None else json.loads(data)
+        # Titles are case-folded and each entry reduced to the text run() returns, once.
+        _CACHE = {
+            entry["title"].casefold(): entry.get("sections", {}).get("summary") or entry.get("content", "")
+            for entry in entries
+        }
     return _CACHE
 
 
 def run(query: str) -> str:
     if not query:
         raise ValueError("query required")
-    entries = _load()
-    key = query.lower()
-    if key not in entries:
+    text = _load().get(query.casefold())
+    if text is None:
         raise KeyError(f"wiki entry not found: {query}")
-    entry = entries[key]
-    section = entry.get("sections", {}).get("summary")
-    if not section:
-        return entry.get("content", "")
-    return section
+    return text
@@ -14,6 +14,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
 import tempfile
 from pathlib import Path
@@ -22,6 +23,9 @@ from typing import Iterable, List, Sequence
 from swebench.harness.constants import KEY_INSTANCE_ID, KEY_MODEL
 from swebench.harness.run_evaluation import main as swebench_main
 
+# Scratch files go to memory-backed /dev/shm when the host provides it.
+TMPROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
 
 def _load_predictions(path: Path) -> List[dict]:
     raw = path.read_text(encoding="utf-8").strip()
@@ -103,7 +107,7 @@ def main() -> None:
         sys.stdout.flush()
         return
 
-    with tempfile.TemporaryDirectory() as td:
+    with tempfile.TemporaryDirectory(dir=TMPROOT) as td:
         filtered_path = Path(td) / "predictions.jsonl"
         _write_predictions(filtered_path, filtered)
 